@@ -0,0 +1,27 @@
+"""Add checkpoints to analysis_results
+
+Revision ID: add_analysis_checkpoints
+Revises: add_processing_options
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_analysis_checkpoints'
+down_revision: Union[str, None] = 'add_processing_options'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('analysis_results', sa.Column('checkpoints', JSONB, nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('analysis_results', 'checkpoints')
@@ -0,0 +1,29 @@
+"""Add raw_segments and processing_params to analysis_results
+
+Revision ID: add_analysis_raw_segments
+Revises: add_analysis_checkpoints
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_analysis_raw_segments'
+down_revision: Union[str, None] = 'add_analysis_checkpoints'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('analysis_results', sa.Column('raw_segments', JSONB, nullable=True))
+    op.add_column('analysis_results', sa.Column('processing_params', JSONB, nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('analysis_results', 'processing_params')
+    op.drop_column('analysis_results', 'raw_segments')
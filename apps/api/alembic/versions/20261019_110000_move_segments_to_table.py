@@ -0,0 +1,93 @@
+"""Move analysis segments from JSONB into analysis_segments
+
+Revision ID: add_analysis_segments
+Revises: add_analysis_raw_segments
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_analysis_segments'
+down_revision: Union[str, None] = 'add_analysis_raw_segments'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('analysis_segments',
+    sa.Column('analysis_id', sa.UUID(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('start_ms', sa.Integer(), nullable=False),
+    sa.Column('end_ms', sa.Integer(), nullable=False),
+    sa.Column('type', sa.String(length=20), nullable=False),
+    sa.Column('confidence', sa.Float(), nullable=False),
+    sa.Column('text', sa.Text(), nullable=True),
+    sa.Column('filler_word', sa.String(length=255), nullable=True),
+    sa.Column('classification', sa.String(length=20), nullable=True),
+    sa.ForeignKeyConstraint(['analysis_id'], ['analysis_results.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('analysis_id', 'position')
+    )
+    op.create_index('ix_analysis_segments_analysis_start', 'analysis_segments', ['analysis_id', 'start_ms'], unique=False)
+
+    op.execute(
+        """
+        INSERT INTO analysis_segments (
+            analysis_id, position, start_ms, end_ms, type, confidence,
+            text, filler_word, classification
+        )
+        SELECT
+            a.id,
+            e.ordinality - 1,
+            COALESCE((e.value->>'start_ms')::int, 0),
+            COALESCE((e.value->>'end_ms')::int, 0),
+            COALESCE(e.value->>'type', 'speech'),
+            COALESCE((e.value->>'confidence')::float, 0),
+            e.value->>'text',
+            e.value->>'filler_word',
+            e.value->>'classification'
+        FROM analysis_results a
+        CROSS JOIN LATERAL jsonb_array_elements(a.segments) WITH ORDINALITY AS e(value, ordinality)
+        WHERE jsonb_typeof(a.segments) = 'array'
+        """
+    )
+
+    op.drop_column('analysis_results', 'segments')
+
+
+def downgrade() -> None:
+    op.add_column('analysis_results', sa.Column('segments', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+    op.execute(
+        """
+        UPDATE analysis_results a
+        SET segments = s.segments
+        FROM (
+            SELECT
+                analysis_id,
+                jsonb_agg(
+                    jsonb_build_object(
+                        'start_ms', start_ms,
+                        'end_ms', end_ms,
+                        'type', type,
+                        'confidence', confidence,
+                        'text', text,
+                        'filler_word', filler_word,
+                        'classification', classification
+                    )
+                    ORDER BY position
+                ) AS segments
+            FROM analysis_segments
+            GROUP BY analysis_id
+        ) s
+        WHERE a.id = s.analysis_id
+        """
+    )
+
+    op.drop_index('ix_analysis_segments_analysis_start', table_name='analysis_segments')
+    op.drop_table('analysis_segments')
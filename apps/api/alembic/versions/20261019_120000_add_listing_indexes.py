@@ -0,0 +1,29 @@
+"""Add listing and foreign key indexes
+
+Revision ID: add_listing_indexes
+Revises: add_analysis_segments
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_listing_indexes'
+down_revision: Union[str, None] = 'add_analysis_segments'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_projects_user_id_created_at', 'projects', ['user_id', 'created_at', 'id'], unique=False)
+    op.create_index(op.f('ix_media_files_project_id'), 'media_files', ['project_id'], unique=False)
+    op.create_index('ix_analysis_results_media_file_id_created_at', 'analysis_results', ['media_file_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_analysis_results_media_file_id_created_at', table_name='analysis_results')
+    op.drop_index(op.f('ix_media_files_project_id'), table_name='media_files')
+    op.drop_index('ix_projects_user_id_created_at', table_name='projects')
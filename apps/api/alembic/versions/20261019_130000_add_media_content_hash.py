@@ -0,0 +1,30 @@
+"""Add content_hash to media_files for content-addressed uploads
+
+Revision ID: add_media_content_hash
+Revises: add_listing_indexes
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_media_content_hash'
+down_revision: Union[str, None] = 'add_listing_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('media_files', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_media_files_content_hash'), 'media_files', ['content_hash'], unique=False)
+    op.create_index(op.f('ix_media_files_stored_filename'), 'media_files', ['stored_filename'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_media_files_stored_filename'), table_name='media_files')
+    op.drop_index(op.f('ix_media_files_content_hash'), table_name='media_files')
+    op.drop_column('media_files', 'content_hash')
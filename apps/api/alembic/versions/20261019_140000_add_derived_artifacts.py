@@ -0,0 +1,39 @@
+"""Add derived_artifacts table
+
+Revision ID: add_derived_artifacts
+Revises: add_media_content_hash
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_derived_artifacts'
+down_revision: Union[str, None] = 'add_media_content_hash'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('derived_artifacts',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('artifact_type', sa.String(length=50), nullable=False),
+    sa.Column('params_hash', sa.String(length=64), nullable=False),
+    sa.Column('storage_key', sa.String(length=1000), nullable=False),
+    sa.Column('size_bytes', sa.BigInteger(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('last_accessed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('content_hash', 'artifact_type', 'params_hash', name='uq_derived_artifacts_key')
+    )
+    op.create_index('ix_derived_artifacts_last_accessed_at', 'derived_artifacts', ['last_accessed_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_derived_artifacts_last_accessed_at', table_name='derived_artifacts')
+    op.drop_table('derived_artifacts')
@@ -0,0 +1,25 @@
+"""Add media_files (created_at, id) index for batched cleanup
+
+Revision ID: add_media_created_at_index
+Revises: add_derived_artifacts
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_media_created_at_index'
+down_revision: Union[str, None] = 'add_derived_artifacts'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_media_files_created_at_id', 'media_files', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_media_files_created_at_id', table_name='media_files')
@@ -0,0 +1,28 @@
+"""Add DELETING project status for background deletion
+
+Revision ID: add_project_deleting_status
+Revises: add_media_created_at_index
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_project_deleting_status'
+down_revision: Union[str, None] = 'add_media_created_at_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ALTER TYPE ... ADD VALUE cannot run inside a transaction block on older PostgreSQL
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE projectstatus ADD VALUE IF NOT EXISTS 'DELETING'")
+
+
+def downgrade() -> None:
+    # PostgreSQL cannot drop an enum value; park unfinished deletions as failed instead
+    op.execute("UPDATE projects SET status = 'FAILED' WHERE status = 'DELETING'")
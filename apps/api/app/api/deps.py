@@ -5,11 +5,13 @@ from typing import Annotated
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
 from app.database import get_db
 from app.models.user import User
+from app.services.user_cache import get_user_cache
 
 settings = get_settings()
 security = HTTPBearer()
@@ -17,7 +19,7 @@ security = HTTPBearer()
 
 async def get_current_user(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> User:
     """Get the current authenticated user from JWT token."""
     credentials_exception = HTTPException(
@@ -42,10 +44,17 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user_cache = get_user_cache()
+    user = await user_cache.get(user_id) if user_cache else None
 
     if user is None:
-        raise credentials_exception
+        user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
+
+        if user is None:
+            raise credentials_exception
+
+        if user_cache:
+            await user_cache.set(user)
 
     if not user.is_active:
         raise HTTPException(
@@ -65,4 +74,4 @@ async def get_current_active_user(
 
 # Type alias for dependency injection
 CurrentUser = Annotated[User, Depends(get_current_active_user)]
-DbSession = Annotated[Session, Depends(get_db)]
+DbSession = Annotated[AsyncSession, Depends(get_db)]
@@ -1,8 +1,11 @@
 """Analysis API endpoints."""
 
+from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.orm import undefer, undefer_group
 
 from app.api.deps import CurrentUser, DbSession
 from app.config import get_settings
@@ -11,10 +14,20 @@ from app.models.media import MediaFile
 from app.models.project import Project
 from app.schemas.analysis import (
     AnalysisCreate,
+    AnalysisReprocessRequest,
+    AnalysisReprocessResponse,
     AnalysisResponse,
     AnalysisStartResponse,
     AnalysisStatusResponse,
+    SegmentRangeResponse,
+    SegmentResponse,
 )
+from app.services.segment_processor import (
+    apply_classification_overrides,
+    diff_segments,
+    get_segment_processor,
+)
+from app.services.segment_store import get_segment_store
 
 router = APIRouter()
 settings = get_settings()
@@ -34,11 +47,12 @@ async def start_analysis(
     """Start audio analysis for a media file."""
     # Get media file with project ownership check
     media_file = (
-        db.query(MediaFile)
-        .join(Project)
-        .filter(MediaFile.id == media_id, Project.user_id == current_user.id)
-        .first()
-    )
+        await db.execute(
+            select(MediaFile)
+            .join(Project)
+            .where(MediaFile.id == media_id, Project.user_id == current_user.id)
+        )
+    ).scalar_one_or_none()
 
     if not media_file:
         raise HTTPException(
@@ -64,12 +78,12 @@ async def start_analysis(
                     "message": "AI features are not enabled on this server",
                 },
             )
-        if not settings.whisper_api_enabled:
+        if not settings.transcription_available:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail={
                     "code": "AI_FEATURES_DISABLED",
-                    "message": "Whisper API is not enabled on this server",
+                    "message": "Transcription is not enabled on this server",
                 },
             )
 
@@ -80,8 +94,8 @@ async def start_analysis(
         status=AnalysisStatus.PENDING,
     )
     db.add(analysis)
-    db.commit()
-    db.refresh(analysis)
+    await db.commit()
+    await db.refresh(analysis)
 
     # Trigger Celery task
     try:
@@ -106,13 +120,13 @@ async def start_analysis(
 
         # Update status to processing
         analysis.status = AnalysisStatus.PROCESSING
-        db.commit()
+        await db.commit()
 
     except Exception as e:
         # If task submission fails, mark as failed
         analysis.status = AnalysisStatus.FAILED
         analysis.error_message = f"Failed to start processing: {str(e)}"
-        db.commit()
+        await db.commit()
 
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -133,15 +147,18 @@ async def get_analysis(
     analysis_id: UUID,
     current_user: CurrentUser,
     db: DbSession,
+    include_segments: bool = True,
 ):
     """Get analysis result."""
     analysis = (
-        db.query(AnalysisResult)
-        .join(MediaFile)
-        .join(Project)
-        .filter(AnalysisResult.id == analysis_id, Project.user_id == current_user.id)
-        .first()
-    )
+        await db.execute(
+            select(AnalysisResult)
+            .options(undefer_group("results"))
+            .join(MediaFile)
+            .join(Project)
+            .where(AnalysisResult.id == analysis_id, Project.user_id == current_user.id)
+        )
+    ).scalar_one_or_none()
 
     if not analysis:
         raise HTTPException(
@@ -152,7 +169,52 @@ async def get_analysis(
             },
         )
 
-    return AnalysisResponse.model_validate(analysis)
+    response = AnalysisResponse.model_validate(analysis)
+    if include_segments and analysis.status == AnalysisStatus.COMPLETED:
+        segments = await db.run_sync(
+            lambda session: get_segment_store(session).list_segments(analysis.id)
+        )
+        response.segments = [SegmentResponse(**segment) for segment in segments]
+
+    return response
+
+
+@router.get("/{analysis_id}/segments", response_model=SegmentRangeResponse)
+async def get_analysis_segments(
+    analysis_id: UUID,
+    current_user: CurrentUser,
+    db: DbSession,
+    start_ms: Optional[int] = Query(None, ge=0),
+    end_ms: Optional[int] = Query(None, ge=0),
+):
+    """Get the segments of an analysis that overlap a time window."""
+    analysis = (
+        await db.execute(
+            select(AnalysisResult)
+            .join(MediaFile)
+            .join(Project)
+            .where(AnalysisResult.id == analysis_id, Project.user_id == current_user.id)
+        )
+    ).scalar_one_or_none()
+
+    if not analysis:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "code": "NOT_FOUND",
+                "message": "Analysis not found",
+            },
+        )
+
+    segments = await db.run_sync(
+        lambda session: get_segment_store(session).list_segments(analysis.id, start_ms, end_ms)
+    )
+    return SegmentRangeResponse(
+        analysis_id=analysis.id,
+        start_ms=start_ms,
+        end_ms=end_ms,
+        segments=[SegmentResponse(**segment) for segment in segments],
+    )
 
 
 @router.get("/{analysis_id}/status", response_model=AnalysisStatusResponse)
@@ -163,12 +225,13 @@ async def get_analysis_status(
 ):
     """Get lightweight analysis status for polling."""
     analysis = (
-        db.query(AnalysisResult)
-        .join(MediaFile)
-        .join(Project)
-        .filter(AnalysisResult.id == analysis_id, Project.user_id == current_user.id)
-        .first()
-    )
+        await db.execute(
+            select(AnalysisResult)
+            .join(MediaFile)
+            .join(Project)
+            .where(AnalysisResult.id == analysis_id, Project.user_id == current_user.id)
+        )
+    ).scalar_one_or_none()
 
     if not analysis:
         raise HTTPException(
@@ -195,3 +258,80 @@ async def get_analysis_status(
         progress_percent=progress,
         error_message=analysis.error_message,
     )
+
+
+@router.post("/{analysis_id}/reprocess", response_model=AnalysisReprocessResponse)
+async def reprocess_analysis(
+    analysis_id: UUID,
+    data: AnalysisReprocessRequest,
+    current_user: CurrentUser,
+    db: DbSession,
+):
+    """Re-run segment post-processing on stored raw segments and return the changes."""
+    analysis = (
+        await db.execute(
+            select(AnalysisResult)
+            .options(undefer(AnalysisResult.raw_segments), undefer(AnalysisResult.processing_params))
+            .join(MediaFile)
+            .join(Project)
+            .where(AnalysisResult.id == analysis_id, Project.user_id == current_user.id)
+        )
+    ).scalar_one_or_none()
+
+    if not analysis:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "code": "NOT_FOUND",
+                "message": "Analysis not found",
+            },
+        )
+
+    if analysis.status != AnalysisStatus.COMPLETED or analysis.raw_segments is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "code": "NO_ANALYSIS",
+                "message": "Analysis has no stored raw segments. Please analyze the media again.",
+            },
+        )
+
+    # Unspecified parameters keep their previous values
+    params = dict(analysis.processing_params or {})
+    updates = data.model_dump(exclude_none=True)
+    params.update(updates)
+
+    segment_processor = get_segment_processor(
+        min_silence_duration_ms=params.get("min_silence_duration_ms"),
+        min_speech_duration_ms=params.get("min_speech_duration_ms"),
+        merge_threshold_ms=params.get("merge_threshold_ms"),
+        speech_padding_ms=params.get("speech_padding_ms"),
+    )
+    segments = segment_processor.process_table(
+        analysis.raw_segments,
+        params.get("total_duration_ms"),
+    ).to_dicts()
+
+    overrides = params.get("classification_overrides") or []
+    apply_classification_overrides(segments, overrides)
+
+    def replace_segments(session):
+        store = get_segment_store(session)
+        changes = diff_segments(store.list_segments(analysis.id), segments)
+        store.replace(analysis.id, segments)
+        return changes
+
+    changes = await db.run_sync(replace_segments)
+    analysis.processing_params = {
+        **segment_processor.params,
+        "total_duration_ms": params.get("total_duration_ms"),
+        "classification_overrides": overrides,
+    }
+    await db.commit()
+
+    return AnalysisReprocessResponse(
+        analysis_id=analysis.id,
+        segment_count=len(segments),
+        processing_params=analysis.processing_params,
+        changes=changes,
+    )
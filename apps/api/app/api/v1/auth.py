@@ -29,7 +29,7 @@ async def register(data: RegisterRequest, db: DbSession):
     auth_service = AuthService(db)
 
     # Check if email already exists
-    existing_user = auth_service.get_user_by_email(data.email)
+    existing_user = await auth_service.get_user_by_email(data.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -41,10 +41,10 @@ async def register(data: RegisterRequest, db: DbSession):
         )
 
     # Create user
-    user = auth_service.create_user(data)
+    user = await auth_service.create_user(data)
 
     # Create tokens
-    access_token, refresh_token = auth_service.create_tokens(user)
+    access_token, refresh_token = await auth_service.create_tokens(user)
 
     return TokenResponse(
         user=UserResponse.model_validate(user),
@@ -59,7 +59,7 @@ async def login(data: LoginRequest, response: Response, db: DbSession):
     auth_service = AuthService(db)
 
     # Authenticate user
-    user = auth_service.authenticate_user(data.email, data.password)
+    user = await auth_service.authenticate_user(data.email, data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -79,10 +79,10 @@ async def login(data: LoginRequest, response: Response, db: DbSession):
         )
 
     # Update last login
-    auth_service.update_last_login(user)
+    await auth_service.update_last_login(user)
 
     # Create tokens
-    access_token, refresh_token = auth_service.create_tokens(user)
+    access_token, refresh_token = await auth_service.create_tokens(user)
 
     # Set refresh token as HTTP-only cookie
     response.set_cookie(
@@ -128,7 +128,7 @@ async def refresh_token(
         )
 
     # Refresh tokens
-    result = auth_service.refresh_tokens(token)
+    result = await auth_service.refresh_tokens(token)
     if not result:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -169,7 +169,7 @@ async def logout(
 
     # Revoke refresh token if provided
     if data and data.refresh_token:
-        auth_service.revoke_refresh_token(data.refresh_token)
+        await auth_service.revoke_refresh_token(data.refresh_token)
 
     # Clear cookie
     response.delete_cookie(key="refresh_token")
@@ -183,7 +183,7 @@ async def forgot_password(data: ForgotPasswordRequest, db: DbSession):
     # Always return success to prevent email enumeration
     # In production, send reset email if user exists
     auth_service = AuthService(db)
-    user = auth_service.get_user_by_email(data.email)
+    user = await auth_service.get_user_by_email(data.email)
 
     if user:
         # TODO: Generate reset token and send email
@@ -221,5 +221,5 @@ async def update_current_user(
 ):
     """Update current user profile."""
     auth_service = AuthService(db)
-    updated_user = auth_service.update_user(current_user, data)
+    updated_user = await auth_service.update_user(current_user, data)
     return UserResponse.model_validate(updated_user)
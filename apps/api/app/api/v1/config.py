@@ -28,8 +28,7 @@ async def get_features():
     return FeaturesResponse(
         # ai_features_enabled=settings.ai_features_enabled,
         # whisper_available=settings.ai_features_enabled and settings.whisper_api_enabled,
-        filler_detection_available=settings.ai_features_enabled
-        and settings.whisper_api_enabled
+        filler_detection_available=settings.transcription_available
         and settings.detect_filler_words,
         max_file_size_mb=settings.max_file_size_mb,
         allowed_extensions=settings.allowed_extensions_list,
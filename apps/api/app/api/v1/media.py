@@ -1,24 +1,61 @@
 """Media upload and management API endpoints."""
 
+import json
+import logging
 import os
 from pathlib import Path
+from typing import Literal
+from urllib.parse import urlencode
 from uuid import UUID
 
+import anyio
 from fastapi import APIRouter, File, HTTPException, Request, UploadFile, status
-from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from sqlalchemy import select
 
 from app.api.deps import CurrentUser, DbSession
 from app.config import get_settings
 from app.models.media import MediaFile
-from app.models.project import Project
+from app.models.project import Project, ProjectStatus
 from app.schemas.analysis import WaveformResponse
 from app.schemas.media import (
+    HlsPlaybackResponse,
     MediaFileResponse,
     PresignedUploadRequest,
     PresignedUploadResponse,
     UploadConfirmResponse,
     ProcessVideoOptions,
 )
+from app.services.artifact_store import (
+    EDITING_PROXY,
+    HLS_PACKAGE,
+    PREVIEW_INDEX,
+    PREVIEW_POSTER,
+    PREVIEW_SPRITE,
+    WAVEFORM,
+    get_artifact_store,
+    params_hash,
+    source_hash,
+)
+from app.services.editing_proxy import proxy_params
+from app.services.hls_packager import (
+    MASTER_PLAYLIST,
+    hls_params,
+    is_package_path,
+    sign_playlist,
+)
+from app.services.media_blobs import (
+    ContentHasher,
+    blob_filename,
+    blob_lock_queries,
+    dedup_bytes_total,
+    dedup_requests_total,
+    existing_blob_query,
+)
+from app.services.media_previews import format_sprite_vtt, has_video, preview_params
+from app.services.scratch_space import get_scratch_manager
+from app.services.segment_store import get_segment_store
 from app.services.storage_service import get_storage_service
 from app.services.waveform_generator import get_waveform_generator
 from app.utils.ffmpeg_utils import get_media_duration
@@ -30,9 +67,48 @@ from app.utils.file_utils import (
     validate_file_size,
     validate_magic_bytes,
 )
+from app.utils.security import create_playback_token, verify_token
 
 router = APIRouter()
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+STREAM_CHUNK_SIZE = 256 * 1024
+
+# Preview images never change for a given content and settings; the ETag carries both
+PREVIEW_CACHE_CONTROL = "private, max-age=31536000, immutable"
+# The WebVTT index and HLS playlists embed the caller's token, so they are kept only briefly
+PREVIEW_INDEX_CACHE_CONTROL = "private, max-age=300"
+HLS_PLAYLIST_CACHE_CONTROL = PREVIEW_INDEX_CACHE_CONTROL
+# Segments never change; their storage prefix encodes the content and settings
+HLS_SEGMENT_CACHE_CONTROL = PREVIEW_CACHE_CONTROL
+HLS_CONTENT_TYPES = {
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".m4s": "video/iso.segment",
+    ".mp4": "video/mp4",
+}
+
+
+def _queue_post_processing(media_file: MediaFile) -> None:
+    """Queue a video's previews, HLS package and, if enabled, editing proxy."""
+    if not has_video(media_file):
+        return
+    try:
+        from app.tasks.media_tasks import (
+            generate_editing_proxy,
+            generate_media_previews,
+            package_media_hls,
+        )
+
+        generate_media_previews.delay(str(media_file.id))
+        if settings.hls_enabled:
+            package_media_hls.delay(str(media_file.id))
+        if settings.proxy_enabled:
+            generate_editing_proxy.delay(str(media_file.id))
+    except Exception as e:
+        # Both are optional; the upload itself succeeded
+        logger.warning(f"Failed to queue post-processing for media {media_file.id}: {e}")
 
 
 @router.post(
@@ -47,12 +123,16 @@ async def upload_media(
     file: UploadFile = File(...),
 ):
     """Upload a media file to a project."""
-    # Verify project ownership
+    # Verify project ownership; projects being deleted take no new files
     project = (
-        db.query(Project)
-        .filter(Project.id == project_id, Project.user_id == current_user.id)
-        .first()
-    )
+        await db.execute(
+            select(Project).where(
+                Project.id == project_id,
+                Project.user_id == current_user.id,
+                Project.status != ProjectStatus.DELETING,
+            )
+        )
+    ).scalar_one_or_none()
 
     if not project:
         raise HTTPException(
@@ -85,55 +165,109 @@ async def upload_media(
             },
         )
 
-    # Read file content
-    content = await file.read()
-    file_size = len(content)
+    # Reject oversized uploads early when the size is known
+    if file.size is not None:
+        is_valid, error = validate_file_size(file.size)
+        if not is_valid:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail={
+                    "code": "FILE_TOO_LARGE",
+                    "message": error,
+                },
+            )
+
+    storage = get_storage_service()
+    with get_scratch_manager().job("upload", expected_bytes=file.size or 0) as scratch:
+        # Hash the upload, which the server has already spooled, to find its
+        # content address; copy it to scratch in the same pass for ffprobe
+        hasher = ContentHasher()
+        upload_path = scratch.file(f"upload{Path(original_filename).suffix.lower()}")
+        async with await anyio.open_file(upload_path, "wb") as upload_file:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                hasher.update(chunk)
+
+                # Validate file size
+                is_valid, error = validate_file_size(hasher.size)
+                if not is_valid:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail={
+                            "code": "FILE_TOO_LARGE",
+                            "message": error,
+                        },
+                    )
+                await upload_file.write(chunk)
+
+        content_hash = hasher.hexdigest()
+        stored_filename = blob_filename(content_hash, original_filename)
+
+        # Probe before taking the blob lock, so it is held only for storage work
+        duration = await run_in_threadpool(get_media_duration, upload_path)
+
+        # Lock the blob until the new row is committed, so cleanup cannot delete
+        # it between the lookup (or the write below) and the insert
+        for query in blob_lock_queries(db.get_bind().dialect.name, [stored_filename]):
+            await db.execute(query)
+
+        # Reuse the stored blob if identical content was uploaded before
+        existing = (await db.execute(existing_blob_query(stored_filename))).scalar_one_or_none()
+        if existing is not None and await run_in_threadpool(
+            storage.file_exists, existing.file_path
+        ):
+            dedup_requests_total.inc(result="hit")
+            dedup_bytes_total.inc(hasher.size)
+            file_path = existing.file_path
+        else:
+            dedup_requests_total.inc(result="miss")
+            file_path = await run_in_threadpool(
+                storage.save_local_file, upload_path, stored_filename
+            )
 
-    # Validate file size
-    is_valid, error = validate_file_size(file_size)
-    if not is_valid:
+    # Re-check the project in the insert's transaction. The share lock makes
+    # marking it for deletion wait for this commit, so the deletion task
+    # always sees the new row.
+    locked_project = (
+        await db.execute(
+            select(Project.id)
+            .where(Project.id == project_id, Project.status != ProjectStatus.DELETING)
+            .with_for_update(read=True)
+        )
+    ).scalar_one_or_none()
+    if locked_project is None:
+        if existing is None:
+            # Nothing references the blob just written, and we hold its lock
+            await run_in_threadpool(storage.delete_file, file_path)
         raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            status_code=status.HTTP_404_NOT_FOUND,
             detail={
-                "code": "FILE_TOO_LARGE",
-                "message": error,
+                "code": "NOT_FOUND",
+                "message": "Project not found",
             },
         )
 
     # Validate magic bytes
-    detected_mime = validate_magic_bytes(content[:32])
+    detected_mime = validate_magic_bytes(hasher.header)
     if detected_mime is None:
         # Fall back to extension-based mime type
         detected_mime = get_mime_type(original_filename)
 
-    # Generate stored filename
-    stored_filename = generate_stored_filename(original_filename)
-
-    # Save file
-    storage = get_storage_service()
-    import io
-
-    file_path = storage.save_file(io.BytesIO(content), stored_filename)
-
-    # Get media duration
-    duration = None
-    local_path = storage.get_local_path(stored_filename)
-    if local_path:
-        duration = get_media_duration(local_path)
-
     # Create database record
     media_file = MediaFile(
         project_id=project_id,
         original_filename=original_filename,
         stored_filename=stored_filename,
         file_path=file_path,
-        file_size=file_size,
+        file_size=hasher.size,
         mime_type=detected_mime or "application/octet-stream",
+        content_hash=content_hash,
         duration_seconds=duration,
     )
     db.add(media_file)
-    db.commit()
-    db.refresh(media_file)
+    await db.commit()
+    await db.refresh(media_file)
+
+    _queue_post_processing(media_file)
 
     return MediaFileResponse.model_validate(media_file)
 
@@ -214,27 +348,16 @@ async def confirm_upload(
     )
 
 
-@router.get("/{media_id}/stream")
-async def stream_media(
-    media_id: UUID,
-    request: Request,
-    db: DbSession,
-    token: str | None = None,
-):
-    """Stream a media file with range request support."""
+def _user_id_from_token(token: str | None) -> str:
+    """Authenticate a request by an access token passed as a query parameter."""
     from jose import JWTError, jwt
-    from app.config import get_settings
-    from app.models.user import User
-    
-    settings = get_settings()
-    
-    # Authenticate via query token (for video elements that can't set headers)
+
     if not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail={"code": "UNAUTHORIZED", "message": "Token required"},
         )
-    
+
     try:
         payload = jwt.decode(
             token,
@@ -243,7 +366,7 @@ async def stream_media(
         )
         user_id = payload.get("sub")
         token_type = payload.get("type")
-        
+
         if not user_id or token_type != "access":
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -254,14 +377,36 @@ async def stream_media(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail={"code": "UNAUTHORIZED", "message": "Invalid token"},
         )
-    
+
+    return user_id
+
+
+@router.get("/{media_id}/stream")
+async def stream_media(
+    media_id: UUID,
+    request: Request,
+    db: DbSession,
+    token: str | None = None,
+    variant: Literal["original", "proxy"] = "original",
+):
+    """
+    Stream a media file with range request support.
+
+    ``variant=proxy`` streams the video's editing proxy instead, for fast
+    seeking in the editor; without one the original is streamed. The
+    ``X-Media-Variant`` response header tells which was sent.
+    """
+    # Authenticate via query token (for video elements that can't set headers)
+    user_id = _user_id_from_token(token)
+
     # Get media file with project ownership check
     media_file = (
-        db.query(MediaFile)
-        .join(Project)
-        .filter(MediaFile.id == media_id, Project.user_id == user_id)
-        .first()
-    )
+        await db.execute(
+            select(MediaFile)
+            .join(Project)
+            .where(MediaFile.id == media_id, Project.user_id == user_id)
+        )
+    ).scalar_one_or_none()
 
     if not media_file:
         raise HTTPException(
@@ -272,11 +417,20 @@ async def stream_media(
             },
         )
 
-    # Get local file path
     storage = get_storage_service()
-    local_path = storage.get_local_path(media_file.stored_filename)
+    key = media_file.stored_filename
+    content_type = media_file.mime_type or "video/mp4"
+    served_variant = "original"
+    if variant == "proxy" and has_video(media_file):
+        proxy_key = await run_in_threadpool(
+            get_artifact_store().get_key, source_hash(media_file), EDITING_PROXY, proxy_params()
+        )
+        if proxy_key is not None:
+            key, content_type, served_variant = proxy_key, "video/mp4", "proxy"
 
-    if not local_path or not local_path.exists():
+    file_size = await run_in_threadpool(storage.get_size, key)
+
+    if file_size is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail={
@@ -285,9 +439,6 @@ async def stream_media(
             },
         )
 
-    file_size = local_path.stat().st_size
-    content_type = media_file.mime_type or "video/mp4"
-
     # Handle range requests for video seeking
     range_header = request.headers.get("range")
     
@@ -306,41 +457,28 @@ async def stream_media(
         end = min(end, file_size - 1)
         content_length = end - start + 1
 
-        def iter_file():
-            with open(local_path, "rb") as f:
-                f.seek(start)
-                remaining = content_length
-                while remaining > 0:
-                    chunk_size = min(8192, remaining)
-                    data = f.read(chunk_size)
-                    if not data:
-                        break
-                    remaining -= len(data)
-                    yield data
-
         return StreamingResponse(
-            iter_file(),
+            storage.open_read(
+                key, start, content_length, STREAM_CHUNK_SIZE
+            ),
             status_code=206,
             media_type=content_type,
             headers={
                 "Content-Range": f"bytes {start}-{end}/{file_size}",
                 "Accept-Ranges": "bytes",
                 "Content-Length": str(content_length),
+                "X-Media-Variant": served_variant,
             },
         )
     else:
         # Full file response
-        def iter_full_file():
-            with open(local_path, "rb") as f:
-                while chunk := f.read(8192):
-                    yield chunk
-
         return StreamingResponse(
-            iter_full_file(),
+            storage.open_read(key, 0, file_size, STREAM_CHUNK_SIZE),
             media_type=content_type,
             headers={
                 "Accept-Ranges": "bytes",
                 "Content-Length": str(file_size),
+                "X-Media-Variant": served_variant,
             },
         )
 
@@ -354,11 +492,12 @@ async def get_waveform(
     """Get waveform data for a media file."""
     # Get media file with project ownership check
     media_file = (
-        db.query(MediaFile)
-        .join(Project)
-        .filter(MediaFile.id == media_id, Project.user_id == current_user.id)
-        .first()
-    )
+        await db.execute(
+            select(MediaFile)
+            .join(Project)
+            .where(MediaFile.id == media_id, Project.user_id == current_user.id)
+        )
+    ).scalar_one_or_none()
 
     if not media_file:
         raise HTTPException(
@@ -369,11 +508,28 @@ async def get_waveform(
             },
         )
 
-    # Get local file path
     storage = get_storage_service()
-    local_path = storage.get_local_path(media_file.stored_filename)
+    waveform_gen = get_waveform_generator()
+
+    def generate() -> dict:
+        # Get a local copy of the file (downloaded into the cache for remote storage)
+        local_path = storage.get_local_copy(media_file.stored_filename)
+        if not local_path:
+            raise FileNotFoundError(media_file.stored_filename)
 
-    if not local_path or not local_path.exists():
+        peaks, duration, sample_rate = waveform_gen.generate_from_file(local_path)
+        return {"peaks": peaks, "duration": duration, "sample_rate": sample_rate}
+
+    # Generate waveform, reusing an earlier result for the same content
+    try:
+        waveform = await run_in_threadpool(
+            get_artifact_store().get_or_compute_json,
+            source_hash(media_file),
+            WAVEFORM,
+            {"num_samples": waveform_gen.num_samples},
+            generate,
+        )
+    except FileNotFoundError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail={
@@ -381,17 +537,6 @@ async def get_waveform(
                 "message": "Media file not found on storage",
             },
         )
-
-    # Generate waveform
-    try:
-        waveform_gen = get_waveform_generator()
-        peaks, duration, sample_rate = waveform_gen.generate_from_file(local_path)
-
-        return WaveformResponse(
-            peaks=peaks,
-            duration=duration,
-            sample_rate=sample_rate,
-        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -401,6 +546,221 @@ async def get_waveform(
             },
         )
 
+    return WaveformResponse(**waveform)
+
+
+async def _get_previewable_media(db, media_id: UUID, token: str | None) -> MediaFile:
+    """Get a video the token's user owns, for the preview endpoints."""
+    user_id = _user_id_from_token(token)
+    media_file = (
+        await db.execute(
+            select(MediaFile)
+            .join(Project)
+            .where(MediaFile.id == media_id, Project.user_id == user_id)
+        )
+    ).scalar_one_or_none()
+
+    if not media_file or not has_video(media_file):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "code": "NOT_FOUND",
+                "message": "Media file not found",
+            },
+        )
+    return media_file
+
+
+async def _get_preview_artifact(media_file: MediaFile, artifact_type: str) -> tuple[Path, str]:
+    """Get the local path and ETag of a stored preview artifact."""
+    params = preview_params()
+    content_key = source_hash(media_file)
+    path = await run_in_threadpool(
+        get_artifact_store().get_file, content_key, artifact_type, params
+    )
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "code": "PREVIEW_NOT_READY",
+                "message": "Preview has not been generated yet",
+            },
+        )
+    return path, f'"{content_key[:16]}-{params_hash(params)[:16]}"'
+
+
+async def _preview_image_response(
+    request: Request, media_file: MediaFile, artifact_type: str
+) -> Response:
+    """Serve a preview image with long-lived cache headers."""
+    path, etag = await _get_preview_artifact(media_file, artifact_type)
+    headers = {"Cache-Control": PREVIEW_CACHE_CONTROL, "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return FileResponse(path, media_type="image/jpeg", headers=headers)
+
+
+@router.get("/{media_id}/preview/poster.jpg")
+async def get_preview_poster(
+    media_id: UUID,
+    request: Request,
+    db: DbSession,
+    token: str | None = None,
+):
+    """Get the poster frame of a video."""
+    media_file = await _get_previewable_media(db, media_id, token)
+    return await _preview_image_response(request, media_file, PREVIEW_POSTER)
+
+
+@router.get("/{media_id}/preview/sprite.jpg")
+async def get_preview_sprite(
+    media_id: UUID,
+    request: Request,
+    db: DbSession,
+    token: str | None = None,
+):
+    """Get the sprite sheet of a video's scrubbing thumbnails."""
+    media_file = await _get_previewable_media(db, media_id, token)
+    return await _preview_image_response(request, media_file, PREVIEW_SPRITE)
+
+
+@router.get("/{media_id}/preview/sprite.vtt")
+async def get_preview_sprite_index(
+    media_id: UUID,
+    db: DbSession,
+    token: str | None = None,
+):
+    """
+    Get the WebVTT index of a video's sprite sheet.
+
+    Each cue maps a time range to a tile of ``sprite.jpg``, so a player can
+    show hover-scrubbing thumbnails after fetching the one image.
+    """
+    media_file = await _get_previewable_media(db, media_id, token)
+    path, _ = await _get_preview_artifact(media_file, PREVIEW_INDEX)
+    layout = json.loads(await run_in_threadpool(path.read_text, encoding="utf-8"))
+
+    # Relative to this index, with the token so the player can load it
+    sprite_url = f"sprite.jpg?{urlencode({'token': token})}"
+    return Response(
+        content=format_sprite_vtt(layout, sprite_url),
+        media_type="text/vtt",
+        headers={"Cache-Control": PREVIEW_INDEX_CACHE_CONTROL},
+    )
+
+
+@router.get("/{media_id}/hls", response_model=HlsPlaybackResponse)
+async def get_hls_playback(
+    media_id: UUID,
+    current_user: CurrentUser,
+    db: DbSession,
+):
+    """
+    Get a signed URL of a video's HLS master playlist.
+
+    The URL carries a playback token for this media file only, which the
+    playlists pass on to every variant playlist and segment. Until the
+    package has been generated this returns 404 and players should fall
+    back to ``/stream``.
+    """
+    media_file = (
+        await db.execute(
+            select(MediaFile)
+            .join(Project)
+            .where(MediaFile.id == media_id, Project.user_id == current_user.id)
+        )
+    ).scalar_one_or_none()
+
+    if not media_file or not has_video(media_file):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "code": "NOT_FOUND",
+                "message": "Media file not found",
+            },
+        )
+
+    prefix = await run_in_threadpool(
+        get_artifact_store().get_dir, source_hash(media_file), HLS_PACKAGE, hls_params()
+    )
+    if prefix is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "code": "HLS_NOT_READY",
+                "message": "Adaptive stream has not been generated yet",
+            },
+        )
+
+    token, expires_at = create_playback_token(str(current_user.id), str(media_id), prefix)
+    return HlsPlaybackResponse(
+        playlist_url=(
+            f"/api/v1/media/{media_id}/hls/{MASTER_PLAYLIST}?{urlencode({'token': token})}"
+        ),
+        expires_at=expires_at,
+    )
+
+
+@router.get("/{media_id}/hls/{path:path}")
+async def get_hls_file(
+    media_id: UUID,
+    path: str,
+    token: str | None = None,
+):
+    """
+    Serve a playlist or segment of a video's HLS package.
+
+    Authorized by the playback token alone, without a database lookup, so
+    a player's stream of segment requests stays cheap. Segments never
+    change and are cached for good; playlists are re-signed with the token.
+
+    Revoking access does not invalidate issued tokens. They are short-lived
+    (``PLAYBACK_TOKEN_EXPIRE_MINUTES``, refreshed through ``/hls``), and
+    deleting the package, which media cleanup does once no media file uses
+    its content, is the only way to stop them sooner.
+    """
+    payload = verify_token(token, "playback") if token else None
+    if not payload or payload.get("media_id") != str(media_id):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail={"code": "UNAUTHORIZED", "message": "Invalid playback token"},
+        )
+
+    if not is_package_path(path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"code": "NOT_FOUND", "message": "File not found"},
+        )
+
+    storage = get_storage_service()
+    key = payload["prefix"] + path
+    content_type = HLS_CONTENT_TYPES[Path(path).suffix]
+
+    if path.endswith(".m3u8"):
+        playlist = await run_in_threadpool(storage.get_file, key)
+        if playlist is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={"code": "NOT_FOUND", "message": "File not found"},
+            )
+        return Response(
+            content=sign_playlist(playlist.decode("utf-8"), token),
+            media_type=content_type,
+            headers={"Cache-Control": HLS_PLAYLIST_CACHE_CONTROL},
+        )
+
+    size = await run_in_threadpool(storage.get_size, key)
+    if size is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"code": "NOT_FOUND", "message": "File not found"},
+        )
+    return StreamingResponse(
+        storage.open_read(key, 0, size, STREAM_CHUNK_SIZE),
+        media_type=content_type,
+        headers={"Cache-Control": HLS_SEGMENT_CACHE_CONTROL, "Content-Length": str(size)},
+    )
+
 
 @router.post("/{media_id}/process-video", response_model=MediaFileResponse)
 async def process_video(
@@ -420,7 +780,7 @@ async def process_video(
     import uuid as uuid_module
     
     # Get media file and verify ownership
-    media_file = db.query(MediaFile).filter(MediaFile.id == media_id).first()
+    media_file = await db.get(MediaFile, media_id)
     
     if not media_file:
         raise HTTPException(
@@ -430,10 +790,14 @@ async def process_video(
     
     # Verify project ownership
     project = (
-        db.query(Project)
-        .filter(Project.id == media_file.project_id, Project.user_id == current_user.id)
-        .first()
-    )
+        await db.execute(
+            select(Project).where(
+                Project.id == media_file.project_id,
+                Project.user_id == current_user.id,
+                Project.status != ProjectStatus.DELETING,
+            )
+        )
+    ).scalar_one_or_none()
     
     if not project:
         raise HTTPException(
@@ -443,16 +807,23 @@ async def process_video(
     
     # Get the latest completed analysis for this media file
     analysis = (
-        db.query(AnalysisResult)
-        .filter(
-            AnalysisResult.media_file_id == media_id,
-            AnalysisResult.status == AnalysisStatus.COMPLETED,
+        await db.execute(
+            select(AnalysisResult)
+            .where(
+                AnalysisResult.media_file_id == media_id,
+                AnalysisResult.status == AnalysisStatus.COMPLETED,
+            )
+            .order_by(AnalysisResult.completed_at.desc())
+            .limit(1)
         )
-        .order_by(AnalysisResult.completed_at.desc())
-        .first()
-    )
+    ).scalar_one_or_none()
     
-    if not analysis or not analysis.segments:
+    segment_count = 0
+    if analysis:
+        segment_count = await db.run_sync(
+            lambda session: get_segment_store(session).count(analysis.id)
+        )
+    if not segment_count:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail={
@@ -461,11 +832,12 @@ async def process_video(
             },
         )
     
-    # Get the source file path
+    # Get the source file path; renders always cut the original, never the editing proxy
     storage = get_storage_service()
-    source_path = storage.get_local_path(media_file.stored_filename)
+    # Remote sources are downloaded first; keep that off the event loop
+    source_path = await run_in_threadpool(storage.get_local_copy, media_file.stored_filename)
     
-    if not source_path or not source_path.exists():
+    if not source_path:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail={"code": "FILE_NOT_FOUND", "message": "Source video file not found"},
@@ -483,23 +855,18 @@ async def process_video(
     
     # Calculate segments to remove based on options
     # Segments in analysis have: type, start_ms, end_ms, filler_word (optional)
-    segments_to_remove = []
-    
+    removed_types = []
     if options.silence_removal:
-        silence_segments = [
-            (seg["start_ms"] / 1000, seg["end_ms"] / 1000)
-            for seg in analysis.segments
-            if seg.get("type") == "silence"
-        ]
-        segments_to_remove.extend(silence_segments)
-    
+        removed_types.append("silence")
     if options.filler_word_filter:
-        filler_segments = [
-            (seg["start_ms"] / 1000, seg["end_ms"] / 1000)
-            for seg in analysis.segments
-            if seg.get("type") == "filler"
-        ]
-        segments_to_remove.extend(filler_segments)
+        removed_types.append("filler")
+
+    removed_segments = await db.run_sync(
+        lambda session: get_segment_store(session).list_segments(analysis.id, types=removed_types)
+    )
+    segments_to_remove = [
+        (seg["start_ms"] / 1000, seg["end_ms"] / 1000) for seg in removed_segments
+    ]
     
     if not segments_to_remove:
         processing_types = []
@@ -569,39 +936,43 @@ async def process_video(
         output_original_name = f"{original_name}_processed_{suffix}"
     
     output_stored_name = f"processed/{uuid_module.uuid4()}_{output_original_name}"
-    output_path = Path(settings.upload_dir) / output_stored_name
     
-    # Ensure the processed directory exists
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    # Render into a scratch directory, then hand the file to storage
+    with get_scratch_manager().job("render", expected_bytes=media_file.file_size) as scratch:
+        output_path = scratch.file(Path(output_stored_name).name)
     
-    # Process the video
-    try:
-        cut_segments_from_video(source_path, output_path, segments_to_keep)
-    except FFmpegError as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={
-                "code": "PROCESSING_FAILED",
-                "message": f"Failed to process video: {str(e)}",
-            },
-        )
+        # Process the video
+        try:
+            cut_segments_from_video(source_path, output_path, segments_to_keep)
+        except FFmpegError as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail={
+                    "code": "PROCESSING_FAILED",
+                    "message": f"Failed to process video: {str(e)}",
+                },
+            )
+    
+        # Get the new file size and duration
+        new_file_size = output_path.stat().st_size
+        new_duration = get_media_duration(output_path)
     
-    # Get the new file size and duration
-    new_file_size = output_path.stat().st_size
-    new_duration = get_media_duration(output_path)
+        output_file_path = storage.save_local_file(output_path, output_stored_name)
     
     # Create new media file record for the processed video
     new_media_file = MediaFile(
         project_id=media_file.project_id,
         original_filename=output_original_name,
         stored_filename=output_stored_name,
-        file_path=str(output_path),
+        file_path=output_file_path,
         file_size=new_file_size,
         mime_type=media_file.mime_type,
         duration_seconds=new_duration,
     )
     db.add(new_media_file)
-    db.commit()
-    db.refresh(new_media_file)
+    await db.commit()
+    await db.refresh(new_media_file)
+
+    _queue_post_processing(new_media_file)
     
     return MediaFileResponse.model_validate(new_media_file)
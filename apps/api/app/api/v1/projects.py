@@ -3,16 +3,19 @@
 import logging
 import math
 import uuid as uuid_lib
-from io import BytesIO
-from typing import Optional
+from typing import List, Literal, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, File, HTTPException, Query, UploadFile, status
-from sqlalchemy import func
-from sqlalchemy.orm import joinedload
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, func, select, tuple_
+from sqlalchemy.orm import load_only, selectinload
 
 from app.api.deps import CurrentUser, DbSession
 from app.services.storage_service import get_storage_service
+from app.models.analysis import AnalysisResult
+from app.models.analysis_segment import AnalysisSegment
 from app.models.media import MediaFile
 from app.models.project import Project, ProjectStatus
 from app.schemas.auth import MessageResponse
@@ -24,12 +27,29 @@ from app.schemas.project import (
     ProjectUpdate,
     ProjectWithMediaResponse,
 )
+from app.utils.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    estimate_count,
+)
 
 router = APIRouter()
 
 storage_service = get_storage_service()
 logger = logging.getLogger(__name__)
 
+THUMBNAIL_CHUNK_SIZE = 256 * 1024
+
+
+def _visible_project(project_id: UUID, user_id: UUID):
+    """Filter for a user's project that is not being deleted."""
+    return and_(
+        Project.id == project_id,
+        Project.user_id == user_id,
+        Project.status != ProjectStatus.DELETING,
+    )
+
 
 def _get_thumbnail_url(project: Project) -> Optional[str]:
     """Get the thumbnail URL for a project."""
@@ -61,9 +81,111 @@ def _project_to_response(project: Project) -> ProjectResponse:
     )
 
 
-def _project_with_media_to_response(project: Project) -> ProjectWithMediaResponse:
+async def _media_summaries(
+    db: DbSession,
+    media_files: List[MediaFile],
+    latest_only: bool = True,
+) -> list:
+    """
+    Build media file summaries with analysis metadata and counts.
+
+    Only the columns needed for the summary are selected; analysis payloads
+    (segments, transcription, filler words) are left for the analysis
+    endpoints to load on demand.
+    """
+    from app.schemas.project import AnalysisBasicResponse, MediaFileWithAnalysisResponse
+
+    media_ids = [mf.id for mf in media_files]
+    if not media_ids:
+        return []
+
+    analysis_columns = load_only(
+        AnalysisResult.id,
+        AnalysisResult.media_file_id,
+        AnalysisResult.processing_mode,
+        AnalysisResult.status,
+        AnalysisResult.created_at,
+        AnalysisResult.completed_at,
+    )
+    query = select(AnalysisResult).options(analysis_columns)
+
+    if latest_only:
+        ranked = (
+            select(
+                AnalysisResult.id,
+                func.row_number()
+                .over(
+                    partition_by=AnalysisResult.media_file_id,
+                    order_by=AnalysisResult.created_at.desc(),
+                )
+                .label("rank"),
+            )
+            .where(AnalysisResult.media_file_id.in_(media_ids))
+            .subquery()
+        )
+        query = query.join(ranked, ranked.c.id == AnalysisResult.id).where(ranked.c.rank == 1)
+    else:
+        query = query.where(AnalysisResult.media_file_id.in_(media_ids))
+
+    analyses = (
+        await db.execute(query.order_by(AnalysisResult.created_at.desc()))
+    ).scalars().all()
+
+    analysis_counts = dict(
+        (
+            await db.execute(
+                select(AnalysisResult.media_file_id, func.count())
+                .where(AnalysisResult.media_file_id.in_(media_ids))
+                .group_by(AnalysisResult.media_file_id)
+            )
+        ).all()
+    )
+    segment_counts = {}
+    if analyses:
+        segment_counts = dict(
+            (
+                await db.execute(
+                    select(AnalysisSegment.analysis_id, func.count())
+                    .where(AnalysisSegment.analysis_id.in_([a.id for a in analyses]))
+                    .group_by(AnalysisSegment.analysis_id)
+                )
+            ).all()
+        )
+
+    analyses_by_media = {media_id: [] for media_id in media_ids}
+    for analysis in analyses:
+        analyses_by_media[analysis.media_file_id].append(
+            AnalysisBasicResponse(
+                id=analysis.id,
+                processing_mode=analysis.processing_mode,
+                status=analysis.status,
+                created_at=analysis.created_at,
+                completed_at=analysis.completed_at,
+                segment_count=segment_counts.get(analysis.id, 0),
+            )
+        )
+
+    return [
+        MediaFileWithAnalysisResponse(
+            id=mf.id,
+            original_filename=mf.original_filename,
+            file_size=mf.file_size,
+            mime_type=mf.mime_type,
+            duration_seconds=mf.duration_seconds,
+            created_at=mf.created_at,
+            analysis_count=analysis_counts.get(mf.id, 0),
+            analysis_results=analyses_by_media[mf.id],
+        )
+        for mf in media_files
+    ]
+
+
+def _project_with_media_to_response(
+    project: Project,
+    media_files: list,
+) -> ProjectWithMediaResponse:
     """Convert a Project model to ProjectWithMediaResponse with thumbnail URL."""
-    from app.schemas.project import MediaFileWithAnalysisResponse, ProcessingOptions
+    from app.schemas.project import ProcessingOptions
     
     processing_opts = None
     if project.processing_options:
@@ -79,7 +201,7 @@ def _project_with_media_to_response(project: Project) -> ProjectWithMediaRespons
         processing_options=processing_opts,
         created_at=project.created_at,
         updated_at=project.updated_at,
-        media_files=[MediaFileWithAnalysisResponse.model_validate(mf) for mf in project.media_files],
+        media_files=media_files,
     )
 
 
@@ -90,31 +212,74 @@ async def list_projects(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
     status: Optional[ProjectStatus] = None,
+    cursor: Optional[str] = None,
+    total: Literal["exact", "estimated", "none"] = "exact",
 ):
-    """List all projects for the current user."""
-    query = db.query(Project).filter(Project.user_id == current_user.id)
+    """
+    List all projects for the current user, newest first.
+
+    Pass the ``next_cursor`` of a page as ``cursor`` to fetch the next one;
+    this seeks on the (user_id, created_at, id) index instead of skipping
+    rows. ``page`` without a cursor still works but gets slower the deeper
+    it goes. ``total`` picks an exact count, a planner estimate, or none.
+    """
+    query = select(Project).where(
+        Project.user_id == current_user.id, Project.status != ProjectStatus.DELETING
+    )
 
     if status:
-        query = query.filter(Project.status == status)
+        query = query.where(Project.status == status)
 
     # Get total count
-    total = query.count()
+    total_count = None
+    total_is_estimate = False
+    if total == "estimated":
+        total_count = await estimate_count(db, query)
+        total_is_estimate = total_count is not None
+    if total == "exact" or (total == "estimated" and total_count is None):
+        total_count = (
+            await db.execute(select(func.count()).select_from(query.subquery()))
+        ).scalar_one()
+
+    ordered = query.order_by(Project.created_at.desc(), Project.id.desc())
+    if cursor:
+        try:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+        except InvalidCursorError:
+            raise HTTPException(
+                # "status" is the filter parameter here, not the module
+                status_code=400,
+                detail={
+                    "code": "VALIDATION_ERROR",
+                    "message": "Invalid pagination cursor",
+                },
+            )
+        ordered = ordered.where(
+            tuple_(Project.created_at, Project.id) < tuple_(cursor_created_at, cursor_id)
+        )
+    elif page > 1:
+        ordered = ordered.offset((page - 1) * limit)
 
-    # Apply pagination
-    offset = (page - 1) * limit
-    projects = (
-        query.order_by(Project.created_at.desc()).offset(offset).limit(limit).all()
-    )
+    # Fetch one extra row to know whether there is a next page
+    projects = (await db.execute(ordered.limit(limit + 1))).scalars().all()
+    next_cursor = None
+    if len(projects) > limit:
+        projects = projects[:limit]
+        next_cursor = encode_cursor(projects[-1].created_at, projects[-1].id)
 
-    total_pages = math.ceil(total / limit) if total > 0 else 1
+    total_pages = None
+    if total_count is not None:
+        total_pages = math.ceil(total_count / limit) if total_count > 0 else 1
 
     return ProjectListResponse(
         projects=[_project_to_response(p) for p in projects],
         pagination=PaginationMeta(
             page=page,
             limit=limit,
-            total=total,
+            total=total_count,
             total_pages=total_pages,
+            total_is_estimate=total_is_estimate,
+            next_cursor=next_cursor,
         ),
     )
 
@@ -137,8 +302,8 @@ async def create_project(
         processing_options=processing_options,
     )
     db.add(project)
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project)
 
     return _project_to_response(project)
 
@@ -148,16 +313,21 @@ async def get_project(
     project_id: UUID,
     current_user: CurrentUser,
     db: DbSession,
+    analyses: Literal["latest", "all"] = "latest",
 ):
-    """Get a project with its media files and analysis results."""
+    """
+    Get a project with its media files and analysis summaries.
+
+    By default each media file lists only its latest analysis; pass
+    ``analyses=all`` to list every analysis.
+    """
     project = (
-        db.query(Project)
-        .options(
-            joinedload(Project.media_files).joinedload(MediaFile.analysis_results)
+        await db.execute(
+            select(Project)
+            .options(selectinload(Project.media_files))
+            .where(_visible_project(project_id, current_user.id))
         )
-        .filter(Project.id == project_id, Project.user_id == current_user.id)
-        .first()
-    )
+    ).scalar_one_or_none()
 
     if not project:
         raise HTTPException(
@@ -168,7 +338,8 @@ async def get_project(
             },
         )
 
-    return _project_with_media_to_response(project)
+    media_files = await _media_summaries(db, project.media_files, latest_only=analyses == "latest")
+    return _project_with_media_to_response(project, media_files)
 
 
 @router.patch("/{project_id}", response_model=ProjectResponse)
@@ -180,10 +351,10 @@ async def update_project(
 ):
     """Update a project."""
     project = (
-        db.query(Project)
-        .filter(Project.id == project_id, Project.user_id == current_user.id)
-        .first()
-    )
+        await db.execute(
+            select(Project).where(_visible_project(project_id, current_user.id))
+        )
+    ).scalar_one_or_none()
 
     if not project:
         raise HTTPException(
@@ -201,25 +372,29 @@ async def update_project(
     if data.status is not None:
         project.status = data.status
 
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project)
 
     return _project_to_response(project)
 
 
-@router.delete("/{project_id}", response_model=MessageResponse)
+@router.delete(
+    "/{project_id}", response_model=MessageResponse, status_code=status.HTTP_202_ACCEPTED
+)
 async def delete_project(
     project_id: UUID,
     current_user: CurrentUser,
     db: DbSession,
 ):
-    """Delete a project and all associated files."""
+    """
+    Delete a project and all associated files.
+
+    The project is marked as deleting and disappears from the API at once;
+    its files and rows are removed in batches by a background task.
+    """
     project = (
-        db.query(Project)
-        .options(joinedload(Project.media_files))
-        .filter(Project.id == project_id, Project.user_id == current_user.id)
-        .first()
-    )
+        await db.execute(select(Project).where(_visible_project(project_id, current_user.id)))
+    ).scalar_one_or_none()
 
     if not project:
         raise HTTPException(
@@ -230,27 +405,18 @@ async def delete_project(
             },
         )
 
-    # Delete thumbnail file if exists
-    if project.thumbnail_path:
-        try:
-            storage_service.delete_file(project.thumbnail_path)
-        except Exception as e:
-            # Log error but don't fail the deletion
-            logger.warning(f"Failed to delete thumbnail {project.thumbnail_path}: {e}")
+    project.status = ProjectStatus.DELETING
+    await db.commit()
 
-    # Delete all media files
-    for media_file in project.media_files:
-        try:
-            storage_service.delete_file(media_file.file_path)
-        except Exception as e:
-            # Log error but don't fail the deletion
-            logger.warning(f"Failed to delete media file {media_file.file_path}: {e}")
+    try:
+        from app.tasks.analysis_tasks import delete_project_files
 
-    # Delete the project (this will cascade delete media_files and analysis_results due to relationships)
-    db.delete(project)
-    db.commit()
+        delete_project_files.delay(str(project_id))
+    except Exception as e:
+        # The periodic cleanup re-queues deletions that never started
+        logger.warning(f"Failed to queue deletion of project {project_id}: {e}")
 
-    return MessageResponse(message="Project deleted successfully")
+    return MessageResponse(message="Project deletion started")
 
 
 @router.post("/{project_id}/thumbnail", response_model=ProjectResponse)
@@ -262,10 +428,10 @@ async def upload_thumbnail(
 ):
     """Upload a thumbnail image for a project."""
     project = (
-        db.query(Project)
-        .filter(Project.id == project_id, Project.user_id == current_user.id)
-        .first()
-    )
+        await db.execute(
+            select(Project).where(_visible_project(project_id, current_user.id))
+        )
+    ).scalar_one_or_none()
 
     if not project:
         raise HTTPException(
@@ -288,20 +454,21 @@ async def upload_thumbnail(
 
     # Delete old thumbnail if exists
     if project.thumbnail_path:
-        storage_service.delete_file(project.thumbnail_path)
+        await run_in_threadpool(storage_service.delete_file, project.thumbnail_path)
 
     # Generate unique filename
     ext = file.filename.split(".")[-1] if file.filename and "." in file.filename else "jpg"
     filename = f"thumbnails/{project_id}_{uuid_lib.uuid4().hex[:8]}.{ext}"
 
-    # Save file
-    contents = await file.read()
-    storage_service.save_file(BytesIO(contents), filename)
+    # Stream the image to storage
+    async with storage_service.open_write(filename) as writer:
+        while chunk := await file.read(THUMBNAIL_CHUNK_SIZE):
+            await writer.write(chunk)
 
     # Update project
     project.thumbnail_path = filename
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project)
 
     return _project_to_response(project)
 
@@ -313,13 +480,11 @@ async def get_thumbnail(
     db: DbSession,
 ):
     """Get the thumbnail image for a project."""
-    from fastapi.responses import Response
-
     project = (
-        db.query(Project)
-        .filter(Project.id == project_id, Project.user_id == current_user.id)
-        .first()
-    )
+        await db.execute(
+            select(Project).where(_visible_project(project_id, current_user.id))
+        )
+    ).scalar_one_or_none()
 
     if not project:
         raise HTTPException(
@@ -339,8 +504,8 @@ async def get_thumbnail(
             },
         )
 
-    contents = storage_service.get_file(project.thumbnail_path)
-    if not contents:
+    size = await run_in_threadpool(storage_service.get_size, project.thumbnail_path)
+    if not size:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail={
@@ -359,4 +524,8 @@ async def get_thumbnail(
         "webp": "image/webp",
     }.get(ext, "image/jpeg")
 
-    return Response(content=contents, media_type=content_type)
+    return StreamingResponse(
+        storage_service.open_read(project.thumbnail_path, 0, size, THUMBNAIL_CHUNK_SIZE),
+        media_type=content_type,
+        headers={"Content-Length": str(size)},
+    )
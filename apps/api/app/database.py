@@ -1,21 +1,84 @@
 """Database configuration and session management."""
 
+import time
+
 from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.config import get_settings
+from app.utils.metrics import get_metrics
 
 settings = get_settings()
+metrics = get_metrics()
+
+pool_wait_seconds = metrics.histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting to check out an API database connection",
+)
+pool_timeouts_total = metrics.counter(
+    "db_pool_timeouts_total",
+    "API database connection checkouts that timed out",
+)
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that records how long checkouts wait for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            pool_timeouts_total.inc()
+            raise
+        finally:
+            pool_wait_seconds.observe(time.perf_counter() - started)
+
 
+# Sync engine, used by Celery tasks and migrations
 engine = create_engine(
     settings.database_url,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout_seconds,
+    pool_recycle=settings.db_pool_recycle_seconds,
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine, used by the API so queries do not block the event loop
+async_engine = create_async_engine(
+    settings.async_database_url,
+    poolclass=TimedAsyncQueuePool,
+    pool_pre_ping=True,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout_seconds,
+    pool_recycle=settings.db_pool_recycle_seconds,
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+metrics.gauge(
+    "db_pool_checked_out",
+    "API database connections currently checked out",
+    lambda: async_engine.pool.checkedout(),
+)
+metrics.gauge(
+    "db_pool_size",
+    "API database connections held by the pool",
+    lambda: async_engine.pool.size() + max(async_engine.pool.overflow(), 0),
+)
+
 
 class Base(DeclarativeBase):
     """Base class for all database models."""
@@ -23,10 +86,7 @@ class Base(DeclarativeBase):
     pass
 
 
-def get_db():
-    """Dependency to get database session."""
-    db = SessionLocal()
-    try:
+async def get_db():
+    """Dependency to get an async database session."""
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
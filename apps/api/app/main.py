@@ -2,11 +2,15 @@
 
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.api.v1.router import api_router
 from app.config import get_settings
+from app.database import async_engine
+from app.utils.metrics import get_metrics
+from app.utils.security import PasswordPoolSaturatedError
 
 settings = get_settings()
 
@@ -19,7 +23,7 @@ async def lifespan(app: FastAPI):
     os.makedirs(settings.upload_dir, exist_ok=True)
     yield
     # Shutdown
-    pass
+    await async_engine.dispose()
 
 
 app = FastAPI(
@@ -41,6 +45,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.exception_handler(PasswordPoolSaturatedError)
+async def password_pool_saturated_handler(request: Request, exc: PasswordPoolSaturatedError):
+    """Shed password work beyond the hashing pool's queue limit."""
+    return JSONResponse(
+        status_code=429,
+        content={
+            "detail": {
+                "code": "RATE_LIMITED",
+                "message": "Too many sign-in requests in progress. Please retry shortly.",
+            }
+        },
+        headers={"Retry-After": "1"},
+    )
+
+
 # Include API router
 app.include_router(api_router, prefix=f"/api/{settings.api_version}")
 
@@ -49,3 +69,9 @@ app.include_router(api_router, prefix=f"/api/{settings.api_version}")
 async def health_check():
     """Health check endpoint."""
     return {"status": "healthy", "version": settings.api_version}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """Expose process metrics in the Prometheus text format."""
+    return PlainTextResponse(get_metrics().render())
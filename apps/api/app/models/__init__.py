@@ -1,9 +1,19 @@
 """Database models package."""
 
 from app.models.analysis import AnalysisResult
+from app.models.analysis_segment import AnalysisSegment
+from app.models.derived_artifact import DerivedArtifact
 from app.models.media import MediaFile
 from app.models.project import Project
 from app.models.refresh_token import RefreshToken
 from app.models.user import User
 
-__all__ = ["User", "Project", "MediaFile", "AnalysisResult", "RefreshToken"]
+__all__ = [
+    "User",
+    "Project",
+    "MediaFile",
+    "AnalysisResult",
+    "AnalysisSegment",
+    "DerivedArtifact",
+    "RefreshToken",
+]
@@ -3,15 +3,16 @@
 import enum
 import uuid
 from datetime import datetime
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, List, Optional
 
-from sqlalchemy import DateTime, Enum, ForeignKey, Integer, String, Text, func
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
 
 if TYPE_CHECKING:
+    from app.models.analysis_segment import AnalysisSegment
     from app.models.media import MediaFile
 
 
@@ -35,6 +36,10 @@ class AnalysisResult(Base):
     """Analysis result model for storing audio analysis data."""
 
     __tablename__ = "analysis_results"
+    # Serves lookups by media file and the latest analysis per media file
+    __table_args__ = (
+        Index("ix_analysis_results_media_file_id_created_at", "media_file_id", "created_at"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -50,9 +55,20 @@ class AnalysisResult(Base):
     status: Mapped[AnalysisStatus] = mapped_column(
         Enum(AnalysisStatus), default=AnalysisStatus.PENDING
     )
-    segments: Mapped[Optional[list]] = mapped_column(JSONB, nullable=True)
-    transcription: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    filler_words_detected: Mapped[Optional[list]] = mapped_column(JSONB, nullable=True)
+    # Heavy payload columns are deferred so listing and status queries stay
+    # small; get_analysis undefers the "results" group in one query and the
+    # rest load on first access
+    raw_segments: Mapped[Optional[list]] = mapped_column(JSONB, nullable=True, deferred=True)
+    processing_params: Mapped[Optional[dict]] = mapped_column(
+        JSONB, nullable=True, deferred=True
+    )
+    transcription: Mapped[Optional[str]] = mapped_column(
+        Text, nullable=True, deferred=True, deferred_group="results"
+    )
+    filler_words_detected: Mapped[Optional[list]] = mapped_column(
+        JSONB, nullable=True, deferred=True, deferred_group="results"
+    )
+    checkpoints: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True, deferred=True)
     processing_time_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     error_message: Mapped[Optional[str]] = mapped_column(String(1000), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
@@ -66,6 +82,14 @@ class AnalysisResult(Base):
     media_file: Mapped["MediaFile"] = relationship(
         "MediaFile", back_populates="analysis_results"
     )
+    # Loaded on access; use the segment store for time-window queries
+    segment_rows: Mapped[List["AnalysisSegment"]] = relationship(
+        "AnalysisSegment",
+        back_populates="analysis",
+        order_by="AnalysisSegment.position",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
 
     def __repr__(self) -> str:
         return f"<AnalysisResult {self.id} - {self.status}>"
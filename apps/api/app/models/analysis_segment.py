@@ -0,0 +1,42 @@
+"""Analysis segment database model."""
+
+import uuid
+from typing import TYPE_CHECKING, Optional
+
+from sqlalchemy import Float, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.database import Base
+
+if TYPE_CHECKING:
+    from app.models.analysis import AnalysisResult
+
+
+class AnalysisSegment(Base):
+    """Processed segment of an analysis, one row per segment."""
+
+    __tablename__ = "analysis_segments"
+    __table_args__ = (Index("ix_analysis_segments_analysis_start", "analysis_id", "start_ms"),)
+
+    analysis_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("analysis_results.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    position: Mapped[int] = mapped_column(Integer, primary_key=True)
+    start_ms: Mapped[int] = mapped_column(Integer, nullable=False)
+    end_ms: Mapped[int] = mapped_column(Integer, nullable=False)
+    type: Mapped[str] = mapped_column(String(20), nullable=False)
+    confidence: Mapped[float] = mapped_column(Float, nullable=False)
+    text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    filler_word: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    classification: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
+
+    # Relationships
+    analysis: Mapped["AnalysisResult"] = relationship(
+        "AnalysisResult", back_populates="segment_rows"
+    )
+
+    def __repr__(self) -> str:
+        return f"<AnalysisSegment {self.analysis_id}#{self.position}>"
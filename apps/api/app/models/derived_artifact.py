@@ -0,0 +1,40 @@
+"""Derived artifact database model."""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Index, String, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class DerivedArtifact(Base):
+    """Stored result of an expensive computation over media content."""
+
+    __tablename__ = "derived_artifacts"
+    __table_args__ = (
+        UniqueConstraint(
+            "content_hash", "artifact_type", "params_hash", name="uq_derived_artifacts_key"
+        ),
+        Index("ix_derived_artifacts_last_accessed_at", "last_accessed_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    artifact_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    params_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    storage_key: Mapped[str] = mapped_column(String(1000), nullable=False)
+    size_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    last_accessed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+    def __repr__(self) -> str:
+        return f"<DerivedArtifact {self.artifact_type} {self.content_hash[:12]}>"
@@ -5,7 +5,7 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING, List, Optional
 
-from sqlalchemy import DateTime, Enum, ForeignKey, String, func
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, String, func
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -23,12 +23,16 @@ class ProjectStatus(str, enum.Enum):
     PROCESSING = "processing"
     COMPLETED = "completed"
     FAILED = "failed"
+    # Hidden from the API while a background task deletes its files and rows
+    DELETING = "deleting"
 
 
 class Project(Base):
     """Project model for organizing media files."""
 
     __tablename__ = "projects"
+    # Serves per-user listing in created_at order and keyset pagination
+    __table_args__ = (Index("ix_projects_user_id_created_at", "user_id", "created_at", "id"),)
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -29,6 +29,43 @@ class SegmentResponse(BaseModel):
     confidence: float
     text: Optional[str] = None
     filler_word: Optional[str] = None
+    classification: Optional[Literal["keep", "remove", "suggest_remove"]] = None
+
+
+class ClassificationOverride(BaseModel):
+    """Schema for an editor override of the segment covering a point in time."""
+
+    at_ms: int = Field(..., ge=0)
+    classification: Literal["keep", "remove", "suggest_remove"]
+
+
+class AnalysisReprocessRequest(BaseModel):
+    """Schema for re-running segment post-processing with new parameters."""
+
+    min_silence_duration_ms: Optional[int] = Field(None, ge=100, le=5000)
+    min_speech_duration_ms: Optional[int] = Field(None, ge=100, le=5000)
+    merge_threshold_ms: Optional[int] = Field(None, ge=0, le=5000)
+    speech_padding_ms: Optional[int] = Field(None, ge=0, le=2000)
+    classification_overrides: Optional[List[ClassificationOverride]] = None
+
+
+class SegmentDiffHunk(BaseModel):
+    """Schema for a changed range: old[old_start:old_end] becomes segments."""
+
+    old_start: int
+    old_end: int
+    new_start: int
+    new_end: int
+    segments: List[SegmentResponse]
+
+
+class AnalysisReprocessResponse(BaseModel):
+    """Schema for segment re-processing response."""
+
+    analysis_id: UUID
+    segment_count: int
+    processing_params: dict
+    changes: List[SegmentDiffHunk]
 
 
 class FillerWordDetection(BaseModel):
@@ -58,6 +95,15 @@ class AnalysisResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class SegmentRangeResponse(BaseModel):
+    """Schema for the segments of an analysis within a time window."""
+
+    analysis_id: UUID
+    start_ms: Optional[int] = None
+    end_ms: Optional[int] = None
+    segments: List[SegmentResponse]
+
+
 class AnalysisStatusResponse(BaseModel):
     """Schema for lightweight analysis status check."""
 
@@ -22,6 +22,7 @@ class MediaFileResponse(BaseModel):
     stored_filename: str
     file_size: int
     mime_type: str
+    content_hash: Optional[str] = None
     duration_seconds: Optional[float] = None
     created_at: datetime
 
@@ -47,3 +48,10 @@ class UploadConfirmResponse(BaseModel):
     """Schema for upload confirmation response."""
 
     media_file: MediaFileResponse
+
+
+class HlsPlaybackResponse(BaseModel):
+    """Schema for HLS playback of a media file."""
+
+    playlist_url: str
+    expires_at: datetime
@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 from app.models.project import ProjectStatus
 
@@ -31,6 +31,14 @@ class ProjectUpdate(BaseModel):
     description: Optional[str] = Field(None, max_length=1000)
     status: Optional[ProjectStatus] = None
 
+    @field_validator("status")
+    @classmethod
+    def status_not_deleting(cls, v: Optional[ProjectStatus]) -> Optional[ProjectStatus]:
+        """Projects are only marked as deleting by deleting them."""
+        if v == ProjectStatus.DELETING:
+            raise ValueError("Use DELETE to delete a project")
+        return v
+
 
 class ProjectResponse(BaseModel):
     """Schema for project response."""
@@ -69,6 +77,7 @@ class AnalysisBasicResponse(BaseModel):
     status: str
     created_at: datetime
     completed_at: Optional[datetime] = None
+    segment_count: Optional[int] = None
 
     model_config = {"from_attributes": True}
 
@@ -82,6 +91,7 @@ class MediaFileWithAnalysisResponse(BaseModel):
     mime_type: str
     duration_seconds: Optional[float] = None
     created_at: datetime
+    analysis_count: int = 0
     analysis_results: List[AnalysisBasicResponse] = []
 
     model_config = {"from_attributes": True}
@@ -109,8 +119,10 @@ class PaginationMeta(BaseModel):
 
     page: int
     limit: int
-    total: int
-    total_pages: int
+    total: Optional[int] = None
+    total_pages: Optional[int] = None
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
 
 
 class ProjectListResponse(BaseModel):
@@ -0,0 +1,459 @@
+"""Memoized storage for artifacts derived from media content."""
+
+import fcntl
+import hashlib
+import io
+import json
+import logging
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.derived_artifact import DerivedArtifact
+from app.models.media import MediaFile
+from app.services.scratch_space import ScratchManager, get_scratch_manager
+from app.services.storage_service import StorageService, get_storage_service
+from app.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+metrics = get_metrics()
+
+artifact_requests_total = metrics.counter(
+    "artifact_requests_total",
+    "Derived artifact lookups by artifact type and result",
+)
+artifact_compute_seconds = metrics.histogram(
+    "artifact_compute_seconds",
+    "Time to compute a derived artifact on a miss",
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+artifact_evictions_total = metrics.counter(
+    "artifact_evictions_total",
+    "Derived artifacts evicted to keep the store under its size cap",
+)
+
+ARTIFACT_PREFIX = "artifacts"
+
+# Artifact types produced by the pipeline
+AUDIO_PCM = "audio_pcm"
+VAD_SEGMENTS = "vad_segments"
+WAVEFORM = "waveform"
+PREVIEW_POSTER = "preview_poster"
+PREVIEW_SPRITE = "preview_sprite"
+PREVIEW_INDEX = "preview_index"
+HLS_PACKAGE = "hls_package"
+EDITING_PROXY = "editing_proxy"
+
+# Lists the files of a directory artifact; its storage key is the artifact's key
+DIRECTORY_MANIFEST = "manifest.json"
+
+
+def params_hash(params: dict) -> str:
+    """Hash the parameters that produced an artifact."""
+    payload = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def source_hash(media_file: MediaFile) -> str:
+    """
+    Get the content key of a media file's artifacts.
+
+    Files stored before content addressing have no content hash; their
+    artifacts are keyed by stored filename instead, so they are not shared.
+    """
+    if media_file.content_hash:
+        return media_file.content_hash
+    return hashlib.sha256(f"stored:{media_file.stored_filename}".encode("utf-8")).hexdigest()
+
+
+class DerivedArtifactStore:
+    """
+    Memoized results of expensive computations over media content.
+
+    Artifacts are keyed by (content hash, artifact type, parameters hash),
+    so identical uploads in different projects share them. Each artifact is
+    stored through StorageService under ``artifacts/`` and recorded in the
+    ``derived_artifacts`` table with its size and last access time.
+
+    Computing a key is single-flight: callers that miss on the same key wait
+    on a file lock and reuse the first caller's result. The lock covers
+    threads and processes on one host; workers on different hosts may both
+    compute a key, and the second write is a harmless overwrite. Once the
+    recorded artifacts exceed ``max_bytes``, the least recently accessed
+    ones are deleted, except those accessed within ``grace_seconds``: a job
+    may still be reading a local path handed out for them.
+    """
+
+    def __init__(
+        self,
+        storage: StorageService,
+        max_bytes: int,
+        lock_dir: str,
+        session_factory: sessionmaker = SessionLocal,
+        scratch: Optional[ScratchManager] = None,
+        grace_seconds: float = 0,
+    ):
+        self.storage = storage
+        self.max_bytes = max_bytes
+        self.grace_seconds = grace_seconds
+        self.lock_dir = Path(lock_dir)
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        self.session_factory = session_factory
+        self.scratch = scratch or get_scratch_manager()
+
+    def get_or_compute_file(
+        self,
+        content_hash: str,
+        artifact_type: str,
+        params: dict,
+        compute: Callable[[Path], None],
+        suffix: str = "",
+    ) -> Path:
+        """
+        Get a local path of a file artifact, computing it on a miss.
+
+        Args:
+            content_hash: Content key of the source media
+            artifact_type: Kind of artifact, e.g. ``audio_pcm``
+            params: Parameters that affect the artifact's contents
+            compute: Writes the artifact to the given path
+            suffix: File extension of the artifact
+
+        Returns:
+            Local path of the artifact; treat it as read-only
+        """
+        digest = params_hash(params)
+        path = self._lookup(content_hash, artifact_type, digest)
+        if path is not None:
+            return path
+
+        key = self._key(content_hash, artifact_type, digest, suffix)
+        with self._lock(key):
+            # Another caller may have computed it while we waited
+            path = self._lookup(content_hash, artifact_type, digest, count_miss=False)
+            if path is not None:
+                return path
+
+            with self.scratch.job(f"artifact-{artifact_type}") as scratch:
+                output_path = scratch.file(f"artifact{suffix}")
+                started = time.perf_counter()
+                compute(output_path)
+                artifact_compute_seconds.observe(
+                    time.perf_counter() - started, type=artifact_type
+                )
+                scratch.check_quota()
+                size = output_path.stat().st_size
+                self.storage.save_local_file(output_path, key)
+
+            self._record(content_hash, artifact_type, digest, key, size)
+
+        path = self.storage.get_local_copy(key)
+        if path is None:
+            raise FileNotFoundError(key)
+        return path
+
+    def get_or_compute_json(
+        self,
+        content_hash: str,
+        artifact_type: str,
+        params: dict,
+        compute: Callable[[], Any],
+    ) -> Any:
+        """Get a JSON artifact, computing it on a miss; see ``get_or_compute_file``."""
+
+        def write(output_path: Path) -> None:
+            output_path.write_text(json.dumps(compute()), encoding="utf-8")
+
+        path = self.get_or_compute_file(content_hash, artifact_type, params, write, ".json")
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def get_or_compute_dir(
+        self,
+        content_hash: str,
+        artifact_type: str,
+        params: dict,
+        compute: Callable[[Path], None],
+    ) -> str:
+        """
+        Get the storage prefix of a directory artifact, computing it on a miss.
+
+        Every file ``compute`` writes into the given directory is stored under
+        the prefix, followed by a manifest listing them. The manifest is what
+        is recorded, so the artifact counts as stored only once all of its
+        files are, and eviction deletes the whole directory.
+
+        Args:
+            content_hash: Content key of the source media
+            artifact_type: Kind of artifact, e.g. ``hls_package``
+            params: Parameters that affect the artifact's contents
+            compute: Writes the artifact's files into the given directory
+
+        Returns:
+            Storage key prefix of the files, ending in ``/``
+        """
+        digest = params_hash(params)
+        prefix = self._key(content_hash, artifact_type, digest, "") + "/"
+        if self._lookup(content_hash, artifact_type, digest) is not None:
+            return prefix
+
+        with self._lock(prefix):
+            if self._lookup(content_hash, artifact_type, digest, count_miss=False) is not None:
+                return prefix
+
+            with self.scratch.job(f"artifact-{artifact_type}") as scratch:
+                output_dir = scratch.file("artifact")
+                output_dir.mkdir()
+                started = time.perf_counter()
+                compute(output_dir)
+                artifact_compute_seconds.observe(
+                    time.perf_counter() - started, type=artifact_type
+                )
+                scratch.check_quota()
+
+                files = sorted(
+                    path.relative_to(output_dir).as_posix()
+                    for path in output_dir.rglob("*")
+                    if path.is_file()
+                )
+                size = 0
+                for name in files:
+                    size += (output_dir / name).stat().st_size
+                    self.storage.save_local_file(output_dir / name, prefix + name)
+
+            manifest = json.dumps({"files": files}).encode("utf-8")
+            self.storage.save_file(io.BytesIO(manifest), prefix + DIRECTORY_MANIFEST)
+            self._record(
+                content_hash, artifact_type, digest, prefix + DIRECTORY_MANIFEST, size
+            )
+
+        return prefix
+
+    def get_file(self, content_hash: str, artifact_type: str, params: dict) -> Optional[Path]:
+        """Get a local path of a file artifact if it has been computed, without computing it."""
+        return self._lookup(content_hash, artifact_type, params_hash(params))
+
+    def get_key(self, content_hash: str, artifact_type: str, params: dict) -> Optional[str]:
+        """
+        Get the storage key of a computed file artifact without fetching it.
+
+        For artifacts served straight from storage; unlike ``get_file`` this
+        does not download remote artifacts into the local cache.
+        """
+        with self.session_factory() as db:
+            artifact = db.execute(
+                select(DerivedArtifact).where(
+                    DerivedArtifact.content_hash == content_hash,
+                    DerivedArtifact.artifact_type == artifact_type,
+                    DerivedArtifact.params_hash == params_hash(params),
+                )
+            ).scalar_one_or_none()
+            if artifact is None:
+                artifact_requests_total.inc(type=artifact_type, result="miss")
+                return None
+            artifact.last_accessed_at = datetime.now(timezone.utc)
+            db.commit()
+            storage_key = artifact.storage_key
+
+        artifact_requests_total.inc(type=artifact_type, result="hit")
+        return storage_key
+
+    def get_dir(self, content_hash: str, artifact_type: str, params: dict) -> Optional[str]:
+        """Get the storage prefix of a directory artifact if it has been computed."""
+        digest = params_hash(params)
+        if self._lookup(content_hash, artifact_type, digest) is None:
+            return None
+        return self._key(content_hash, artifact_type, digest, "") + "/"
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Delete least recently accessed artifacts until the store fits its size cap.
+
+        Args:
+            keep: Storage key that must not be evicted
+
+        Returns:
+            Number of artifacts evicted
+        """
+        with self.session_factory() as db:
+            total = db.scalar(select(func.coalesce(func.sum(DerivedArtifact.size_bytes), 0)))
+            if total <= self.max_bytes:
+                return 0
+
+            evicted = []
+            # Recently handed out artifacts may be in use; the store may stay over its cap
+            cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.grace_seconds)
+            rows = db.execute(
+                select(DerivedArtifact.id, DerivedArtifact.storage_key, DerivedArtifact.size_bytes)
+                .where(DerivedArtifact.last_accessed_at <= cutoff)
+                .order_by(DerivedArtifact.last_accessed_at)
+                .execution_options(yield_per=500)
+            )
+            for artifact_id, storage_key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                if storage_key == keep:
+                    continue
+                evicted.append((artifact_id, storage_key))
+                total -= size
+            rows.close()
+
+            if not evicted:
+                return 0
+
+            db.execute(
+                DerivedArtifact.__table__.delete().where(
+                    DerivedArtifact.id.in_([artifact_id for artifact_id, _ in evicted])
+                )
+            )
+            db.commit()
+
+        # Rows go first, so a failed delete leaves an orphaned file, not a dangling row
+        self._delete_files([storage_key for _, storage_key in evicted])
+
+        artifact_evictions_total.inc(len(evicted))
+        return len(evicted)
+
+    def purge(self, content_hash: str) -> int:
+        """
+        Delete every artifact derived from some content.
+
+        For content no media file references anymore, whose artifacts would
+        otherwise stay until evicted. Deleting an HLS package is also the only
+        way to stop playback tokens already issued for it.
+
+        Args:
+            content_hash: Content key of the source media
+
+        Returns:
+            Number of artifacts deleted
+        """
+        with self.session_factory() as db:
+            storage_keys = list(
+                db.execute(
+                    DerivedArtifact.__table__.delete()
+                    .where(DerivedArtifact.content_hash == content_hash)
+                    .returning(DerivedArtifact.storage_key)
+                ).scalars()
+            )
+            db.commit()
+
+        self._delete_files(storage_keys)
+        return len(storage_keys)
+
+    def _lookup(
+        self, content_hash: str, artifact_type: str, digest: str, count_miss: bool = True
+    ) -> Optional[Path]:
+        """Get the local path of a recorded artifact and mark it as used."""
+        key_filter = (
+            DerivedArtifact.content_hash == content_hash,
+            DerivedArtifact.artifact_type == artifact_type,
+            DerivedArtifact.params_hash == digest,
+        )
+        with self.session_factory() as db:
+            storage_key = db.scalar(select(DerivedArtifact.storage_key).where(*key_filter))
+
+        path = None
+        if storage_key is not None:
+            # May download from remote storage; no connection is held meanwhile
+            path = self.storage.get_local_copy(storage_key)
+            with self.session_factory() as db:
+                if path is None:
+                    # The file is gone; forget the row so it is recomputed
+                    logger.warning(f"Artifact {storage_key} missing from storage")
+                    db.execute(DerivedArtifact.__table__.delete().where(*key_filter))
+                else:
+                    db.execute(
+                        DerivedArtifact.__table__.update()
+                        .where(*key_filter)
+                        .values(last_accessed_at=datetime.now(timezone.utc))
+                    )
+                db.commit()
+
+        if path is not None:
+            artifact_requests_total.inc(type=artifact_type, result="hit")
+        elif count_miss:
+            artifact_requests_total.inc(type=artifact_type, result="miss")
+        return path
+
+    def _record(
+        self, content_hash: str, artifact_type: str, digest: str, key: str, size: int
+    ) -> None:
+        """Record a computed artifact, then evict if the store is over its cap."""
+        now = datetime.now(timezone.utc)
+        with self.session_factory() as db:
+            db.add(
+                DerivedArtifact(
+                    content_hash=content_hash,
+                    artifact_type=artifact_type,
+                    params_hash=digest,
+                    storage_key=key,
+                    size_bytes=size,
+                    created_at=now,
+                    last_accessed_at=now,
+                )
+            )
+            try:
+                db.commit()
+            except IntegrityError:
+                # Recorded by a worker on another host; the file was overwritten in place
+                db.rollback()
+
+        self.evict(keep=key)
+
+    def _delete_files(self, storage_keys: List[str]) -> None:
+        """Delete the files of artifacts whose rows are already gone, logging failures."""
+        for storage_key in storage_keys:
+            try:
+                self.storage.delete_files(self._artifact_files(storage_key))
+            except Exception as e:
+                logger.warning(f"Failed to delete artifact {storage_key}: {e}")
+
+    def _artifact_files(self, storage_key: str) -> List[str]:
+        """Get every storage key of an artifact, including a directory's files."""
+        prefix, _, name = storage_key.rpartition("/")
+        if name != DIRECTORY_MANIFEST:
+            return [storage_key]
+
+        contents = self.storage.get_file(storage_key)
+        files = json.loads(contents)["files"] if contents else []
+        # The manifest goes last, like it was written last
+        return [f"{prefix}/{file}" for file in files] + [storage_key]
+
+    @staticmethod
+    def _key(content_hash: str, artifact_type: str, digest: str, suffix: str) -> str:
+        """Build the storage key for an artifact."""
+        return (
+            f"{ARTIFACT_PREFIX}/{content_hash[:2]}/{content_hash}/"
+            f"{artifact_type}-{digest[:16]}{suffix}"
+        )
+
+    @contextmanager
+    def _lock(self, key: str):
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        with open(self.lock_dir / f"{digest}.lock", "a+") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+@lru_cache
+def get_artifact_store() -> DerivedArtifactStore:
+    """Get the per-process derived artifact store."""
+    settings = get_settings()
+    return DerivedArtifactStore(
+        storage=get_storage_service(),
+        max_bytes=settings.artifact_store_max_mb * 1024 * 1024,
+        lock_dir=str(Path(settings.storage_cache_dir) / ".artifact-locks"),
+        grace_seconds=settings.artifact_store_grace_seconds,
+    )
@@ -1,9 +1,9 @@
 """Audio extraction service for processing video/audio files."""
 
-import tempfile
 from pathlib import Path
 from typing import Optional, Tuple
 
+from app.services.scratch_space import get_scratch_manager
 from app.services.storage_service import StorageService, get_storage_service
 from app.utils.ffmpeg_utils import (
     FFmpegError,
@@ -27,6 +27,7 @@ class AudioExtractor:
         output_dir: Optional[Path] = None,
         sample_rate: int = 16000,
         channels: int = 1,
+        output_path: Optional[Path] = None,
     ) -> Path:
         """
         Extract audio from a video/audio file.
@@ -36,14 +37,15 @@ class AudioExtractor:
             output_dir: Directory for output file (uses temp if not provided)
             sample_rate: Output sample rate (default 16kHz for VAD)
             channels: Number of audio channels (default mono)
+            output_path: Exact output path; overrides output_dir
 
         Returns:
             Path to the extracted audio WAV file
         """
-        if output_dir:
+        if output_path is None:
+            # The caller owns a directory it did not pass in; the stale sweep reclaims leftovers
+            output_dir = output_dir or get_scratch_manager().mkdtemp("extract-audio-")
             output_path = output_dir / f"{file_path.stem}_audio.wav"
-        else:
-            output_path = None
 
         return extract_audio(
             input_path=file_path,
@@ -110,7 +112,7 @@ class AudioExtractor:
 
         # Extract audio
         if temp_dir is None:
-            temp_dir = Path(tempfile.mkdtemp())
+            temp_dir = get_scratch_manager().mkdtemp("uploaded-audio-")
 
         audio_path = self.extract_audio_from_file(
             file_path=file_path,
@@ -4,18 +4,20 @@ from datetime import datetime, timezone
 from typing import Optional, Tuple
 from uuid import UUID
 
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
 from app.models.refresh_token import RefreshToken
 from app.models.user import User
 from app.schemas.auth import RegisterRequest, UserUpdate
+from app.services.user_cache import get_user_cache
 from app.utils.security import (
     create_access_token,
     create_refresh_token,
-    hash_password,
+    hash_password_async,
     hash_token,
-    verify_password,
+    verify_password_async,
     verify_token,
 )
 
@@ -25,54 +27,89 @@ settings = get_settings()
 class AuthService:
     """Service for authentication operations."""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def get_user_by_email(self, email: str) -> Optional[User]:
+    async def get_user_by_email(self, email: str) -> Optional[User]:
         """Get user by email address."""
-        return self.db.query(User).filter(User.email == email.lower()).first()
+        result = await self.db.execute(select(User).where(User.email == email.lower()))
+        return result.scalar_one_or_none()
 
-    def get_user_by_id(self, user_id: UUID) -> Optional[User]:
+    async def get_user_by_id(self, user_id: UUID) -> Optional[User]:
         """Get user by ID."""
-        return self.db.query(User).filter(User.id == user_id).first()
+        result = await self.db.execute(select(User).where(User.id == user_id))
+        return result.scalar_one_or_none()
 
-    def create_user(self, data: RegisterRequest) -> User:
+    async def create_user(self, data: RegisterRequest) -> User:
         """Create a new user."""
         user = User(
             email=data.email.lower(),
-            password_hash=hash_password(data.password),
+            password_hash=await hash_password_async(data.password),
             full_name=data.full_name,
         )
         self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
+        await self.db.commit()
+        await self.db.refresh(user)
         return user
 
-    def authenticate_user(self, email: str, password: str) -> Optional[User]:
+    async def authenticate_user(self, email: str, password: str) -> Optional[User]:
         """Authenticate user with email and password."""
-        user = self.get_user_by_email(email)
+        user = await self.get_user_by_email(email)
         if not user:
             return None
-        if not verify_password(password, user.password_hash):
+        if not await verify_password_async(password, user.password_hash):
             return None
         return user
 
-    def update_last_login(self, user: User) -> None:
+    async def _attach(self, user: User) -> User:
+        """Return the session's instance of a user that may come from the user cache."""
+        if user in self.db:
+            return user
+        return await self.db.get(User, user.id)
+
+    async def _invalidate_cached_user(self, user_id: UUID) -> None:
+        """Drop a user from the authentication cache after a change."""
+        user_cache = get_user_cache()
+        if user_cache:
+            await user_cache.invalidate(user_id)
+
+    async def update_last_login(self, user: User) -> None:
         """Update user's last login timestamp."""
         user.last_login = datetime.now(timezone.utc)
-        self.db.commit()
+        await self.db.commit()
+        # updated_at is set by the database; reload it before the user is serialized
+        await self.db.refresh(user)
+        await self._invalidate_cached_user(user.id)
 
-    def update_user(self, user: User, data: UserUpdate) -> User:
+    async def update_user(self, user: User, data: UserUpdate) -> User:
         """Update user profile."""
+        user = await self._attach(user)
         if data.full_name is not None:
             user.full_name = data.full_name
         if data.settings is not None:
             user.settings = data.settings
-        self.db.commit()
-        self.db.refresh(user)
+        await self.db.commit()
+        await self.db.refresh(user)
+        await self._invalidate_cached_user(user.id)
         return user
 
-    def create_tokens(self, user: User) -> Tuple[str, str]:
+    async def deactivate_user(self, user: User) -> User:
+        """
+        Deactivate a user account and revoke all its tokens.
+
+        Without the Redis user cache, other API processes may still accept the
+        user's access tokens until their cached entry expires
+        (USER_CACHE_TTL_SECONDS).
+        """
+        user = await self._attach(user)
+        user.is_active = False
+        await self.db.commit()
+        await self._invalidate_cached_user(user.id)
+        await self.revoke_all_user_tokens(user.id)
+        await self.db.refresh(user)
+        return user
+
+    async def create_tokens(self, user: User) -> Tuple[str, str]:
         """Create access and refresh tokens for user."""
         access_token = create_access_token(subject=str(user.id))
         refresh_token, expires_at = create_refresh_token(subject=str(user.id))
@@ -84,11 +121,11 @@ class AuthService:
             expires_at=expires_at,
         )
         self.db.add(token_record)
-        self.db.commit()
+        await self.db.commit()
 
         return access_token, refresh_token
 
-    def refresh_tokens(self, refresh_token: str) -> Optional[Tuple[str, str, User]]:
+    async def refresh_tokens(self, refresh_token: str) -> Optional[Tuple[str, str, User]]:
         """Refresh tokens using a valid refresh token."""
         # Verify token
         payload = verify_token(refresh_token, token_type="refresh")
@@ -101,21 +138,20 @@ class AuthService:
 
         # Find and validate stored token
         token_hash = hash_token(refresh_token)
-        stored_token = (
-            self.db.query(RefreshToken)
-            .filter(
+        result = await self.db.execute(
+            select(RefreshToken).where(
                 RefreshToken.token_hash == token_hash,
                 RefreshToken.revoked == False,
                 RefreshToken.expires_at > datetime.now(timezone.utc),
             )
-            .first()
         )
+        stored_token = result.scalar_one_or_none()
 
         if not stored_token:
             return None
 
         # Get user
-        user = self.get_user_by_id(UUID(user_id))
+        user = await self.get_user_by_id(UUID(user_id))
         if not user or not user.is_active:
             return None
 
@@ -124,57 +160,51 @@ class AuthService:
         stored_token.revoked_at = datetime.now(timezone.utc)
 
         # Create new tokens
-        access_token, new_refresh_token = self.create_tokens(user)
+        access_token, new_refresh_token = await self.create_tokens(user)
 
         return access_token, new_refresh_token, user
 
-    def revoke_refresh_token(self, refresh_token: str) -> bool:
+    async def revoke_refresh_token(self, refresh_token: str) -> bool:
         """Revoke a refresh token."""
         token_hash = hash_token(refresh_token)
-        stored_token = (
-            self.db.query(RefreshToken)
-            .filter(RefreshToken.token_hash == token_hash)
-            .first()
+        result = await self.db.execute(
+            select(RefreshToken).where(RefreshToken.token_hash == token_hash)
         )
+        stored_token = result.scalar_one_or_none()
 
         if stored_token:
             stored_token.revoked = True
             stored_token.revoked_at = datetime.now(timezone.utc)
-            self.db.commit()
+            await self.db.commit()
             return True
         return False
 
-    def revoke_all_user_tokens(self, user_id: UUID) -> int:
+    async def revoke_all_user_tokens(self, user_id: UUID) -> int:
         """Revoke all refresh tokens for a user."""
-        result = (
-            self.db.query(RefreshToken)
-            .filter(
+        result = await self.db.execute(
+            update(RefreshToken)
+            .where(
                 RefreshToken.user_id == user_id,
                 RefreshToken.revoked == False,
             )
-            .update(
-                {
-                    RefreshToken.revoked: True,
-                    RefreshToken.revoked_at: datetime.now(timezone.utc),
-                }
-            )
+            .values(revoked=True, revoked_at=datetime.now(timezone.utc))
         )
-        self.db.commit()
-        return result
+        await self.db.commit()
+        return result.rowcount
 
-    def change_password(self, user: User, new_password: str) -> None:
+    async def change_password(self, user: User, new_password: str) -> None:
         """Change user password and revoke all tokens."""
-        user.password_hash = hash_password(new_password)
-        self.db.commit()
+        user = await self._attach(user)
+        user.password_hash = await hash_password_async(new_password)
+        await self.db.commit()
+        await self._invalidate_cached_user(user.id)
         # Revoke all refresh tokens on password change
-        self.revoke_all_user_tokens(user.id)
+        await self.revoke_all_user_tokens(user.id)
 
-    def cleanup_expired_tokens(self) -> int:
+    async def cleanup_expired_tokens(self) -> int:
         """Delete expired refresh tokens."""
-        result = (
-            self.db.query(RefreshToken)
-            .filter(RefreshToken.expires_at < datetime.now(timezone.utc))
-            .delete()
+        result = await self.db.execute(
+            delete(RefreshToken).where(RefreshToken.expires_at < datetime.now(timezone.utc))
         )
-        self.db.commit()
-        return result
+        await self.db.commit()
+        return result.rowcount
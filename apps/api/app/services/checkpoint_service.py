@@ -0,0 +1,139 @@
+"""Checkpoint storage for resumable analysis tasks."""
+
+import io
+import json
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.analysis import AnalysisResult
+from app.services.storage_service import StorageService, get_storage_service
+
+
+class AnalysisCheckpointer:
+    """
+    Persist intermediate analysis artifacts to storage.
+
+    Each completed stage is written to storage and recorded in the
+    ``checkpoints`` manifest of the analysis record, so a retried or
+    re-delivered task can resume from the last completed stage instead of
+    starting over. The manifest lives on the task's session, which is not
+    thread-safe, so a checkpointer must only be used from the task thread.
+    """
+
+    STAGE_AUDIO = "audio"
+    STAGE_VAD = "vad"
+    STAGE_TRANSCRIPTION = "transcription"
+
+    def __init__(
+        self,
+        analysis: AnalysisResult,
+        db: Session,
+        storage_service: Optional[StorageService] = None,
+    ):
+        self.analysis = analysis
+        self.db = db
+        self.storage = storage_service or get_storage_service()
+
+    @property
+    def manifest(self) -> dict:
+        """Return a copy of the current checkpoint manifest."""
+        return dict(self.analysis.checkpoints or {})
+
+    def has(self, stage: str) -> bool:
+        """Check whether a stage has a recorded checkpoint."""
+        return stage in self.manifest
+
+    def save_file(self, stage: str, file_path: Path) -> str:
+        """Store a file artifact for a stage."""
+        key = self._key(f"{stage}{file_path.suffix}")
+        with open(file_path, "rb") as f:
+            self.storage.save_file(f, key)
+        self._record(stage, key)
+        return key
+
+    def load_file(self, stage: str, output_path: Path) -> Optional[Path]:
+        """Restore a file artifact for a stage, or None if it is unavailable."""
+        entry = self.manifest.get(stage)
+        if not entry:
+            return None
+
+        local_path = self.storage.get_local_path(entry["path"])
+        if local_path and local_path.exists():
+            shutil.copyfile(local_path, output_path)
+            return output_path
+
+        contents = self.storage.get_file(entry["path"])
+        if contents is None:
+            return None
+
+        output_path.write_bytes(contents)
+        return output_path
+
+    def save_json(self, stage: str, data: Any) -> str:
+        """Store a JSON artifact for a stage."""
+        key = self._key(f"{stage}.json")
+        payload = json.dumps(data).encode("utf-8")
+        self.storage.save_file(io.BytesIO(payload), key)
+        self._record(stage, key)
+        return key
+
+    def load_json(self, stage: str) -> Optional[Any]:
+        """Restore a JSON artifact for a stage, or None if it is unavailable."""
+        entry = self.manifest.get(stage)
+        if not entry:
+            return None
+
+        contents = self.storage.get_file(entry["path"])
+        if contents is None:
+            return None
+
+        try:
+            return json.loads(contents)
+        except ValueError:
+            return None
+
+    def get_or_compute_json(self, stage: str, compute: Callable[[], Any]) -> Any:
+        """Return the checkpointed JSON for a stage, computing and storing it if missing."""
+        data = self.load_json(stage)
+        if data is None:
+            data = compute()
+            self.save_json(stage, data)
+        return data
+
+    def clear(self) -> None:
+        """Delete all stored artifacts and reset the manifest."""
+        for entry in self.manifest.values():
+            self.storage.delete_file(entry["path"])
+
+        self.analysis.checkpoints = None
+        self.db.commit()
+
+    def _key(self, filename: str) -> str:
+        """Build the storage key for an artifact."""
+        return f"checkpoints/{self.analysis.id}/{filename}"
+
+    def _record(self, stage: str, key: str) -> None:
+        """Record a completed stage in the manifest and persist it."""
+        manifest = self.manifest
+        manifest[stage] = {
+            "path": key,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+        # Reassign so SQLAlchemy detects the JSONB change
+        self.analysis.checkpoints = manifest
+        self.db.commit()
+
+
+def run_checkpointed(
+    checkpoint: Optional[AnalysisCheckpointer],
+    stage: str,
+    compute: Callable[[], Any],
+) -> Any:
+    """Run a JSON-producing stage, resuming from a checkpoint when one is available."""
+    if checkpoint is None:
+        return compute()
+    return checkpoint.get_or_compute_json(stage, compute)
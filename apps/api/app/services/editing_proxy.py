@@ -0,0 +1,56 @@
+"""Low-resolution editing proxies of uploaded videos."""
+
+from pathlib import Path
+from typing import Optional
+
+from app.config import get_settings
+from app.services.artifact_store import EDITING_PROXY, DerivedArtifactStore
+from app.utils.ffmpeg_utils import transcode_proxy
+
+
+def proxy_params() -> dict:
+    """Get the settings that affect editing proxies."""
+    settings = get_settings()
+    return {
+        "height": settings.proxy_height,
+        "gop_frames": settings.proxy_gop_frames,
+        "crf": settings.proxy_crf,
+    }
+
+
+def generate_proxy(
+    store: DerivedArtifactStore,
+    content_hash: str,
+    source_path: Path,
+    params: Optional[dict] = None,
+) -> Path:
+    """
+    Make sure the editing proxy of a video is stored.
+
+    The proxy is only for playback and seeking in the editor; renders
+    always cut the original.
+
+    Args:
+        store: Derived artifact store
+        content_hash: Content key of the video
+        source_path: Local path of the video
+        params: Proxy parameters; defaults to ``proxy_params()``
+
+    Returns:
+        Local path of the proxy
+
+    Raises:
+        FFmpegError: If transcoding fails
+    """
+    params = params or proxy_params()
+
+    def transcode(output_path: Path) -> None:
+        transcode_proxy(
+            source_path,
+            output_path,
+            height=params["height"],
+            gop_frames=params["gop_frames"],
+            crf=params["crf"],
+        )
+
+    return store.get_or_compute_file(content_hash, EDITING_PROXY, params, transcode, ".mp4")
@@ -0,0 +1,224 @@
+"""Bounded on-disk read-through cache for objects in remote storage."""
+
+import fcntl
+import hashlib
+import logging
+import os
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Callable, Optional
+
+from app.config import get_settings
+from app.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+metrics = get_metrics()
+
+cache_requests_total = metrics.counter(
+    "storage_cache_requests_total",
+    "Local storage cache lookups by result",
+)
+cache_fetched_bytes_total = metrics.counter(
+    "storage_cache_fetched_bytes_total",
+    "Bytes pulled from remote storage into the local cache",
+)
+cache_evictions_total = metrics.counter(
+    "storage_cache_evictions_total",
+    "Files evicted from the local storage cache",
+)
+
+PARTIAL_SUFFIX = ".part"
+LOCK_DIR = ".locks"
+
+
+class LocalFileCache:
+    """
+    Local copies of remote objects, keyed by storage path.
+
+    Files are named by a hash of their key and keep its extension, so tools
+    that sniff the extension (ffmpeg, ffprobe) still work. A hit refreshes
+    the file's mtime; when the cache grows past ``max_bytes`` the files with
+    the oldest mtime are removed. Files used within ``grace_seconds`` are
+    never removed, since a caller may still be about to open the returned
+    path. Fetches take a per-key file lock, so concurrent processes sharing
+    the directory download each object once.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, grace_seconds: float = 300):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.grace_seconds = grace_seconds
+        (self.cache_dir / LOCK_DIR).mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, key: str) -> Path:
+        """Get the cache file path for a storage key."""
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        suffix = Path(key).suffix[:16]
+        return self.cache_dir / f"{digest}{suffix}"
+
+    def get(self, key: str) -> Optional[Path]:
+        """Get the cached copy of a key, or None if it is not cached."""
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            cache_requests_total.inc(result="miss")
+            return None
+        cache_requests_total.inc(result="hit")
+        return path
+
+    def get_or_fetch(self, key: str, fetch: Callable[[Path], None]) -> Path:
+        """
+        Get the cached copy of a key, fetching it on a miss.
+
+        Args:
+            key: Storage key
+            fetch: Writes the object to the given path; raises on failure
+
+        Returns:
+            Path of the cached file
+        """
+        path = self.get(key)
+        if path is not None:
+            return path
+
+        path = self.path_for(key)
+        with self._lock(path):
+            # Another process may have fetched it while we waited
+            if path.exists():
+                os.utime(path)
+                return path
+
+            partial = path.with_name(f"{path.name}.{uuid.uuid4().hex}{PARTIAL_SUFFIX}")
+            try:
+                fetch(partial)
+                os.replace(partial, path)
+            finally:
+                partial.unlink(missing_ok=True)
+
+        cache_fetched_bytes_total.inc(path.stat().st_size)
+        self._evict(keep=path)
+        return path
+
+    def put(self, key: str, file: BinaryIO) -> Path:
+        """Store a copy of a file object under a key."""
+        path = self.path_for(key)
+        partial = path.with_name(f"{path.name}.{uuid.uuid4().hex}{PARTIAL_SUFFIX}")
+        try:
+            with open(partial, "wb") as f:
+                shutil.copyfileobj(file, f)
+            os.replace(partial, path)
+        finally:
+            partial.unlink(missing_ok=True)
+        self._evict(keep=path)
+        return path
+
+    def adopt(self, key: str, source: Path) -> Path:
+        """Move a local file into the cache under a key."""
+        path = self.path_for(key)
+        partial = path.with_name(f"{path.name}.{uuid.uuid4().hex}{PARTIAL_SUFFIX}")
+        try:
+            shutil.move(str(source), partial)
+            os.replace(partial, path)
+        finally:
+            partial.unlink(missing_ok=True)
+        self._evict(keep=path)
+        return path
+
+    def discard(self, key: str) -> None:
+        """Remove the cached copy of a key."""
+        self.path_for(key).unlink(missing_ok=True)
+
+    @contextmanager
+    def _lock(self, path: Path):
+        lock_path = self._lock_path(path)
+        while True:
+            lock_file = open(lock_path, "a+")
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            # Eviction removes lock files; retry if ours was removed while we waited
+            try:
+                current = os.stat(lock_path)
+            except FileNotFoundError:
+                current = None
+            if current is not None and current.st_ino == os.fstat(lock_file.fileno()).st_ino:
+                break
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+    def _lock_path(self, path: Path) -> Path:
+        return self.cache_dir / LOCK_DIR / f"{path.name}.lock"
+
+    def _evict(self, keep: Path) -> None:
+        """Remove least recently used files until the cache fits its size cap."""
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if not entry.is_file() or entry.name.endswith(PARTIAL_SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+                total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        recent = time.time() - self.grace_seconds
+        for mtime, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if mtime >= recent:
+                # Everything after this was used within the grace period too
+                logger.info(f"Storage cache over its cap by {total - self.max_bytes} bytes")
+                break
+            if path == keep:
+                continue
+            if self._remove(path):
+                total -= size
+                cache_evictions_total.inc()
+                logger.debug(f"Evicted {path.name} from storage cache")
+
+    def _remove(self, path: Path) -> bool:
+        """Remove an entry and its lock file unless the entry is being fetched."""
+        lock_path = self._lock_path(path)
+        try:
+            lock_file = open(lock_path, "a+")
+        except FileNotFoundError:
+            return False
+        with lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                return False
+            finally:
+                lock_path.unlink(missing_ok=True)
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return True
+
+
+@lru_cache
+def get_file_cache() -> LocalFileCache:
+    """Get the per-process storage cache."""
+    settings = get_settings()
+    return LocalFileCache(
+        cache_dir=settings.storage_cache_dir,
+        max_bytes=settings.storage_cache_max_mb * 1024 * 1024,
+        grace_seconds=settings.storage_cache_grace_seconds,
+    )
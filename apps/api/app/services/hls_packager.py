@@ -0,0 +1,150 @@
+"""HLS packaging of uploaded videos for adaptive playback."""
+
+import re
+from pathlib import Path
+from typing import List, Optional
+from urllib.parse import urlencode
+
+from app.config import get_settings
+from app.services.artifact_store import HLS_PACKAGE, DerivedArtifactStore
+from app.utils.ffmpeg_utils import get_media_info, package_hls
+
+MASTER_PLAYLIST = "master.m3u8"
+
+# H.264 and AAC bitrates of common ladder heights
+LADDER_BITRATES = {
+    240: ("400k", "64k"),
+    360: ("800k", "96k"),
+    480: ("1400k", "128k"),
+    720: ("2800k", "128k"),
+    1080: ("5000k", "160k"),
+    1440: ("8000k", "160k"),
+    2160: ("14000k", "192k"),
+}
+
+# Files a package may contain; anything else in a request path is rejected
+PACKAGE_PATH_PATTERN = re.compile(r"^(?:[A-Za-z0-9_-]+/)?[A-Za-z0-9_-]+\.(?:m3u8|m4s|mp4)$")
+URI_ATTRIBUTE = re.compile(r'URI="([^"]+)"')
+
+
+class HlsUnavailableError(Exception):
+    """The media has no video stream to package."""
+
+
+def hls_params() -> dict:
+    """Get the settings that affect HLS packages."""
+    settings = get_settings()
+    return {
+        "heights": settings.hls_renditions_list,
+        "segment_seconds": settings.hls_segment_seconds,
+    }
+
+
+def plan_renditions(source_height: int, heights: List[int]) -> List[dict]:
+    """
+    Choose the ladder renditions for a source.
+
+    Renditions taller than the source are dropped, since upscaling only
+    costs bandwidth; the smallest one is always kept.
+
+    Args:
+        source_height: Height of the source video in pixels
+        heights: Configured ladder heights
+
+    Returns:
+        Dicts with ``height``, ``video_bitrate`` and ``audio_bitrate``, smallest first
+    """
+    heights = sorted(heights)
+    chosen = [height for height in heights if height <= source_height] or heights[:1]
+
+    renditions = []
+    for height in chosen:
+        # Heights outside the table scale with the pixel count of 720p
+        default_video = f"{round(2800 * (height / 720) ** 2)}k"
+        video_bitrate, audio_bitrate = LADDER_BITRATES.get(height, (default_video, "128k"))
+        renditions.append(
+            {"height": height, "video_bitrate": video_bitrate, "audio_bitrate": audio_bitrate}
+        )
+    return renditions
+
+
+def package_media(
+    store: DerivedArtifactStore,
+    content_hash: str,
+    source_path: Path,
+    params: Optional[dict] = None,
+) -> str:
+    """
+    Make sure the HLS package of a video is stored.
+
+    The package is a directory artifact keyed by content, so identical
+    uploads share one package and it falls under the store's size cap.
+
+    Args:
+        store: Derived artifact store
+        content_hash: Content key of the video
+        source_path: Local path of the video
+        params: Packaging parameters; defaults to ``hls_params()``
+
+    Returns:
+        Storage key prefix of the package
+
+    Raises:
+        HlsUnavailableError: If the file has no video stream
+        FFmpegError: If packaging fails
+    """
+    params = params or hls_params()
+
+    def package(output_dir: Path) -> None:
+        info = get_media_info(source_path) or {}
+        streams = info.get("streams", [])
+        video = next(
+            (
+                s
+                for s in streams
+                if s.get("codec_type") == "video"
+                and not s.get("disposition", {}).get("attached_pic")
+            ),
+            None,
+        )
+        if video is None or not video.get("height"):
+            raise HlsUnavailableError(f"No video to package in {source_path.name}")
+
+        package_hls(
+            source_path,
+            output_dir,
+            plan_renditions(video["height"], params["heights"]),
+            params["segment_seconds"],
+            has_audio=any(s.get("codec_type") == "audio" for s in streams),
+        )
+
+    return store.get_or_compute_dir(content_hash, HLS_PACKAGE, params, package)
+
+
+def is_package_path(path: str) -> bool:
+    """Check whether a request path names a file a package can contain."""
+    return bool(PACKAGE_PATH_PATTERN.match(path))
+
+
+def sign_playlist(playlist: str, token: str) -> str:
+    """
+    Add a playback token to every URI of a playlist.
+
+    Players resolve playlist URIs relative to the playlist and do not carry
+    its query string over, so each segment, init segment and variant URI
+    gets the token itself.
+    """
+    query = urlencode({"token": token})
+
+    def sign(uri: str) -> str:
+        return f"{uri}{'&' if '?' in uri else '?'}{query}"
+
+    lines = []
+    for line in playlist.splitlines():
+        if not line.strip():
+            lines.append(line)
+        elif line.startswith("#"):
+            lines.append(URI_ATTRIBUTE.sub(lambda m: f'URI="{sign(m.group(1))}"', line))
+        else:
+            lines.append(sign(line.strip()))
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,158 @@
+"""Content-addressed storage for uploaded media.
+
+Uploads are stored under a key derived from the SHA-256 of their contents,
+so the same file uploaded to several projects is stored once. A blob is
+referenced by every MediaFile row whose ``stored_filename`` is its key and
+is deleted only when the last of those rows is gone.
+
+Uploads that reference a blob and cleanups that delete it hold the same
+per-blob lock (see ``blob_lock_queries``), so a blob cannot be deleted
+between an upload finding it and committing its new reference.
+"""
+
+import hashlib
+import logging
+from pathlib import Path
+from typing import Iterable, List, Set, Tuple
+
+from sqlalchemy import Select, func, select
+
+from app.models.media import MediaFile
+from app.services.storage_service import StorageService
+from app.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+BLOB_PREFIX = "blobs"
+
+# Enough leading bytes for magic-byte detection
+HEADER_SIZE = 32
+
+dedup_requests_total = get_metrics().counter(
+    "media_upload_dedup_total",
+    "Media uploads by whether their content was already stored",
+)
+dedup_bytes_total = get_metrics().counter(
+    "media_upload_dedup_bytes_total",
+    "Bytes not written to storage because identical content was already stored",
+)
+blobs_deleted_total = get_metrics().counter(
+    "media_blobs_deleted_total",
+    "Media blobs deleted after their last reference was removed",
+)
+
+
+class ContentHasher:
+    """Hashes an upload incrementally while tracking its size and header."""
+
+    def __init__(self):
+        self._digest = hashlib.sha256()
+        self.size = 0
+        self.header = b""
+
+    def update(self, chunk: bytes) -> None:
+        """Add the next chunk of the upload."""
+        self._digest.update(chunk)
+        self.size += len(chunk)
+        if len(self.header) < HEADER_SIZE:
+            self.header += chunk[: HEADER_SIZE - len(self.header)]
+
+    def hexdigest(self) -> str:
+        """SHA-256 of everything added so far."""
+        return self._digest.hexdigest()
+
+
+def blob_filename(content_hash: str, original_filename: str) -> str:
+    """
+    Get the storage key for content with the given hash.
+
+    The original extension is kept because ffmpeg and ffprobe use it, and
+    the key is fanned out over two directory levels to keep local storage
+    directories small.
+    """
+    ext = Path(original_filename).suffix.lower()
+    return f"{BLOB_PREFIX}/{content_hash[:2]}/{content_hash[2:4]}/{content_hash}{ext}"
+
+
+def blob_lock_queries(dialect_name: str, stored_filenames: Iterable[str]) -> List[Select]:
+    """
+    Build the statements that lock blobs for the rest of a transaction.
+
+    Each statement takes a PostgreSQL transaction-level advisory lock on one
+    storage key, so hold them from the reference lookup until the commit that
+    adds or drops a reference (or the storage delete that follows). Keys are
+    locked in sorted order to avoid deadlocks. Returns no statements on other
+    databases.
+
+    Args:
+        dialect_name: Name of the session's database dialect
+        stored_filenames: Storage keys to lock
+
+    Returns:
+        Statements to execute in order
+    """
+    if dialect_name != "postgresql":
+        return []
+    return [
+        select(func.pg_advisory_xact_lock(func.hashtext(stored_filename)))
+        for stored_filename in sorted(set(stored_filenames))
+    ]
+
+
+def existing_blob_query(stored_filename: str) -> Select:
+    """Select a media file that already references a blob."""
+    return select(MediaFile).where(MediaFile.stored_filename == stored_filename).limit(1)
+
+
+def referenced_blobs_query(stored_filenames: Iterable[str]) -> Select:
+    """Select which of the given storage keys are still referenced by a media file."""
+    return (
+        select(MediaFile.stored_filename)
+        .where(MediaFile.stored_filename.in_(list(stored_filenames)))
+        .distinct()
+    )
+
+
+def release_blobs(
+    storage: StorageService,
+    released: Iterable[Tuple[str, str]],
+    referenced: Set[str],
+) -> int:
+    """
+    Delete the blobs of removed media files that nothing references anymore.
+
+    Call this after the MediaFile rows are deleted and committed, with
+    ``referenced`` taken from ``referenced_blobs_query`` afterwards, so a
+    failure leaves an unreferenced blob rather than a row without a file.
+    Hold the blobs' locks from that query until this returns.
+
+    Args:
+        storage: Storage service holding the blobs
+        released: (stored_filename, file_path) of each deleted media file
+        referenced: Storage keys that are still referenced
+
+    Returns:
+        Number of blobs deleted
+    """
+    # A blob shared by several deleted rows is deleted once
+    skip = set(referenced)
+    to_delete: List[str] = []
+    for stored_filename, file_path in released:
+        if stored_filename not in skip:
+            skip.add(stored_filename)
+            to_delete.append(file_path)
+
+    if not to_delete:
+        return 0
+
+    try:
+        deleted = storage.delete_files(to_delete)
+    except Exception as e:
+        # Log error but don't fail the deletion
+        logger.warning(f"Failed to delete {len(to_delete)} media files: {e}")
+        return 0
+
+    if deleted < len(to_delete):
+        logger.warning(f"Deleted {deleted} of {len(to_delete)} unreferenced media files")
+    blobs_deleted_total.inc(deleted)
+    return deleted
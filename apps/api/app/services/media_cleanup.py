@@ -0,0 +1,275 @@
+"""Batched deletion of expired media files and deleted projects."""
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import Row, delete, exists, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.models.analysis import AnalysisResult
+from app.models.media import MediaFile
+from app.models.project import Project
+from app.services.artifact_store import DerivedArtifactStore, source_hash
+from app.services.media_blobs import (
+    blob_lock_queries,
+    referenced_blobs_query,
+    release_blobs,
+)
+from app.services.storage_service import StorageService
+from app.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+metrics = get_metrics()
+
+cleanup_batches_total = metrics.counter(
+    "media_cleanup_batches_total",
+    "Batches of expired media files deleted",
+)
+cleanup_rows_deleted_total = metrics.counter(
+    "media_cleanup_rows_deleted_total",
+    "Expired media file rows deleted",
+)
+cleanup_batch_seconds = metrics.histogram(
+    "media_cleanup_batch_seconds",
+    "Duration of one expired media cleanup batch, including storage deletes",
+)
+cleanup_budget_exhausted_total = metrics.counter(
+    "media_cleanup_budget_exhausted_total",
+    "Cleanup runs stopped by their time budget with expired files remaining",
+)
+projects_deleted_total = metrics.counter(
+    "projects_deleted_total",
+    "Projects whose files and rows were deleted in the background",
+)
+
+
+@dataclass
+class CleanupResult:
+    """Outcome of one cleanup run."""
+
+    deleted_rows: int = 0
+    deleted_blobs: int = 0
+    deleted_artifacts: int = 0
+    batches: int = 0
+    complete: bool = True
+
+
+def delete_expired_media(
+    db: Session,
+    storage: StorageService,
+    cutoff: datetime,
+    batch_size: int = 500,
+    time_budget_seconds: Optional[float] = None,
+    artifacts: Optional[DerivedArtifactStore] = None,
+) -> CleanupResult:
+    """
+    Delete media files created before ``cutoff`` in bounded batches.
+
+    Each batch selects the next ``batch_size`` expired rows in
+    (created_at, id) order, deletes them with one ``DELETE ... RETURNING``
+    (analysis results and segments go by the database's ON DELETE CASCADE),
+    commits, and then deletes the blobs that are no longer referenced, the
+    derived artifacts of content nothing references anymore and any leftover
+    analysis checkpoints in bulk. Memory and transaction size
+    are bounded by the batch, and rows are only locked for the duration of
+    their batch.
+
+    Args:
+        db: Database session; committed after every batch
+        storage: Storage holding the media blobs
+        cutoff: Files created before this time are deleted
+        batch_size: Rows per batch
+        time_budget_seconds: Stop starting new batches after this long
+        artifacts: Store to purge unreferenced content's artifacts from
+
+    Returns:
+        CleanupResult; ``complete`` is False if the budget ran out first
+    """
+    result = CleanupResult()
+    deadline = None if time_budget_seconds is None else time.monotonic() + time_budget_seconds
+    position = None
+
+    while True:
+        if deadline is not None and time.monotonic() >= deadline:
+            result.complete = False
+            cleanup_budget_exhausted_total.inc()
+            logger.info(f"Media cleanup stopped by its time budget after {result.batches} batches")
+            break
+
+        started = time.perf_counter()
+        query = (
+            select(MediaFile.created_at, MediaFile.id)
+            .where(MediaFile.created_at < cutoff)
+            .order_by(MediaFile.created_at, MediaFile.id)
+            .limit(batch_size)
+        )
+        if position is not None:
+            query = query.where(tuple_(MediaFile.created_at, MediaFile.id) > tuple_(*position))
+        keys = db.execute(query).all()
+        if not keys:
+            break
+        position = tuple(keys[-1])
+
+        _delete_media_batch(
+            db, storage, [media_id for _, media_id in keys], result, artifacts
+        )
+        cleanup_batch_seconds.observe(time.perf_counter() - started)
+
+        if len(keys) < batch_size:
+            break
+
+    return result
+
+
+def delete_project_data(
+    db: Session,
+    storage: StorageService,
+    project_id: UUID,
+    batch_size: int = 500,
+    artifacts: Optional[DerivedArtifactStore] = None,
+) -> CleanupResult:
+    """
+    Delete a project's media files, their storage objects and the project itself.
+
+    Media files, including processed renders, are deleted in batches the
+    same way as ``delete_expired_media``, together with the checkpoint files
+    of their analyses, until none are left. The project row and its
+    thumbnail go last, and only while the project has no media, so an
+    interrupted run can simply be started again.
+
+    Args:
+        db: Database session; committed after every batch
+        storage: Storage holding the project's files
+        project_id: Project to delete
+        batch_size: Media files per batch
+        artifacts: Store to purge unreferenced content's artifacts from
+
+    Returns:
+        CleanupResult of the media files deleted
+    """
+    result = CleanupResult()
+
+    while True:
+        started = time.perf_counter()
+        media_ids = list(
+            db.execute(
+                select(MediaFile.id).where(MediaFile.project_id == project_id).limit(batch_size)
+            ).scalars()
+        )
+        if media_ids:
+            _delete_media_batch(db, storage, media_ids, result, artifacts)
+            cleanup_batch_seconds.observe(time.perf_counter() - started)
+            continue
+
+        # Only delete the project once it has no media, so a file added since
+        # the last batch is released above instead of cascading away unseen
+        deleted = db.execute(
+            delete(Project)
+            .where(
+                Project.id == project_id,
+                ~exists().where(MediaFile.project_id == project_id),
+            )
+            .returning(Project.id, Project.thumbnail_path)
+            .execution_options(synchronize_session=False)
+        ).one_or_none()
+        db.commit()
+
+        if deleted is not None:
+            break
+        if db.scalar(select(Project.id).where(Project.id == project_id)) is None:
+            # Already deleted by an earlier run
+            break
+
+    if deleted is not None and deleted.thumbnail_path:
+        _delete_quietly(storage, [deleted.thumbnail_path])
+    projects_deleted_total.inc()
+    return result
+
+
+def _delete_media_batch(
+    db: Session,
+    storage: StorageService,
+    media_ids: List[UUID],
+    result: CleanupResult,
+    artifacts: Optional[DerivedArtifactStore] = None,
+) -> None:
+    """Delete one batch of media files and the storage objects only they used."""
+    # Checkpoints of failed or interrupted analyses are left in storage otherwise
+    checkpoint_paths = [
+        entry["path"]
+        for manifest in db.execute(
+            select(AnalysisResult.checkpoints).where(
+                AnalysisResult.media_file_id.in_(media_ids),
+                AnalysisResult.checkpoints.is_not(None),
+            )
+        ).scalars()
+        for entry in (manifest or {}).values()
+    ]
+
+    released = db.execute(
+        delete(MediaFile)
+        .where(MediaFile.id.in_(media_ids))
+        .returning(MediaFile.stored_filename, MediaFile.file_path, MediaFile.content_hash)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.commit()
+
+    # Hold the blob locks until the storage deletes finish, so an upload
+    # cannot reference a blob between the check and its deletion
+    stored_filenames = {row.stored_filename for row in released}
+    for query in blob_lock_queries(db.get_bind().dialect.name, stored_filenames):
+        db.execute(query)
+    referenced = set(db.execute(referenced_blobs_query(stored_filenames)).scalars())
+    result.deleted_blobs += release_blobs(
+        storage, [(row.stored_filename, row.file_path) for row in released], referenced
+    )
+    if artifacts is not None:
+        result.deleted_artifacts += _purge_artifacts(db, artifacts, released, referenced)
+    db.commit()
+    if checkpoint_paths:
+        _delete_quietly(storage, checkpoint_paths)
+
+    result.deleted_rows += len(released)
+    result.batches += 1
+    cleanup_batches_total.inc()
+    cleanup_rows_deleted_total.inc(len(released))
+
+
+def _purge_artifacts(
+    db: Session,
+    artifacts: DerivedArtifactStore,
+    released: List[Row],
+    referenced: Set[str],
+) -> int:
+    """Delete the derived artifacts of released content that no media file still uses."""
+    hashes = {row.content_hash for row in released if row.content_hash}
+    in_use = set()
+    if hashes:
+        in_use = set(
+            db.execute(
+                select(MediaFile.content_hash).where(MediaFile.content_hash.in_(hashes)).distinct()
+            ).scalars()
+        )
+
+    unused = set()
+    for row in released:
+        if row.content_hash:
+            if row.content_hash not in in_use:
+                unused.add(row.content_hash)
+        elif row.stored_filename not in referenced:
+            # Keyed by stored filename; the row has the attributes source_hash reads
+            unused.add(source_hash(row))
+
+    return sum(artifacts.purge(content_key) for content_key in sorted(unused))
+
+
+def _delete_quietly(storage: StorageService, paths: List[str]) -> None:
+    """Delete storage objects whose rows are already gone, logging failures."""
+    try:
+        storage.delete_files(paths)
+    except Exception as e:
+        logger.warning(f"Failed to delete {len(paths)} files: {e}")
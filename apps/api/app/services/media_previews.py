@@ -0,0 +1,248 @@
+"""Poster frames and hover-scrubbing sprite sheets for videos."""
+
+import logging
+import math
+import shutil
+import uuid
+from pathlib import Path
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.media import MediaFile
+from app.models.project import Project, ProjectStatus
+from app.services.artifact_store import (
+    PREVIEW_INDEX,
+    PREVIEW_POSTER,
+    PREVIEW_SPRITE,
+    DerivedArtifactStore,
+)
+from app.services.storage_service import StorageService
+from app.utils.ffmpeg_utils import get_media_info, render_preview_images
+
+logger = logging.getLogger(__name__)
+
+# Preferred poster position as a fraction of the duration, past intros and fades
+POSTER_POSITION = 0.1
+
+
+class PreviewUnavailableError(Exception):
+    """The media has no video stream or duration to preview."""
+
+
+def has_video(media_file: MediaFile) -> bool:
+    """Check whether previews apply to a media file."""
+    return bool(media_file.mime_type and media_file.mime_type.startswith("video/"))
+
+
+def preview_params() -> dict:
+    """Get the settings that affect preview images."""
+    settings = get_settings()
+    return {
+        "poster_width": settings.preview_poster_width,
+        "tile_width": settings.preview_tile_width,
+        "columns": settings.preview_sprite_columns,
+        "rows": settings.preview_sprite_rows,
+        "min_interval": settings.preview_min_interval_seconds,
+    }
+
+
+def sprite_layout(duration: float, width: int, height: int, params: dict) -> dict:
+    """
+    Plan the sprite sheet of a video.
+
+    Tiles are spaced evenly over the whole video, but never closer than
+    ``min_interval``, so short videos get fewer tiles rather than repeats.
+
+    Args:
+        duration: Video duration in seconds
+        width: Video width in pixels
+        height: Video height in pixels
+        params: Preview parameters from ``preview_params``
+
+    Returns:
+        Layout with the tile size, grid, count and interval
+    """
+    columns = params["columns"]
+    max_tiles = columns * params["rows"]
+    interval = max(duration / max_tiles, params["min_interval"])
+    tile_count = max(1, min(max_tiles, math.ceil(duration / interval)))
+    tile_width = params["tile_width"]
+    # Even dimensions keep the JPEG encoder's chroma subsampling happy
+    tile_height = max(2, round(tile_width * height / width / 2) * 2)
+
+    return {
+        "duration": duration,
+        "interval": interval,
+        "tile_width": tile_width,
+        "tile_height": tile_height,
+        "columns": min(columns, tile_count),
+        "rows": math.ceil(tile_count / columns),
+        "tile_count": tile_count,
+    }
+
+
+def format_sprite_vtt(layout: dict, sprite_url: str) -> str:
+    """
+    Build the WebVTT index of a sprite sheet.
+
+    Each cue covers one tile's interval and points at the tile with a
+    ``#xywh=`` media fragment, the format video players use for thumbnails.
+    """
+    interval = layout["interval"]
+    width = layout["tile_width"]
+    height = layout["tile_height"]
+    lines = ["WEBVTT", ""]
+
+    for i in range(layout["tile_count"]):
+        start = i * interval
+        end = layout["duration"] if i == layout["tile_count"] - 1 else (i + 1) * interval
+        x = (i % layout["columns"]) * width
+        y = (i // layout["columns"]) * height
+        lines.append(f"{_timestamp(start)} --> {_timestamp(end)}")
+        lines.append(f"{sprite_url}#xywh={x},{y},{width},{height}")
+        lines.append("")
+
+    return "\n".join(lines)
+
+
+def generate_previews(
+    store: DerivedArtifactStore,
+    content_hash: str,
+    source_path: Path,
+    params: Optional[dict] = None,
+) -> dict:
+    """
+    Make sure the poster, sprite sheet and sprite layout of a video are stored.
+
+    All three are derived artifacts of the content, so identical uploads
+    share them. Whatever is missing is rendered by a single keyframe-only
+    ffmpeg pass.
+
+    Args:
+        store: Derived artifact store
+        content_hash: Content key of the video
+        source_path: Local path of the video
+        params: Preview parameters; defaults to ``preview_params()``
+
+    Returns:
+        The sprite layout
+
+    Raises:
+        PreviewUnavailableError: If the file has no video stream or duration
+        FFmpegError: If rendering fails
+    """
+    params = params or preview_params()
+    rendered = {}
+
+    with store.scratch.job("preview") as scratch:
+
+        def render() -> dict:
+            if rendered:
+                return rendered
+
+            info = get_media_info(source_path) or {}
+            video = next(
+                (
+                    s
+                    for s in info.get("streams", [])
+                    if s.get("codec_type") == "video"
+                    and not s.get("disposition", {}).get("attached_pic")
+                ),
+                None,
+            )
+            duration = float(info.get("format", {}).get("duration") or 0)
+            if video is None or not video.get("width") or duration <= 0:
+                raise PreviewUnavailableError(f"No video to preview in {source_path.name}")
+
+            layout = sprite_layout(duration, video["width"], video["height"], params)
+            poster_path = scratch.file("poster.jpg")
+            sprite_path = scratch.file("sprite.jpg")
+            render_preview_images(
+                source_path,
+                poster_path,
+                sprite_path,
+                poster_time=duration * POSTER_POSITION,
+                poster_width=params["poster_width"],
+                interval=layout["interval"],
+                tile_size=(layout["tile_width"], layout["tile_height"]),
+                grid=(layout["columns"], layout["rows"]),
+            )
+            rendered.update(layout=layout, poster=poster_path, sprite=sprite_path)
+            return rendered
+
+        store.get_or_compute_file(
+            content_hash,
+            PREVIEW_POSTER,
+            params,
+            lambda output_path: shutil.copyfile(render()["poster"], output_path),
+            ".jpg",
+        )
+        store.get_or_compute_file(
+            content_hash,
+            PREVIEW_SPRITE,
+            params,
+            lambda output_path: shutil.copyfile(render()["sprite"], output_path),
+            ".jpg",
+        )
+        # Recorded last, so a stored layout means its images were stored too
+        return store.get_or_compute_json(
+            content_hash, PREVIEW_INDEX, params, lambda: render()["layout"]
+        )
+
+
+def use_poster_as_thumbnail(
+    db: Session,
+    storage: StorageService,
+    project_id: UUID,
+    poster_path: Path,
+) -> Optional[str]:
+    """
+    Give a project without a thumbnail a copy of a video's poster.
+
+    The copy belongs to the project like an uploaded thumbnail, so replacing
+    or deleting it never touches the shared poster artifact.
+
+    Returns:
+        Storage key of the new thumbnail, or None if the project already had one
+    """
+    current = db.execute(
+        select(Project.thumbnail_path).where(Project.id == project_id)
+    ).one_or_none()
+    db.commit()
+    if current is None or current.thumbnail_path is not None:
+        return None
+
+    filename = f"thumbnails/{project_id}_{uuid.uuid4().hex[:8]}.jpg"
+    with open(poster_path, "rb") as f:
+        storage.save_file(f, filename)
+
+    # Only if no thumbnail was uploaded meanwhile
+    updated = db.execute(
+        update(Project)
+        .where(
+            Project.id == project_id,
+            Project.thumbnail_path.is_(None),
+            Project.status != ProjectStatus.DELETING,
+        )
+        .values(thumbnail_path=filename)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+
+    if not updated:
+        storage.delete_file(filename)
+        return None
+    return filename
+
+
+def _timestamp(seconds: float) -> str:
+    """Format seconds as a WebVTT timestamp."""
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}.{millis:03d}"
@@ -0,0 +1,233 @@
+"""Managed scratch space for temporary files of processing jobs."""
+
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator, Optional
+
+from app.config import get_settings
+from app.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+metrics = get_metrics()
+
+# Shared-memory filesystem used when no scratch directory is configured
+MEMORY_ROOT = Path("/dev/shm")
+NAMESPACE = "clipflow-scratch"
+
+scratch_job_bytes = metrics.histogram(
+    "scratch_job_bytes",
+    "Scratch space used by a job when it finished",
+    buckets=(1e6, 1e7, 1e8, 5e8, 1e9, 5e9, 1e10),
+)
+scratch_quota_exceeded_total = metrics.counter(
+    "scratch_quota_exceeded_total",
+    "Jobs stopped for exceeding their scratch quota",
+)
+scratch_fallbacks_total = metrics.counter(
+    "scratch_fallbacks_total",
+    "Jobs placed on disk because the memory-backed root lacked free space",
+)
+
+
+class ScratchQuotaExceededError(Exception):
+    """A job wrote more to its scratch directory than its quota allows."""
+
+
+def _directory_size(path: Path) -> int:
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, filename)).st_size
+            except FileNotFoundError:
+                continue
+    return total
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ScratchSpace:
+    """A job's private scratch directory."""
+
+    def __init__(self, path: Path, quota_bytes: Optional[int]):
+        self.path = path
+        self.quota_bytes = quota_bytes
+
+    def file(self, name: str) -> Path:
+        """Get a path for a file in this job's directory."""
+        return self.path / name
+
+    def usage(self) -> int:
+        """Bytes currently stored in this job's directory."""
+        return _directory_size(self.path)
+
+    def check_quota(self) -> None:
+        """Raise ScratchQuotaExceededError if the job is over its quota."""
+        if self.quota_bytes is None:
+            return
+        used = self.usage()
+        if used > self.quota_bytes:
+            scratch_quota_exceeded_total.inc()
+            raise ScratchQuotaExceededError(
+                f"Scratch space for {self.path.name} is {used} bytes, "
+                f"over its quota of {self.quota_bytes}"
+            )
+
+
+class ScratchManager:
+    """
+    Allocates per-job scratch directories under one root.
+
+    Every job gets its own directory named after the job, the owning
+    process and a random suffix, and the directory is removed when the
+    job's context exits, whether it succeeded or not. Directories left by
+    killed processes are reclaimed by ``sweep_stale``; nothing outside the
+    root is ever touched.
+
+    The root is memory-backed (``/dev/shm``) by default when available, so
+    intermediate WAV and chunk I/O stays off disk. Jobs that expect more
+    data than the memory root has free are placed under ``disk_root``.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        disk_root: Path,
+        quota_bytes: Optional[int] = None,
+    ):
+        self.root = root / NAMESPACE
+        self.disk_root = disk_root / NAMESPACE
+        self.quota_bytes = quota_bytes
+        self._active = 0
+        self._lock = threading.Lock()
+        for path in (self.root, self.disk_root):
+            path.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def active_jobs(self) -> int:
+        """Number of scratch directories currently in use by this process."""
+        return self._active
+
+    @contextmanager
+    def job(
+        self,
+        name: str,
+        quota_bytes: Optional[int] = None,
+        expected_bytes: int = 0,
+    ) -> Iterator[ScratchSpace]:
+        """
+        Create a scratch directory for a job and remove it on exit.
+
+        Args:
+            name: Job name, used as the directory prefix
+            quota_bytes: Maximum bytes the job may store; defaults to the manager's quota
+            expected_bytes: Estimated peak usage, used to choose the root
+
+        Yields:
+            The job's scratch space
+        """
+        root = self._root_for(expected_bytes)
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", name)[:64]
+        path = root / f"{safe_name}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        path.mkdir()
+        space = ScratchSpace(path, quota_bytes if quota_bytes is not None else self.quota_bytes)
+
+        with self._lock:
+            self._active += 1
+        try:
+            yield space
+        finally:
+            try:
+                scratch_job_bytes.observe(space.usage())
+            finally:
+                shutil.rmtree(path, ignore_errors=True)
+                with self._lock:
+                    self._active -= 1
+
+    def mkdtemp(self, prefix: str = "unmanaged-") -> Path:
+        """
+        Create a scratch directory the caller must remove itself.
+
+        For code whose outputs outlive a ``with`` block. Leftovers are
+        reclaimed by ``sweep_stale`` once their process has exited.
+        """
+        path = self.root / f"{prefix}{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        path.mkdir()
+        return path
+
+    def sweep_stale(self, max_age_seconds: float) -> int:
+        """
+        Remove job directories older than ``max_age_seconds`` whose process has exited.
+
+        Returns:
+            Number of directories removed
+        """
+        removed = 0
+        cutoff = time.time() - max_age_seconds
+        for root in {self.root, self.disk_root}:
+            for entry in root.iterdir():
+                if not entry.is_dir():
+                    continue
+                match = re.search(r"-(\d+)-[0-9a-f]{8}$", entry.name)
+                try:
+                    if entry.stat().st_mtime > cutoff:
+                        continue
+                except FileNotFoundError:
+                    continue
+                if match and _pid_alive(int(match.group(1))):
+                    continue
+                shutil.rmtree(entry, ignore_errors=True)
+                removed += 1
+        return removed
+
+    def _root_for(self, expected_bytes: int) -> Path:
+        """Choose the memory root unless the job would not fit in it."""
+        if expected_bytes <= 0 or self.root == self.disk_root:
+            return self.root
+        if shutil.disk_usage(self.root).free < expected_bytes:
+            scratch_fallbacks_total.inc()
+            return self.disk_root
+        return self.root
+
+
+@lru_cache
+def get_scratch_manager() -> ScratchManager:
+    """Get the per-process scratch manager."""
+    settings = get_settings()
+    disk_root = Path(settings.scratch_disk_dir or tempfile.gettempdir())
+    if settings.scratch_dir:
+        root = Path(settings.scratch_dir)
+    elif MEMORY_ROOT.is_dir() and os.access(MEMORY_ROOT, os.W_OK):
+        root = MEMORY_ROOT
+    else:
+        root = disk_root
+
+    manager = ScratchManager(
+        root=root,
+        disk_root=disk_root,
+        quota_bytes=settings.scratch_job_quota_mb * 1024 * 1024,
+    )
+    metrics.gauge(
+        "scratch_jobs_active",
+        "Scratch directories in use by this process",
+        lambda: manager.active_jobs,
+    )
+    return manager
+
@@ -1,12 +1,19 @@
 """Segment post-processing service."""
 
+from bisect import bisect_right
 from dataclasses import asdict, dataclass
-from typing import List, Literal, Optional
+from typing import List, Literal, Optional, Sequence
+
+import numpy as np
 
 from app.config import get_settings
 
 settings = get_settings()
 
+SEGMENT_TYPES = ("speech", "silence", "filler")
+SPEECH, SILENCE, FILLER = range(len(SEGMENT_TYPES))
+CLASSIFICATIONS = ("keep", "remove", "suggest_remove")
+
 
 @dataclass
 class ProcessedSegment:
@@ -25,6 +32,145 @@ class ProcessedSegment:
         return asdict(self)
 
 
+class SegmentTable:
+    """
+    Columnar segment storage.
+
+    Times, type codes and confidences are NumPy arrays; text and filler
+    words live in a shared side list referenced by index (-1 for None), so
+    filtering and reordering never touch the strings. Type codes index
+    ``type_names``, which starts with ``SEGMENT_TYPES``.
+    """
+
+    def __init__(
+        self,
+        start_ms: np.ndarray,
+        end_ms: np.ndarray,
+        type_codes: np.ndarray,
+        confidence: np.ndarray,
+        text_index: np.ndarray,
+        filler_index: np.ndarray,
+        strings: List[str],
+        type_names: Sequence[str] = SEGMENT_TYPES,
+    ):
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.type_codes = type_codes
+        self.confidence = confidence
+        self.text_index = text_index
+        self.filler_index = filler_index
+        self.strings = strings
+        self.type_names = list(type_names)
+
+    @classmethod
+    def from_dicts(cls, segments: List[dict]) -> "SegmentTable":
+        """Build a table from segment dictionaries."""
+        other_types = {s.get("type", "speech") for s in segments} - set(SEGMENT_TYPES)
+        type_names = list(SEGMENT_TYPES) + sorted(other_types)
+        type_lookup = {name: code for code, name in enumerate(type_names)}
+
+        count = len(segments)
+        if not count:
+            empty = np.empty(0, dtype=np.int64)
+            return cls(
+                empty,
+                empty,
+                empty.astype(np.int16),
+                empty.astype(np.float64),
+                empty,
+                empty,
+                [],
+                type_names,
+            )
+
+        # One pass over the dicts, then one array conversion per column
+        starts, ends, codes, confidences, texts, fillers = zip(
+            *[
+                (
+                    s.get("start_ms", 0),
+                    s.get("end_ms", 0),
+                    type_lookup[s.get("type", "speech")],
+                    s.get("confidence", 0.0),
+                    s.get("text"),
+                    s.get("filler_word"),
+                )
+                for s in segments
+            ]
+        )
+
+        # Row i's text is strings[i] and its filler word strings[count + i]
+        positions = np.arange(count, dtype=np.int64)
+
+        def side_index(values: tuple, offset: int) -> np.ndarray:
+            missing = np.fromiter((v is None for v in values), dtype=bool, count=count)
+            return np.where(missing, -1, positions + offset)
+
+        return cls(
+            start_ms=np.array(starts, dtype=np.int64),
+            end_ms=np.array(ends, dtype=np.int64),
+            type_codes=np.array(codes, dtype=np.int16),
+            confidence=np.array(confidences, dtype=np.float64),
+            text_index=side_index(texts, 0),
+            filler_index=side_index(fillers, count),
+            strings=list(texts + fillers),
+            type_names=type_names,
+        )
+
+    def __len__(self) -> int:
+        return len(self.start_ms)
+
+    def take(self, index: np.ndarray) -> "SegmentTable":
+        """Select rows by integer index or boolean mask."""
+        return SegmentTable(
+            self.start_ms[index],
+            self.end_ms[index],
+            self.type_codes[index],
+            self.confidence[index],
+            self.text_index[index],
+            self.filler_index[index],
+            self.strings,
+            self.type_names,
+        )
+
+    def classifications(self) -> List[str]:
+        """Classify rows by type: speech keep, silence remove, filler suggest_remove."""
+        lookup = [
+            CLASSIFICATIONS[code] if code < len(CLASSIFICATIONS) else "keep"
+            for code in range(len(self.type_names))
+        ]
+        return [lookup[code] for code in self.type_codes.tolist()]
+
+    def _column(self, index: np.ndarray) -> List[Optional[str]]:
+        return [self.strings[i] if i >= 0 else None for i in index.tolist()]
+
+    def to_dicts(self) -> List[dict]:
+        """Convert rows to dictionaries for storage and the API."""
+        return [
+            {
+                "start_ms": start,
+                "end_ms": end,
+                "type": self.type_names[code],
+                "confidence": confidence,
+                "text": text,
+                "filler_word": filler_word,
+                "classification": classification,
+            }
+            for start, end, code, confidence, text, filler_word, classification in zip(
+                self.start_ms.tolist(),
+                self.end_ms.tolist(),
+                self.type_codes.tolist(),
+                self.confidence.tolist(),
+                self._column(self.text_index),
+                self._column(self.filler_index),
+                self.classifications(),
+            )
+        ]
+
+    def to_segments(self) -> List[ProcessedSegment]:
+        """Convert rows to ProcessedSegment objects."""
+        return [ProcessedSegment(**row) for row in self.to_dicts()]
+
+
 class SegmentProcessor:
     """Service for post-processing detected segments."""
 
@@ -49,6 +195,16 @@ class SegmentProcessor:
         self.merge_threshold_ms = merge_threshold_ms
         self.speech_padding_ms = speech_padding_ms
 
+    @property
+    def params(self) -> dict:
+        """Return the processing parameters, for storing alongside results."""
+        return {
+            "min_silence_duration_ms": self.min_silence_duration_ms,
+            "min_speech_duration_ms": self.min_speech_duration_ms,
+            "merge_threshold_ms": self.merge_threshold_ms,
+            "speech_padding_ms": self.speech_padding_ms,
+        }
+
     def process_segments(
         self,
         segments: List[dict],
@@ -64,176 +220,148 @@ class SegmentProcessor:
         Returns:
             List of processed segments with classifications
         """
-        if not segments:
-            return []
-
-        # Convert to ProcessedSegment objects
-        processed = [
-            ProcessedSegment(
-                start_ms=s.get("start_ms", 0),
-                end_ms=s.get("end_ms", 0),
-                type=s.get("type", "speech"),
-                confidence=s.get("confidence", 0.0),
-                text=s.get("text"),
-                filler_word=s.get("filler_word"),
-            )
-            for s in segments
-        ]
+        return self.process_table(segments, total_duration_ms).to_segments()
+
+    def process_table(
+        self,
+        segments: List[dict],
+        total_duration_ms: Optional[int] = None,
+    ) -> SegmentTable:
+        """
+        Process segments into a classified segment table.
+
+        Args:
+            segments: List of segment dictionaries
+            total_duration_ms: Total audio duration in milliseconds
+
+        Returns:
+            Table of processed segments; classification is derived from type
+        """
+        table = SegmentTable.from_dicts(segments)
+        if not len(table):
+            return table
 
         # Apply minimum duration filters
-        processed = self._apply_duration_filters(processed)
+        table = self._apply_duration_filters(table)
 
         # Merge close segments
-        processed = self._merge_close_segments(processed)
+        table = self._merge_close_segments(table)
 
         # Add padding to speech segments
-        processed = self._add_padding(processed, total_duration_ms)
-
-        # Classify segments
-        processed = self._classify_segments(processed)
+        table = self._add_padding(table, total_duration_ms)
 
-        return processed
+        return table
 
-    def _apply_duration_filters(
-        self,
-        segments: List[ProcessedSegment],
-    ) -> List[ProcessedSegment]:
+    def _apply_duration_filters(self, table: SegmentTable) -> SegmentTable:
         """Filter out segments that don't meet minimum duration."""
-        filtered = []
+        duration = table.end_ms - table.start_ms
+        too_short = ((table.type_codes == SILENCE) & (duration < self.min_silence_duration_ms)) | (
+            (table.type_codes == SPEECH) & (duration < self.min_speech_duration_ms)
+        )
+        return table.take(~too_short)
 
-        for seg in segments:
-            duration = seg.end_ms - seg.start_ms
-
-            if seg.type == "silence" and duration < self.min_silence_duration_ms:
-                continue
-            if seg.type == "speech" and duration < self.min_speech_duration_ms:
-                continue
-
-            filtered.append(seg)
-
-        return filtered
-
-    def _merge_close_segments(
-        self,
-        segments: List[ProcessedSegment],
-    ) -> List[ProcessedSegment]:
+    def _merge_close_segments(self, table: SegmentTable) -> SegmentTable:
         """Merge segments of the same type that are close together."""
-        if len(segments) < 2:
-            return segments
+        if len(table) < 2:
+            return table
 
         # Sort by start time
-        sorted_segments = sorted(segments, key=lambda x: x.start_ms)
-        merged = [sorted_segments[0]]
-
-        for current in sorted_segments[1:]:
-            previous = merged[-1]
-
-            # Check if same type and close enough to merge
-            if (
-                current.type == previous.type
-                and current.start_ms - previous.end_ms <= self.merge_threshold_ms
-            ):
-                # Merge segments
-                merged[-1] = ProcessedSegment(
-                    start_ms=previous.start_ms,
-                    end_ms=current.end_ms,
-                    type=previous.type,
-                    confidence=(previous.confidence + current.confidence) / 2,
-                    text=(
-                        f"{previous.text or ''} {current.text or ''}".strip()
-                        if previous.text or current.text
-                        else None
-                    ),
-                    filler_word=previous.filler_word or current.filler_word,
+        table = table.take(np.argsort(table.start_ms, kind="stable"))
+
+        # A merged run always ends where its latest member ends, so each row
+        # only needs comparing with the row before it
+        joins_previous = (table.type_codes[1:] == table.type_codes[:-1]) & (
+            table.start_ms[1:] - table.end_ms[:-1] <= self.merge_threshold_ms
+        )
+        if not joins_previous.any():
+            return table
+
+        starts_group = np.concatenate(([True], ~joins_previous))
+        group = np.cumsum(starts_group) - 1
+        firsts = np.flatnonzero(starts_group)
+        lasts = np.append(firsts[1:] - 1, len(table) - 1)
+        sizes = lasts - firsts + 1
+
+        merged = table.take(firsts)
+        merged.end_ms = table.end_ms[lasts]
+
+        # Pairwise averaging halves the running value at every merge: the
+        # k-th member of a run of n contributes with weight 2^-(n-k), the
+        # first with 2^-(n-1)
+        position = np.arange(len(table)) - firsts[group]
+        exponent = np.where(position == 0, sizes[group] - 1, sizes[group] - position)
+        merged.confidence = np.bincount(
+            group, weights=table.confidence * np.exp2(-exponent.astype(np.float64))
+        )
+
+        # Text and filler words are folded pairwise, as strings must be
+        strings = table.strings
+        texts = table._column(table.text_index)
+        fillers = table._column(table.filler_index)
+        firsts_list = firsts.tolist()
+        lasts_list = lasts.tolist()
+        for g in np.flatnonzero(sizes > 1).tolist():
+            first, last = firsts_list[g], lasts_list[g]
+            text, filler_word = texts[first], fillers[first]
+            for i in range(first + 1, last + 1):
+                current_text = texts[i]
+                text = (
+                    f"{text or ''} {current_text or ''}".strip() if text or current_text else None
                 )
-            else:
-                merged.append(current)
+                filler_word = filler_word or fillers[i]
+
+            merged.text_index[g] = self._intern(strings, text)
+            merged.filler_index[g] = self._intern(strings, filler_word)
 
         return merged
 
+    def _intern(self, strings: List[str], value: Optional[str]) -> int:
+        """Append a value to a table's string side list."""
+        if value is None:
+            return -1
+        strings.append(value)
+        return len(strings) - 1
+
     def _add_padding(
         self,
-        segments: List[ProcessedSegment],
+        table: SegmentTable,
         total_duration_ms: Optional[int] = None,
-    ) -> List[ProcessedSegment]:
+    ) -> SegmentTable:
         """Add padding around speech segments."""
-        if not segments:
-            return segments
-
-        padded = []
-
-        for i, seg in enumerate(segments):
-            if seg.type == "speech":
-                # Calculate padded boundaries
-                new_start = max(0, seg.start_ms - self.speech_padding_ms)
-                new_end = seg.end_ms + self.speech_padding_ms
-
-                # Constrain to total duration if provided
-                if total_duration_ms:
-                    new_end = min(new_end, total_duration_ms)
-
+        if not len(table):
+            return table
+
+        is_speech = table.type_codes == SPEECH
+        starts = np.where(
+            is_speech, np.maximum(0, table.start_ms - self.speech_padding_ms), table.start_ms
+        )
+        ends = np.where(is_speech, table.end_ms + self.speech_padding_ms, table.end_ms)
+
+        # Constrain to total duration if provided
+        if total_duration_ms:
+            ends = np.where(is_speech, np.minimum(ends, total_duration_ms), ends)
+
+        if np.all(ends[1:] >= ends[:-1]) and np.all((ends > starts) | is_speech):
+            # With non-decreasing ends and no empty non-speech rows, the
+            # previously kept row always ends where the previous row ends
+            starts[1:] = np.maximum(starts[1:], ends[:-1])
+            keep = is_speech | (ends > starts)
+        else:
+            keep = np.zeros(len(table), dtype=bool)
+            last_end = None
+            for i in range(len(table)):
                 # Avoid overlap with previous segment
-                if padded and new_start < padded[-1].end_ms:
-                    new_start = padded[-1].end_ms
-
-                padded.append(
-                    ProcessedSegment(
-                        start_ms=new_start,
-                        end_ms=new_end,
-                        type=seg.type,
-                        confidence=seg.confidence,
-                        text=seg.text,
-                        filler_word=seg.filler_word,
-                    )
-                )
-            else:
-                # Adjust silence/filler to not overlap with padded speech
-                if padded and seg.start_ms < padded[-1].end_ms:
-                    seg = ProcessedSegment(
-                        start_ms=padded[-1].end_ms,
-                        end_ms=seg.end_ms,
-                        type=seg.type,
-                        confidence=seg.confidence,
-                        text=seg.text,
-                        filler_word=seg.filler_word,
-                    )
-
-                if seg.end_ms > seg.start_ms:
-                    padded.append(seg)
-
+                if last_end is not None and starts[i] < last_end:
+                    starts[i] = last_end
+                if is_speech[i] or ends[i] > starts[i]:
+                    keep[i] = True
+                    last_end = ends[i]
+
+        padded = table.take(keep)
+        padded.start_ms = starts[keep]
+        padded.end_ms = ends[keep]
         return padded
 
-    def _classify_segments(
-        self,
-        segments: List[ProcessedSegment],
-    ) -> List[ProcessedSegment]:
-        """Classify segments as keep, remove, or suggest_remove."""
-        classified = []
-
-        for seg in segments:
-            if seg.type == "speech":
-                classification = "keep"
-            elif seg.type == "silence":
-                classification = "remove"
-            elif seg.type == "filler":
-                classification = "suggest_remove"
-            else:
-                classification = "keep"
-
-            classified.append(
-                ProcessedSegment(
-                    start_ms=seg.start_ms,
-                    end_ms=seg.end_ms,
-                    type=seg.type,
-                    confidence=seg.confidence,
-                    text=seg.text,
-                    filler_word=seg.filler_word,
-                    classification=classification,
-                )
-            )
-
-        return classified
-
     def generate_edl(
         self,
         segments: List[ProcessedSegment],
@@ -275,13 +403,87 @@ class SegmentProcessor:
         return f"{hours:02d}:{minutes:02d}:{seconds:02d}:{frames:02d}"
 
 
+def apply_classification_overrides(segments: List[dict], overrides: List[dict]) -> None:
+    """
+    Apply editor classification overrides to processed segments in place.
+
+    Overrides are anchored to a point in time rather than a list index, so
+    they survive re-processing with different merge or padding settings.
+
+    Args:
+        segments: Processed segment dictionaries, ordered by start time
+        overrides: Dictionaries with ``at_ms`` and ``classification``
+    """
+    starts = [s["start_ms"] for s in segments]
+    for override in overrides:
+        index = bisect_right(starts, override["at_ms"]) - 1
+        if index >= 0 and override["at_ms"] < segments[index]["end_ms"]:
+            segments[index]["classification"] = override["classification"]
+
+
+def diff_segments(old: List[dict], new: List[dict]) -> List[dict]:
+    """
+    Compute the changed index ranges between two processed segment lists.
+
+    Both lists are walked in time order; rows that differ are grouped into
+    hunks until the lists line up on an identical row again. Replacing
+    ``old[old_start:old_end]`` with each hunk's ``segments`` (from the last
+    hunk backwards) turns ``old`` into ``new``.
+
+    Args:
+        old: Previously stored processed segments
+        new: Newly processed segments
+
+    Returns:
+        List of hunks with old_start, old_end, new_start, new_end and segments
+    """
+    hunks = []
+    i = j = 0
+    while i < len(old) or j < len(new):
+        if i < len(old) and j < len(new) and old[i] == new[j]:
+            i += 1
+            j += 1
+            continue
+
+        old_start, new_start = i, j
+        while i < len(old) or j < len(new):
+            if i < len(old) and j < len(new) and old[i] == new[j]:
+                break
+            # Advance whichever side ends first to stay aligned in time
+            if j >= len(new) or (i < len(old) and old[i]["end_ms"] <= new[j]["end_ms"]):
+                i += 1
+            else:
+                j += 1
+
+        hunks.append(
+            {
+                "old_start": old_start,
+                "old_end": i,
+                "new_start": new_start,
+                "new_end": j,
+                "segments": new[new_start:j],
+            }
+        )
+
+    return hunks
+
+
 def get_segment_processor(
     min_silence_duration_ms: Optional[int] = None,
     min_speech_duration_ms: Optional[int] = None,
+    merge_threshold_ms: Optional[int] = None,
+    speech_padding_ms: Optional[int] = None,
 ) -> SegmentProcessor:
     """Get segment processor instance."""
+    options = {}
+    if merge_threshold_ms is not None:
+        options["merge_threshold_ms"] = merge_threshold_ms
+    if speech_padding_ms is not None:
+        options["speech_padding_ms"] = speech_padding_ms
+
     return SegmentProcessor(
         min_silence_duration_ms=min_silence_duration_ms
         or settings.min_silence_duration_ms,
         min_speech_duration_ms=min_speech_duration_ms or settings.min_speech_duration_ms,
+        **options,
     )
@@ -0,0 +1,102 @@
+"""Storage of processed analysis segments as table rows."""
+
+import uuid
+from typing import Iterable, List, Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.analysis_segment import AnalysisSegment
+
+SEGMENT_FIELDS = (
+    "start_ms",
+    "end_ms",
+    "type",
+    "confidence",
+    "text",
+    "filler_word",
+    "classification",
+)
+
+
+class SegmentStore:
+    """
+    Read and write the segments of an analysis.
+
+    Segments are stored one row per segment and indexed by
+    (analysis_id, start_ms), so callers can fetch a time window or a subset
+    of types without loading the whole list. Reads select plain columns
+    rather than ORM objects.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def replace(self, analysis_id: uuid.UUID, segments: List[dict]) -> None:
+        """
+        Replace all segments of an analysis.
+
+        Does not commit; the caller commits along with its other changes.
+
+        Args:
+            analysis_id: Analysis the segments belong to
+            segments: Segment dictionaries, ordered by start time
+        """
+        self.db.execute(delete(AnalysisSegment).where(AnalysisSegment.analysis_id == analysis_id))
+        if not segments:
+            return
+
+        self.db.execute(
+            insert(AnalysisSegment),
+            [
+                {
+                    "analysis_id": analysis_id,
+                    "position": position,
+                    **{field: segment.get(field) for field in SEGMENT_FIELDS},
+                }
+                for position, segment in enumerate(segments)
+            ],
+        )
+
+    def list_segments(
+        self,
+        analysis_id: uuid.UUID,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        types: Optional[Iterable[str]] = None,
+    ) -> List[dict]:
+        """
+        List segments in time order, optionally limited to a window and types.
+
+        Args:
+            analysis_id: Analysis to read
+            start_ms: Only segments ending after this time
+            end_ms: Only segments starting before this time
+            types: Only segments of these types
+
+        Returns:
+            List of segment dictionaries
+        """
+        columns = [getattr(AnalysisSegment, field) for field in SEGMENT_FIELDS]
+        query = select(*columns).where(AnalysisSegment.analysis_id == analysis_id)
+
+        if end_ms is not None:
+            query = query.where(AnalysisSegment.start_ms < end_ms)
+        if start_ms is not None:
+            query = query.where(AnalysisSegment.end_ms > start_ms)
+        if types is not None:
+            query = query.where(AnalysisSegment.type.in_(tuple(types)))
+
+        rows = self.db.execute(query.order_by(AnalysisSegment.position))
+        return [dict(zip(SEGMENT_FIELDS, row)) for row in rows]
+
+    def count(self, analysis_id: uuid.UUID) -> int:
+        """Count the segments of an analysis."""
+        return self.db.execute(
+            select(func.count()).where(AnalysisSegment.analysis_id == analysis_id)
+        ).scalar_one()
+
+
+def get_segment_store(db: Session) -> SegmentStore:
+    """Get segment store for a database session."""
+    return SegmentStore(db)
@@ -1,19 +1,262 @@
 """Storage service for file management (local and S3)."""
 
+import logging
 import os
 import shutil
+import tempfile
+import time
+import uuid
 from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import BinaryIO, Optional
+from typing import AsyncIterator, BinaryIO, Iterator, List, Optional
 from uuid import UUID
 
+import anyio
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config
 from botocore.exceptions import ClientError
 
 from app.config import get_settings
+from app.services.file_cache import get_file_cache
+from app.utils.metrics import get_metrics
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
+metrics = get_metrics()
+
+# Maximum keys accepted by one S3 DeleteObjects request
+S3_DELETE_BATCH_SIZE = 1000
+
+transfer_seconds = metrics.histogram(
+    "storage_transfer_seconds",
+    "Duration of whole-object storage transfers",
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+)
+transfer_bytes_total = metrics.counter(
+    "storage_transfer_bytes_total",
+    "Bytes moved by whole-object storage transfers",
+)
+
+
+def iter_file_range(
+    file_path: Path, start: int, length: int, chunk_size: int = 65536
+) -> Iterator[bytes]:
+    """Yield ``length`` bytes of a local file starting at ``start``."""
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            data = f.read(min(chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+
+
+async def aiter_file_range(
+    file_path: Path, start: int = 0, length: Optional[int] = None, chunk_size: int = 65536
+) -> AsyncIterator[bytes]:
+    """Asynchronously yield bytes of a local file from ``start``, to EOF if ``length`` is None."""
+    async with await anyio.open_file(file_path, "rb") as f:
+        await f.seek(start)
+        remaining = length
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            data = await f.read(size)
+            if not data:
+                break
+            if remaining is not None:
+                remaining -= len(data)
+            yield data
+
+
+async def aiter_in_thread(iterator: Iterator[bytes]) -> AsyncIterator[bytes]:
+    """Yield from a blocking iterator, advancing it in a worker thread."""
+    while True:
+        chunk = await anyio.to_thread.run_sync(next, iterator, None)
+        if chunk is None:
+            break
+        yield chunk
+
+
+class StorageWriter(ABC):
+    """
+    Incremental writer for one stored object, created by ``open_write``.
+
+    Chunks passed to ``write`` are not buffered beyond what the backend needs
+    to transfer them. ``path`` is set to the storage path once committed.
+    """
+
+    def __init__(self):
+        self.path: Optional[str] = None
+        self.bytes_written = 0
+
+    async def write(self, data: bytes) -> None:
+        """Append a chunk to the object."""
+        await self._write(data)
+        self.bytes_written += len(data)
+
+    @abstractmethod
+    async def _write(self, data: bytes) -> None:
+        pass
+
+    @abstractmethod
+    async def commit(self) -> str:
+        """Finish the object and return its storage path."""
+        pass
+
+    @abstractmethod
+    async def abort(self) -> None:
+        """Discard everything written so far."""
+        pass
+
+
+class _SpooledWriter(StorageWriter):
+    """Writer for backends without native streaming writes: spools, then saves."""
+
+    def __init__(self, backend: "StorageBackend", filename: str):
+        super().__init__()
+        self.backend = backend
+        self.filename = filename
+        self.spool = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+
+    async def _write(self, data: bytes) -> None:
+        await anyio.to_thread.run_sync(self.spool.write, data)
+
+    async def commit(self) -> str:
+        self.spool.seek(0)
+        try:
+            self.path = await anyio.to_thread.run_sync(
+                self.backend.save_file, self.spool, self.filename
+            )
+        finally:
+            self.spool.close()
+        return self.path
+
+    async def abort(self) -> None:
+        self.spool.close()
+
+
+class _LocalFileWriter(StorageWriter):
+    """Writes to a temporary sibling file that replaces the target on commit."""
+
+    def __init__(self, file_path: Path):
+        super().__init__()
+        self.file_path = file_path
+        self.partial = file_path.with_name(f"{file_path.name}.{uuid.uuid4().hex}.part")
+        self.file = None
+
+    async def _write(self, data: bytes) -> None:
+        if self.file is None:
+            self.file_path.parent.mkdir(parents=True, exist_ok=True)
+            self.file = await anyio.open_file(self.partial, "wb")
+        await self.file.write(data)
+
+    async def commit(self) -> str:
+        if self.file is None:
+            # Nothing written: still create the (empty) object
+            await self._write(b"")
+        await self.file.aclose()
+        os.replace(self.partial, self.file_path)
+        self.path = str(self.file_path)
+        return self.path
+
+    async def abort(self) -> None:
+        if self.file is not None:
+            await self.file.aclose()
+        self.partial.unlink(missing_ok=True)
+
+
+class _S3MultipartWriter(StorageWriter):
+    """
+    Streams an object to S3 as a multipart upload.
+
+    At most one part is held in memory. Objects smaller than one part are
+    sent with a single PutObject instead.
+    """
+
+    def __init__(self, backend: "S3StorageBackend", key: str, part_size: int):
+        super().__init__()
+        self.backend = backend
+        self.key = key
+        # S3 rejects parts under 5 MiB, except the last one
+        self.part_size = max(part_size, 5 * 1024 * 1024)
+        self.buffer = bytearray()
+        self.upload_id: Optional[str] = None
+        self.parts = []
+
+    async def _write(self, data: bytes) -> None:
+        self.buffer.extend(data)
+        while len(self.buffer) >= self.part_size:
+            part = bytes(self.buffer[: self.part_size])
+            del self.buffer[: self.part_size]
+            await self._upload_part(part)
+
+    async def _upload_part(self, data: bytes) -> None:
+        client = self.backend.client
+        bucket = self.backend.bucket_name
+        if self.upload_id is None:
+            response = await anyio.to_thread.run_sync(
+                lambda: client.create_multipart_upload(Bucket=bucket, Key=self.key)
+            )
+            self.upload_id = response["UploadId"]
+
+        part_number = len(self.parts) + 1
+        response = await anyio.to_thread.run_sync(
+            lambda: client.upload_part(
+                Bucket=bucket,
+                Key=self.key,
+                UploadId=self.upload_id,
+                PartNumber=part_number,
+                Body=data,
+            )
+        )
+        self.parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+
+    async def commit(self) -> str:
+        client = self.backend.client
+        bucket = self.backend.bucket_name
+        try:
+            if self.upload_id is None:
+                body = bytes(self.buffer)
+                await anyio.to_thread.run_sync(
+                    lambda: client.put_object(Bucket=bucket, Key=self.key, Body=body)
+                )
+            else:
+                if self.buffer:
+                    await self._upload_part(bytes(self.buffer))
+                await anyio.to_thread.run_sync(
+                    lambda: client.complete_multipart_upload(
+                        Bucket=bucket,
+                        Key=self.key,
+                        UploadId=self.upload_id,
+                        MultipartUpload={"Parts": self.parts},
+                    )
+                )
+        except ClientError as e:
+            await self.abort()
+            raise Exception(f"Failed to upload to S3: {e}")
+        self.buffer.clear()
+        self.path = f"s3://{bucket}/{self.key}"
+        return self.path
+
+    async def abort(self) -> None:
+        self.buffer.clear()
+        if self.upload_id is None:
+            return
+        client = self.backend.client
+        try:
+            await anyio.to_thread.run_sync(
+                lambda: client.abort_multipart_upload(
+                    Bucket=self.backend.bucket_name, Key=self.key, UploadId=self.upload_id
+                )
+            )
+        except ClientError:
+            pass
+        self.upload_id = None
 
 
 class StorageBackend(ABC):
@@ -24,6 +267,11 @@ class StorageBackend(ABC):
         """Save a file and return the storage path."""
         pass
 
+    def save_local_file(self, local_path: Path, filename: str) -> str:
+        """Save a file from a local path and return the storage path."""
+        with open(local_path, "rb") as f:
+            return self.save_file(f, filename)
+
     @abstractmethod
     def get_file(self, path: str) -> Optional[bytes]:
         """Get file contents by path."""
@@ -39,6 +287,71 @@ class StorageBackend(ABC):
         """Check if a file exists."""
         pass
 
+    def delete_files(self, paths: List[str]) -> int:
+        """Delete several files and return how many were deleted."""
+        return sum(1 for path in paths if self.delete_file(path))
+
+    def key_for(self, path: str) -> str:
+        """Get the backend-relative key for a storage path or key."""
+        return path
+
+    @abstractmethod
+    def get_size(self, path: str) -> Optional[int]:
+        """Get the size of a file in bytes, or None if it does not exist."""
+        pass
+
+    @abstractmethod
+    def iter_range(
+        self, path: str, start: int, length: int, chunk_size: int = 65536
+    ) -> Iterator[bytes]:
+        """Yield ``length`` bytes of a file starting at ``start``."""
+        pass
+
+    @abstractmethod
+    def download_file(self, path: str, destination: Path) -> None:
+        """Write a file to a local path; raises FileNotFoundError if missing."""
+        pass
+
+    async def open_read(
+        self, path: str, start: int = 0, length: Optional[int] = None, chunk_size: int = 65536
+    ) -> AsyncIterator[bytes]:
+        """
+        Asynchronously yield a file's bytes without loading it into memory.
+
+        Args:
+            path: Storage path
+            start: First byte offset
+            length: Number of bytes, or None to read to the end
+            chunk_size: Maximum size of each chunk
+        """
+        if length is None:
+            size = await anyio.to_thread.run_sync(self.get_size, path)
+            if size is None:
+                raise FileNotFoundError(path)
+            length = size - start
+        async for chunk in aiter_in_thread(self.iter_range(path, start, length, chunk_size)):
+            yield chunk
+
+    def create_writer(self, filename: str) -> StorageWriter:
+        """Create a writer for a new object; defaults to spooling then ``save_file``."""
+        return _SpooledWriter(self, filename)
+
+    @asynccontextmanager
+    async def open_write(self, filename: str) -> AsyncIterator[StorageWriter]:
+        """
+        Write an object incrementally.
+
+        The object is committed when the block exits normally and discarded
+        if it raises. The writer's ``path`` holds the storage path afterwards.
+        """
+        writer = self.create_writer(filename)
+        try:
+            yield writer
+        except BaseException:
+            await writer.abort()
+            raise
+        await writer.commit()
+
     @abstractmethod
     def get_presigned_upload_url(
         self, filename: str, content_type: str, expires_in: int = 3600
@@ -67,6 +380,13 @@ class LocalStorageBackend(StorageBackend):
             shutil.copyfileobj(file, f)
         return str(file_path)
 
+    def save_local_file(self, local_path: Path, filename: str) -> str:
+        """Move a local file into storage."""
+        file_path = self.upload_dir / filename
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(local_path), file_path)
+        return str(file_path)
+
     def get_file(self, path: str) -> Optional[bytes]:
         """Get file contents from local storage."""
         file_path = Path(path)
@@ -105,6 +425,34 @@ class LocalStorageBackend(StorageBackend):
         
         return file_path.exists()
 
+    def get_size(self, path: str) -> Optional[int]:
+        """Get the size of a file in local storage."""
+        file_path = self.get_file_path(path)
+        if not file_path.exists():
+            return None
+        return file_path.stat().st_size
+
+    def iter_range(
+        self, path: str, start: int, length: int, chunk_size: int = 65536
+    ) -> Iterator[bytes]:
+        """Yield a byte range of a file in local storage."""
+        return iter_file_range(self.get_file_path(path), start, length, chunk_size)
+
+    def download_file(self, path: str, destination: Path) -> None:
+        """Copy a file out of local storage."""
+        shutil.copyfile(self.get_file_path(path), destination)
+
+    async def open_read(
+        self, path: str, start: int = 0, length: Optional[int] = None, chunk_size: int = 65536
+    ) -> AsyncIterator[bytes]:
+        """Asynchronously read a file in local storage."""
+        async for chunk in aiter_file_range(self.get_file_path(path), start, length, chunk_size):
+            yield chunk
+
+    def create_writer(self, filename: str) -> StorageWriter:
+        """Create a writer that replaces the file atomically on commit."""
+        return _LocalFileWriter(self.upload_dir / filename)
+
     def get_presigned_upload_url(
         self, filename: str, content_type: str, expires_in: int = 3600
     ) -> Optional[str]:
@@ -130,21 +478,39 @@ class S3StorageBackend(StorageBackend):
         secret_key: str,
         region: str,
         endpoint_url: Optional[str] = None,
+        transfer_config: Optional[TransferConfig] = None,
+        max_pool_connections: int = 10,
     ):
         self.bucket_name = bucket_name
+        self.transfer_config = transfer_config or TransferConfig()
         self.client = boto3.client(
             "s3",
             aws_access_key_id=access_key,
             aws_secret_access_key=secret_key,
             region_name=region,
             endpoint_url=endpoint_url,
-            config=Config(signature_version="s3v4"),
+            config=Config(
+                signature_version="s3v4",
+                max_pool_connections=max_pool_connections,
+            ),
         )
 
     def save_file(self, file: BinaryIO, filename: str) -> str:
-        """Save a file to S3."""
+        """Save a file to S3, in parallel parts above the multipart threshold."""
+        try:
+            self.client.upload_fileobj(
+                file, self.bucket_name, filename, Config=self.transfer_config
+            )
+            return f"s3://{self.bucket_name}/{filename}"
+        except ClientError as e:
+            raise Exception(f"Failed to upload to S3: {e}")
+
+    def save_local_file(self, local_path: Path, filename: str) -> str:
+        """Upload a local file to S3, reading parts from disk in parallel."""
         try:
-            self.client.upload_fileobj(file, self.bucket_name, filename)
+            self.client.upload_file(
+                str(local_path), self.bucket_name, filename, Config=self.transfer_config
+            )
             return f"s3://{self.bucket_name}/{filename}"
         except ClientError as e:
             raise Exception(f"Failed to upload to S3: {e}")
@@ -168,6 +534,31 @@ class S3StorageBackend(StorageBackend):
         except ClientError:
             return False
 
+    def delete_files(self, paths: List[str]) -> int:
+        """Delete objects with DeleteObjects, up to 1000 keys per request."""
+        deleted = 0
+        keys = [self.key_for(path) for path in paths]
+        for i in range(0, len(keys), S3_DELETE_BATCH_SIZE):
+            batch = keys[i : i + S3_DELETE_BATCH_SIZE]
+            try:
+                response = self.client.delete_objects(
+                    Bucket=self.bucket_name,
+                    Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+                )
+            except ClientError as e:
+                # Keep going so one failed request does not strand the other batches
+                logger.warning(f"Failed to delete a batch of {len(batch)} objects: {e}")
+                continue
+            # Quiet mode only reports failures
+            errors = response.get("Errors", [])
+            if errors:
+                logger.warning(
+                    f"Failed to delete {len(errors)} of {len(batch)} objects, "
+                    f"first {errors[0].get('Key')}: {errors[0].get('Code')}"
+                )
+            deleted += len(batch) - len(errors)
+        return deleted
+
     def file_exists(self, path: str) -> bool:
         """Check if file exists in S3."""
         try:
@@ -177,6 +568,73 @@ class S3StorageBackend(StorageBackend):
         except ClientError:
             return False
 
+    def key_for(self, path: str) -> str:
+        """Get the object key for a storage path or key."""
+        return path.replace(f"s3://{self.bucket_name}/", "")
+
+    def get_size(self, path: str) -> Optional[int]:
+        """Get the size of an S3 object."""
+        try:
+            key = path.replace(f"s3://{self.bucket_name}/", "")
+            response = self.client.head_object(Bucket=self.bucket_name, Key=key)
+            return response["ContentLength"]
+        except ClientError:
+            return None
+
+    def iter_range(
+        self, path: str, start: int, length: int, chunk_size: int = 65536
+    ) -> Iterator[bytes]:
+        """Yield a byte range of an S3 object from a single ranged GET."""
+        if length <= 0:
+            return
+        key = path.replace(f"s3://{self.bucket_name}/", "")
+        response = self.client.get_object(
+            Bucket=self.bucket_name,
+            Key=key,
+            Range=f"bytes={start}-{start + length - 1}",
+        )
+        yield from response["Body"].iter_chunks(chunk_size)
+
+    def download_file(self, path: str, destination: Path) -> None:
+        """Download an S3 object to a local path."""
+        key = path.replace(f"s3://{self.bucket_name}/", "")
+        try:
+            self.client.download_file(
+                self.bucket_name, key, str(destination), Config=self.transfer_config
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                raise FileNotFoundError(path) from e
+            raise
+
+    async def open_read(
+        self, path: str, start: int = 0, length: Optional[int] = None, chunk_size: int = 65536
+    ) -> AsyncIterator[bytes]:
+        """Stream an S3 object, or a range of it, from a single GET."""
+        if length is not None and length <= 0:
+            return
+        key = self.key_for(path)
+        byte_range = f"bytes={start}-" if length is None else f"bytes={start}-{start + length - 1}"
+        try:
+            response = await anyio.to_thread.run_sync(
+                lambda: self.client.get_object(Bucket=self.bucket_name, Key=key, Range=byte_range)
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                raise FileNotFoundError(path) from e
+            raise
+
+        body = response["Body"]
+        try:
+            async for chunk in aiter_in_thread(body.iter_chunks(chunk_size)):
+                yield chunk
+        finally:
+            body.close()
+
+    def create_writer(self, filename: str) -> StorageWriter:
+        """Create a writer that streams the object as a multipart upload."""
+        return _S3MultipartWriter(self, filename, self.transfer_config.multipart_chunksize)
+
     def get_presigned_upload_url(
         self, filename: str, content_type: str, expires_in: int = 3600
     ) -> Optional[str]:
@@ -220,13 +678,54 @@ class StorageService:
                 secret_key=settings.s3_secret_key,
                 region=settings.s3_region,
                 endpoint_url=settings.s3_endpoint_url,
+                transfer_config=TransferConfig(
+                    multipart_threshold=settings.s3_multipart_threshold_mb * 1024 * 1024,
+                    multipart_chunksize=settings.s3_multipart_chunksize_mb * 1024 * 1024,
+                    max_concurrency=settings.s3_max_concurrency,
+                ),
+                max_pool_connections=settings.s3_max_pool_connections,
             )
         else:
             self.backend = LocalStorageBackend(settings.upload_dir)
 
+    @property
+    def backend_name(self) -> str:
+        """Short backend name used in metric labels."""
+        return "local" if self.is_local else "s3"
+
+    def _record_transfer(self, direction: str, size: int, started: float) -> None:
+        """Record a finished whole-object transfer that began at ``started``."""
+        labels = {"backend": self.backend_name, "direction": direction}
+        transfer_seconds.observe(time.perf_counter() - started, **labels)
+        transfer_bytes_total.inc(size, **labels)
+
     def save_file(self, file: BinaryIO, filename: str) -> str:
         """Save a file."""
-        return self.backend.save_file(file, filename)
+        start = file.tell() if file.seekable() else 0
+        started = time.perf_counter()
+        path = self.backend.save_file(file, filename)
+        if file.seekable():
+            self._record_transfer("upload", file.tell() - start, started)
+            # Keep a local copy of new remote uploads so follow-up reads skip a download
+            if not self.is_local:
+                file.seek(start)
+                get_file_cache().put(self.backend.key_for(filename), file)
+        return path
+
+    def save_local_file(self, local_path: Path, filename: str) -> str:
+        """
+        Save a local file, such as a render, under a storage filename.
+
+        The file is moved: local storage takes it over, and remote storage
+        uploads it and then keeps it as the cached copy.
+        """
+        size = local_path.stat().st_size
+        started = time.perf_counter()
+        path = self.backend.save_local_file(local_path, filename)
+        self._record_transfer("upload", size, started)
+        if not self.is_local:
+            get_file_cache().adopt(self.backend.key_for(filename), local_path)
+        return path
 
     def get_file(self, path: str) -> Optional[bytes]:
         """Get file contents."""
@@ -234,8 +733,18 @@ class StorageService:
 
     def delete_file(self, path: str) -> bool:
         """Delete a file."""
+        if not self.is_local:
+            get_file_cache().discard(self.backend.key_for(path))
         return self.backend.delete_file(path)
 
+    def delete_files(self, paths: List[str]) -> int:
+        """Delete several files in as few backend requests as possible."""
+        if not self.is_local:
+            cache = get_file_cache()
+            for path in paths:
+                cache.discard(self.backend.key_for(path))
+        return self.backend.delete_files(paths)
+
     def file_exists(self, path: str) -> bool:
         """Check if file exists."""
         return self.backend.file_exists(path)
@@ -256,7 +765,127 @@ class StorageService:
             return self.backend.get_file_path(filename)
         return None
 
+    def get_size(self, path: str) -> Optional[int]:
+        """Get file size in bytes, or None if the file does not exist."""
+        if not self.is_local:
+            cached = get_file_cache().get(self.backend.key_for(path))
+            if cached is not None:
+                return cached.stat().st_size
+        return self.backend.get_size(path)
+
+    def iter_range(
+        self, path: str, start: int, length: int, chunk_size: int = 65536
+    ) -> Iterator[bytes]:
+        """Yield a byte range of a file, from the local cache when it holds a copy."""
+        if not self.is_local:
+            cached = get_file_cache().get(self.backend.key_for(path))
+            if cached is not None:
+                return iter_file_range(cached, start, length, chunk_size)
+        return self.backend.iter_range(path, start, length, chunk_size)
+
+    async def open_read(
+        self, path: str, start: int = 0, length: Optional[int] = None, chunk_size: int = 65536
+    ) -> AsyncIterator[bytes]:
+        """Asynchronously stream a file, from the local cache when it holds a copy."""
+        if not self.is_local:
+            cached = get_file_cache().get(self.backend.key_for(path))
+            if cached is not None:
+                async for chunk in aiter_file_range(cached, start, length, chunk_size):
+                    yield chunk
+                return
+        async for chunk in self.backend.open_read(path, start, length, chunk_size):
+            yield chunk
+
+    @asynccontextmanager
+    async def open_write(self, filename: str) -> AsyncIterator[StorageWriter]:
+        """
+        Write a file incrementally; see ``StorageBackend.open_write``.
+
+        Remote uploads are also written to a local file that becomes the
+        cached copy once the upload commits.
+        """
+        started = time.perf_counter()
+        if self.is_local:
+            async with self.backend.open_write(filename) as writer:
+                yield writer
+            self._record_transfer("upload", writer.bytes_written, started)
+            return
+
+        cache = get_file_cache()
+        with tempfile.NamedTemporaryFile(dir=cache.cache_dir, suffix=".part", delete=False) as f:
+            staging = Path(f.name)
+        try:
+            async with self.backend.open_write(filename) as writer:
+                tee = _CachingWriter(writer, staging)
+                try:
+                    yield tee
+                finally:
+                    await tee.close()
+            tee.path = writer.path
+            self._record_transfer("upload", writer.bytes_written, started)
+            cache.adopt(self.backend.key_for(filename), staging)
+        finally:
+            staging.unlink(missing_ok=True)
+
+    def get_local_copy(self, path: str) -> Optional[Path]:
+        """
+        Get a local filesystem path for a stored file.
+
+        Local storage returns the file itself. Remote storage downloads the
+        object into the bounded local cache on first use and returns the
+        cached copy afterwards. Returns None if the file does not exist.
+        """
+        if self.is_local:
+            local_path = self.backend.get_file_path(path)
+            return local_path if local_path.exists() else None
+
+        def fetch(destination: Path) -> None:
+            started = time.perf_counter()
+            self.backend.download_file(path, destination)
+            self._record_transfer("download", destination.stat().st_size, started)
+
+        try:
+            return get_file_cache().get_or_fetch(self.backend.key_for(path), fetch)
+        except FileNotFoundError:
+            return None
+
+    @property
+    def is_local(self) -> bool:
+        """Whether files live on the local filesystem."""
+        return isinstance(self.backend, LocalStorageBackend)
+
+
+class _CachingWriter(StorageWriter):
+    """Passes chunks to a backend writer and copies them to a local file."""
+
+    def __init__(self, writer: StorageWriter, copy_path: Path):
+        super().__init__()
+        self.writer = writer
+        self.copy_path = copy_path
+        self.copy = None
+
+    async def _write(self, data: bytes) -> None:
+        if self.copy is None:
+            self.copy = await anyio.open_file(self.copy_path, "wb")
+        await self.writer.write(data)
+        await self.copy.write(data)
+
+    async def close(self) -> None:
+        """Close the local copy; the backend writer is finished by its context."""
+        if self.copy is not None:
+            await self.copy.aclose()
+            self.copy = None
+
+    async def commit(self) -> str:
+        await self.close()
+        return await self.writer.commit()
+
+    async def abort(self) -> None:
+        await self.close()
+        await self.writer.abort()
+
 
+@lru_cache
 def get_storage_service() -> StorageService:
-    """Get storage service instance."""
+    """Get the per-process storage service, sharing one S3 client and its connection pool."""
     return StorageService()
@@ -0,0 +1,203 @@
+"""Short-lived cache of authenticated users."""
+
+import copy
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import DateTime
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.config import get_settings
+from app.models.user import User
+from app.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Never cached: not needed to authorize a request
+EXCLUDED_FIELDS = {"password_hash"}
+
+REDIS_KEY_PREFIX = "user-cache:"
+
+cache_requests_total = get_metrics().counter(
+    "user_cache_requests_total",
+    "Authenticated-user cache lookups by layer and result",
+)
+
+
+def _snapshot(user: User) -> dict:
+    """Copy the cacheable column values of a user."""
+    return {
+        column.key: getattr(user, column.key)
+        for column in User.__table__.columns
+        if column.key not in EXCLUDED_FIELDS
+    }
+
+
+def _encode(snapshot: dict) -> str:
+    return json.dumps(
+        {
+            key: value.isoformat() if isinstance(value, datetime) else value
+            for key, value in snapshot.items()
+        },
+        default=str,
+    )
+
+
+def _decode(payload: str) -> dict:
+    snapshot = json.loads(payload)
+    for column in User.__table__.columns:
+        value = snapshot.get(column.key)
+        if value is None:
+            continue
+        if isinstance(column.type, DateTime):
+            snapshot[column.key] = datetime.fromisoformat(value)
+        elif column.primary_key:
+            snapshot[column.key] = uuid.UUID(value)
+    return snapshot
+
+
+class UserCache:
+    """
+    Cache of user records for request authentication.
+
+    Entries live in an in-process LRU or, when a Redis client is given, only
+    in Redis so that all workers share them. Entries expire after a short TTL;
+    writes through AuthService invalidate the entry so profile, password and
+    activation changes apply to the next request. Without Redis, other
+    processes keep serving their own entry until it expires, so a change can
+    take up to ``ttl_seconds`` to reach them.
+
+    Cached users are detached instances without a password hash. Load the
+    user through a session before modifying it.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 30.0,
+        max_entries: int = 10000,
+        redis_client=None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.redis = redis_client
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, user_id) -> Optional[User]:
+        """
+        Get a cached user.
+
+        Args:
+            user_id: User ID from the access token
+
+        Returns:
+            Detached User, or None on a miss
+        """
+        key = str(user_id)
+        if self.redis is None:
+            snapshot = self._get_local(key)
+            if snapshot is None:
+                cache_requests_total.inc(layer="memory", result="miss")
+                return None
+            cache_requests_total.inc(layer="memory", result="hit")
+            return self._to_user(snapshot)
+
+        # No in-process layer in front of Redis: it could not see invalidations
+        # made by other workers
+        try:
+            payload = await self.redis.get(REDIS_KEY_PREFIX + key)
+        except Exception as e:
+            logger.warning(f"User cache read from Redis failed: {e}")
+            return None
+
+        if payload is None:
+            cache_requests_total.inc(layer="redis", result="miss")
+            return None
+
+        cache_requests_total.inc(layer="redis", result="hit")
+        return self._to_user(_decode(payload))
+
+    async def set(self, user: User) -> None:
+        """Cache a user loaded from the database."""
+        key = str(user.id)
+        snapshot = _snapshot(user)
+        if self.redis is None:
+            self._set_local(key, snapshot)
+            return
+
+        try:
+            await self.redis.set(
+                REDIS_KEY_PREFIX + key, _encode(snapshot), ex=max(1, int(self.ttl_seconds))
+            )
+        except Exception as e:
+            logger.warning(f"User cache write to Redis failed: {e}")
+
+    async def invalidate(self, user_id) -> None:
+        """Drop a user from the cache; with Redis, for every process."""
+        key = str(user_id)
+        with self._lock:
+            self._entries.pop(key, None)
+
+        if self.redis is not None:
+            try:
+                await self.redis.delete(REDIS_KEY_PREFIX + key)
+            except Exception as e:
+                logger.warning(f"User cache invalidation in Redis failed: {e}")
+
+    def clear(self) -> None:
+        """Drop all in-process entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def _get_local(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, snapshot = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return snapshot
+
+    def _set_local(self, key: str, snapshot: dict) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, snapshot)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _to_user(snapshot: dict) -> User:
+        # Copy so callers cannot change the cached JSON values in place
+        user = User(**copy.deepcopy(snapshot))
+        make_transient_to_detached(user)
+        return user
+
+
+@lru_cache
+def get_user_cache() -> Optional[UserCache]:
+    """Get the per-process user cache, or None when caching is disabled."""
+    settings = get_settings()
+    if not settings.user_cache_enabled:
+        return None
+
+    redis_client = None
+    if settings.user_cache_redis_enabled:
+        from redis import asyncio as redis_asyncio
+
+        redis_client = redis_asyncio.from_url(settings.redis_url, decode_responses=True)
+
+    return UserCache(
+        ttl_seconds=settings.user_cache_ttl_seconds,
+        max_entries=settings.user_cache_max_entries,
+        redis_client=redis_client,
+    )
@@ -1,13 +1,34 @@
-"""Whisper API processor for transcription and filler word detection."""
-
-from dataclasses import dataclass
+"""Whisper processor for transcription and filler word detection."""
+
+import queue
+import threading
+import time
+import wave
+from abc import ABC, abstractmethod
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Literal, Optional
+from typing import Deque, List, Literal, Optional, Tuple
 
-from openai import OpenAI
+import numpy as np
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    OpenAI,
+    RateLimitError,
+)
 
 from app.config import get_settings
+from app.services.checkpoint_service import AnalysisCheckpointer, run_checkpointed
+from app.services.scratch_space import get_scratch_manager
 from app.services.vad_processor import Segment, get_vad_processor
+from app.utils.ffmpeg_utils import encode_audio_chunk
+from app.utils.filler_matcher import FillerWordMatcher, normalize_token
+from app.utils.intervals import IntervalIndex
 
 settings = get_settings()
 
@@ -30,8 +51,482 @@ class WhisperSegment(Segment):
     filler_word: Optional[str] = None
 
 
+def get_audio_duration_ms(audio_path: Path) -> int:
+    """Get the duration of a WAV file in milliseconds."""
+    with wave.open(str(audio_path), "rb") as wav:
+        return int(wav.getnframes() * 1000 / wav.getframerate())
+
+
+def detect_silences(audio_path: Path, frame_ms: int = 30) -> List[Segment]:
+    """Find quiet stretches of a 16-bit WAV file from frame RMS energy."""
+    threshold = 32768 * 10 ** (settings.silence_threshold_db / 20)
+    quiet_blocks = []
+
+    with wave.open(str(audio_path), "rb") as wav:
+        channels = wav.getnchannels()
+        frame_len = wav.getframerate() * frame_ms // 1000
+
+        while True:
+            # Read about 30 seconds at a time to bound memory
+            data = wav.readframes(frame_len * 1000)
+            if not data:
+                break
+
+            samples = np.frombuffer(data, dtype="<i2").astype(np.float32)
+            if channels > 1:
+                samples = samples.reshape(-1, channels).mean(axis=1)
+
+            num_frames = len(samples) // frame_len
+            if num_frames == 0:
+                break
+
+            frames = samples[: num_frames * frame_len].reshape(num_frames, frame_len)
+            rms = np.sqrt(np.mean(frames**2, axis=1))
+            quiet_blocks.append(rms < threshold)
+
+    if not quiet_blocks:
+        return []
+
+    # Locate runs of quiet frames
+    quiet = np.concatenate(quiet_blocks).astype(np.int8)
+    edges = np.diff(np.concatenate(([0], quiet, [0])))
+    run_starts = np.flatnonzero(edges == 1)
+    run_ends = np.flatnonzero(edges == -1)
+
+    min_frames = max(1, settings.min_silence_duration_ms // frame_ms)
+    return [
+        Segment(
+            start_ms=int(start) * frame_ms,
+            end_ms=int(end) * frame_ms,
+            type="silence",
+            confidence=0.5,
+        )
+        for start, end in zip(run_starts, run_ends)
+        if end - start >= min_frames
+    ]
+
+
+def plan_chunks(
+    duration_ms: int,
+    silences: List[Segment],
+    target_ms: int,
+) -> List[Tuple[int, int]]:
+    """Split the timeline into chunks of at most target_ms, cut at the middle of silences."""
+    cut_points = sorted(
+        (seg.start_ms + seg.end_ms) // 2 for seg in silences if seg.type == "silence"
+    )
+
+    chunks = []
+    start_ms = 0
+    cut_idx = 0
+
+    while duration_ms - start_ms > target_ms:
+        limit_ms = start_ms + target_ms
+        end_ms = None
+
+        # Use the latest silence that keeps the chunk within the target
+        while cut_idx < len(cut_points) and cut_points[cut_idx] <= limit_ms:
+            if cut_points[cut_idx] > start_ms:
+                end_ms = cut_points[cut_idx]
+            cut_idx += 1
+
+        if end_ms is None:
+            # No silence in range, fall back to a hard cut
+            end_ms = limit_ms
+
+        chunks.append((start_ms, end_ms))
+        start_ms = end_ms
+
+    chunks.append((start_ms, duration_ms))
+    return chunks
+
+
+def merge_transcriptions(
+    chunks: List[Tuple[int, int]],
+    results: List[dict],
+    duration_ms: int,
+) -> dict:
+    """Merge per-chunk transcriptions into one verbose_json-shaped timeline."""
+    texts = []
+    segments = []
+    words = []
+    language = None
+
+    for (start_ms, _), result in zip(chunks, results):
+        offset = start_ms / 1000
+        language = language or result.get("language")
+
+        text = (result.get("text") or "").strip()
+        if text:
+            texts.append(text)
+
+        for seg in result.get("segments") or []:
+            segments.append(
+                {
+                    **seg,
+                    "id": len(segments),
+                    "start": seg.get("start", 0) + offset,
+                    "end": seg.get("end", 0) + offset,
+                }
+            )
+
+        for word in result.get("words") or []:
+            words.append(
+                {
+                    **word,
+                    "start": word.get("start", 0) + offset,
+                    "end": word.get("end", 0) + offset,
+                }
+            )
+
+    return {
+        "text": " ".join(texts),
+        "language": language,
+        "duration": duration_ms / 1000,
+        "segments": segments,
+        "words": words,
+    }
+
+
+class TranscriptionEngine(ABC):
+    """Abstract base class for speech-to-text engines."""
+
+    @abstractmethod
+    def transcribe(self, audio_path: Path) -> dict:
+        """
+        Transcribe a 16 kHz mono WAV file.
+
+        Returns:
+            verbose_json-shaped dict with text, language, duration, segments
+            and words (timestamps in seconds)
+        """
+        pass
+
+
+class OpenAITranscriptionEngine(TranscriptionEngine):
+    """Transcription through the OpenAI Whisper API."""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        chunk_target_seconds: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        retry_backoff_seconds: Optional[float] = None,
+    ):
+        """
+        Initialize OpenAI transcription engine.
+
+        Args:
+            api_key: OpenAI API key
+            base_url: Override for the OpenAI API base URL
+            chunk_target_seconds: Target length of each uploaded audio chunk
+            max_concurrency: Maximum number of chunks transcribed at once
+            max_retries: Retries per chunk on transient API errors
+            retry_backoff_seconds: Initial backoff between retries (doubles each time)
+        """
+        self.api_key = api_key or settings.openai_api_key
+        self.chunk_target_ms = (
+            chunk_target_seconds or settings.whisper_chunk_target_seconds
+        ) * 1000
+        self.max_concurrency = max(1, max_concurrency or settings.whisper_max_concurrency)
+        self.max_retries = (
+            max_retries if max_retries is not None else settings.whisper_max_retries
+        )
+        self.retry_backoff_seconds = (
+            retry_backoff_seconds
+            if retry_backoff_seconds is not None
+            else settings.whisper_retry_backoff_seconds
+        )
+
+        if not self.api_key:
+            raise ValueError("OpenAI API key is required for Whisper processing")
+
+        # Retries are handled per chunk with our own backoff
+        self.client = OpenAI(
+            api_key=self.api_key,
+            base_url=base_url or settings.openai_base_url or None,
+            max_retries=0,
+        )
+
+    def transcribe(self, audio_path: Path) -> dict:
+        """
+        Transcribe audio using Whisper API.
+
+        The audio is split into chunks at silence boundaries, each chunk is
+        encoded to Opus and the chunks are transcribed concurrently. Results
+        are re-offset to the full timeline and merged.
+        """
+        duration_ms = get_audio_duration_ms(audio_path)
+        chunks = plan_chunks(duration_ms, detect_silences(audio_path), self.chunk_target_ms)
+
+        with get_scratch_manager().job("whisper-chunks") as scratch:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+                results = list(
+                    pool.map(
+                        lambda item: self._transcribe_chunk(
+                            audio_path, item[0], item[1], scratch.path
+                        ),
+                        enumerate(chunks),
+                    )
+                )
+
+        return merge_transcriptions(chunks, results, duration_ms)
+
+    def _transcribe_chunk(
+        self,
+        audio_path: Path,
+        index: int,
+        chunk: Tuple[int, int],
+        work_dir: Path,
+    ) -> dict:
+        """Encode and transcribe a single chunk, retrying transient failures."""
+        start_ms, end_ms = chunk
+        chunk_path = encode_audio_chunk(
+            input_path=audio_path,
+            output_path=work_dir / f"chunk_{index:04d}.ogg",
+            start_seconds=start_ms / 1000,
+            duration_seconds=(end_ms - start_ms) / 1000,
+            bitrate=settings.whisper_chunk_bitrate,
+        )
+
+        attempt = 0
+        while True:
+            try:
+                with open(chunk_path, "rb") as audio_file:
+                    response = self.client.audio.transcriptions.create(
+                        model="whisper-1",
+                        file=audio_file,
+                        response_format="verbose_json",
+                        timestamp_granularities=["word", "segment"],
+                    )
+                return response.model_dump()
+            except (
+                APIConnectionError,
+                APITimeoutError,
+                InternalServerError,
+                RateLimitError,
+            ):
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self.retry_backoff_seconds * (2**attempt))
+                attempt += 1
+
+
+class FasterWhisperBackend:
+    """Runs batches of audio windows through a CTranslate2 Whisper model."""
+
+    def __init__(
+        self,
+        model_size: str,
+        compute_type: str = "int8",
+        cpu_threads: int = 0,
+        language: Optional[str] = None,
+    ):
+        """
+        Load the model.
+
+        Args:
+            model_size: faster-whisper model name or path (e.g. "small")
+            compute_type: CTranslate2 compute type, int8 for quantized CPU inference
+            cpu_threads: Intra-op threads (0 uses the library default)
+            language: Fixed language code, or None to auto-detect per batch
+        """
+        try:
+            from faster_whisper import BatchedInferencePipeline, WhisperModel
+        except ImportError:
+            raise ValueError("faster-whisper is required for local transcription")
+
+        model = WhisperModel(
+            model_size,
+            device="cpu",
+            compute_type=compute_type,
+            cpu_threads=cpu_threads,
+        )
+        self.pipeline = BatchedInferencePipeline(model=model)
+        self.language = language or None
+
+    def transcribe_batch(self, windows: List[np.ndarray], sample_rate: int) -> List[dict]:
+        """
+        Transcribe several windows (at most 30 s each) in one batched call.
+
+        Windows are laid end to end and passed as clip timestamps, so the
+        model decodes them as a single batch. Results are mapped back to
+        each window with timestamps relative to the window start.
+        """
+        offsets = []
+        clips = []
+        position = 0
+        for window in windows:
+            offsets.append(position / sample_rate)
+            clips.append(
+                {"start": position / sample_rate, "end": (position + len(window)) / sample_rate}
+            )
+            position += len(window)
+
+        segments, info = self.pipeline.transcribe(
+            np.concatenate(windows),
+            language=self.language,
+            clip_timestamps=clips,
+            batch_size=len(windows),
+            word_timestamps=True,
+        )
+
+        results = [
+            {"text": "", "language": info.language, "segments": [], "words": []}
+            for _ in windows
+        ]
+        for seg in segments:
+            idx = max(0, bisect_right(offsets, seg.start) - 1)
+            offset = offsets[idx]
+            result = results[idx]
+
+            result["text"] = f"{result['text']} {seg.text.strip()}".strip()
+            result["segments"].append(
+                {
+                    "id": len(result["segments"]),
+                    "start": seg.start - offset,
+                    "end": seg.end - offset,
+                    "text": seg.text,
+                    "avg_logprob": seg.avg_logprob,
+                    "no_speech_prob": seg.no_speech_prob,
+                }
+            )
+            for word in seg.words or []:
+                result["words"].append(
+                    {
+                        "word": word.word.strip(),
+                        "start": word.start - offset,
+                        "end": word.end - offset,
+                        "probability": word.probability,
+                    }
+                )
+
+        return results
+
+
+class WindowBatcher:
+    """
+    Collects audio windows from concurrent jobs and transcribes them together.
+
+    One batcher is shared per worker process, so windows from jobs running
+    on the same worker (e.g. a threads pool) fill the same model batches.
+    """
+
+    def __init__(
+        self,
+        backend: FasterWhisperBackend,
+        sample_rate: int = 16000,
+        batch_size: int = 8,
+        max_wait_ms: int = 50,
+    ):
+        self.backend = backend
+        self.sample_rate = sample_rate
+        self.batch_size = max(1, batch_size)
+        self.max_wait_ms = max_wait_ms
+        self._queue: "queue.Queue[Tuple[np.ndarray, Future]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, window: np.ndarray) -> Future:
+        """Queue a window for transcription."""
+        future: Future = Future()
+        self._queue.put((window, future))
+        return future
+
+    def _run(self) -> None:
+        """Form batches from queued windows until the process exits."""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait_ms / 1000
+
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                results = self.backend.transcribe_batch(
+                    [window for window, _ in batch], self.sample_rate
+                )
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+
+
+class LocalTranscriptionEngine(TranscriptionEngine):
+    """Offline transcription with a local int8 Whisper model on CPU."""
+
+    # Whisper decodes at most 30 seconds of audio per window
+    WINDOW_MS = 30000
+
+    def __init__(self, batcher: Optional[WindowBatcher] = None):
+        """
+        Initialize local transcription engine.
+
+        Args:
+            batcher: Window batcher to submit to (shared per process by default)
+        """
+        self.batcher = batcher or get_window_batcher()
+
+    def transcribe(self, audio_path: Path) -> dict:
+        """Transcribe audio by batching silence-aligned windows through the local model."""
+        duration_ms = get_audio_duration_ms(audio_path)
+        chunks = plan_chunks(duration_ms, detect_silences(audio_path), self.WINDOW_MS)
+
+        # Read each window on demand and bound the windows in flight, so an
+        # hour of audio is never held in memory at once
+        max_in_flight = 2 * self.batcher.batch_size
+        pending: Deque[Future] = deque()
+        results = []
+        with wave.open(str(audio_path), "rb") as wav:
+            sample_rate = wav.getframerate()
+            for start_ms, end_ms in chunks:
+                if len(pending) >= max_in_flight:
+                    results.append(pending.popleft().result())
+
+                start = start_ms * sample_rate // 1000
+                wav.setpos(start)
+                frames = wav.readframes(end_ms * sample_rate // 1000 - start)
+                window = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+                pending.append(self.batcher.submit(window))
+
+        results.extend(future.result() for future in pending)
+        return merge_transcriptions(chunks, results, duration_ms)
+
+
+@lru_cache
+def get_window_batcher() -> WindowBatcher:
+    """Get the per-process window batcher for the local model."""
+    backend = FasterWhisperBackend(
+        model_size=settings.local_whisper_model,
+        compute_type=settings.local_whisper_compute_type,
+        cpu_threads=settings.local_whisper_cpu_threads,
+        language=settings.local_whisper_language,
+    )
+    return WindowBatcher(
+        backend,
+        batch_size=settings.local_whisper_batch_size,
+        max_wait_ms=settings.local_whisper_batch_wait_ms,
+    )
+
+
+def get_transcription_engine(api_key: Optional[str] = None) -> TranscriptionEngine:
+    """Get the configured transcription engine."""
+    if settings.transcription_engine == "local":
+        return LocalTranscriptionEngine()
+    return OpenAITranscriptionEngine(api_key=api_key)
+
+
 class WhisperProcessor:
-    """Processor for OpenAI Whisper API transcription and filler detection."""
+    """Processor for Whisper transcription and filler detection."""
 
     def __init__(
         self,
@@ -39,25 +534,23 @@ class WhisperProcessor:
         detect_filler_words: bool = True,
         filler_words: Optional[List[str]] = None,
         filler_word_padding_ms: int = 100,
+        engine: Optional[TranscriptionEngine] = None,
     ):
         """
         Initialize Whisper processor.
 
         Args:
-            api_key: OpenAI API key
+            api_key: OpenAI API key (used when no engine is given)
             detect_filler_words: Whether to detect filler words
             filler_words: List of filler words to detect
             filler_word_padding_ms: Padding around detected filler words
+            engine: Transcription engine (configured engine by default)
         """
-        self.api_key = api_key or settings.openai_api_key
         self.detect_filler_words = detect_filler_words
         self.filler_words = filler_words or settings.filler_words_list
         self.filler_word_padding_ms = filler_word_padding_ms
-
-        if not self.api_key:
-            raise ValueError("OpenAI API key is required for Whisper processing")
-
-        self.client = OpenAI(api_key=self.api_key)
+        self.engine = engine or get_transcription_engine(api_key)
+        self._filler_matcher = FillerWordMatcher(self.filler_words)
 
     def process_audio(
         self,
@@ -65,29 +558,55 @@ class WhisperProcessor:
         vad_aggressiveness: int = 3,
         min_silence_duration_ms: int = 300,
         min_speech_duration_ms: int = 250,
+        checkpoint: Optional[AnalysisCheckpointer] = None,
     ) -> tuple[List[WhisperSegment], str, List[FillerWord]]:
         """
-        Process audio file with Whisper API and VAD.
+        Process audio file with Whisper transcription and VAD.
 
         Args:
             audio_path: Path to audio file
             vad_aggressiveness: VAD aggressiveness level
             min_silence_duration_ms: Minimum silence duration
             min_speech_duration_ms: Minimum speech duration
+            checkpoint: Optional checkpointer to resume completed stages from
 
         Returns:
             Tuple of (segments, full_transcription, filler_words)
         """
-        # Get transcription from Whisper API
-        transcription_data = self._transcribe(audio_path)
-
-        # Run VAD in parallel for silence detection
         vad = get_vad_processor(
             aggressiveness=vad_aggressiveness,
             min_silence_duration_ms=min_silence_duration_ms,
             min_speech_duration_ms=min_speech_duration_ms,
         )
-        vad_segments = vad.process_audio(audio_path)
+
+        vad_data = None
+        if checkpoint is not None:
+            vad_data = checkpoint.load_json(AnalysisCheckpointer.STAGE_VAD)
+
+        # Run VAD in parallel for silence detection. Model inference releases
+        # the GIL, so it overlaps with the network-bound transcription below.
+        # The checkpointer shares the task's session, so only this thread
+        # touches it; the VAD thread just computes.
+        with ThreadPoolExecutor(max_workers=1) as vad_pool:
+            vad_future = None
+            if vad_data is None:
+                vad_future = vad_pool.submit(
+                    lambda: [asdict(s) for s in vad.process_audio(audio_path)]
+                )
+
+            # Get transcription from the engine
+            transcription_data = run_checkpointed(
+                checkpoint,
+                AnalysisCheckpointer.STAGE_TRANSCRIPTION,
+                lambda: self._transcribe(audio_path),
+            )
+
+            if vad_future is not None:
+                vad_data = vad_future.result()
+                if checkpoint is not None:
+                    checkpoint.save_json(AnalysisCheckpointer.STAGE_VAD, vad_data)
+
+        vad_segments = [Segment(**s) for s in vad_data]
 
         # Detect filler words
         filler_words = []
@@ -107,69 +626,24 @@ class WhisperProcessor:
         return segments, full_text, filler_words
 
     def _transcribe(self, audio_path: Path) -> dict:
-        """Transcribe audio using Whisper API."""
-        with open(audio_path, "rb") as audio_file:
-            response = self.client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                response_format="verbose_json",
-                timestamp_granularities=["word", "segment"],
-            )
-
-        return response.model_dump()
+        """Transcribe audio with the configured engine."""
+        return self.engine.transcribe(audio_path)
 
     def _detect_filler_words(self, transcription_data: dict) -> List[FillerWord]:
-        """Detect filler words in transcription."""
-        filler_words = []
+        """Detect single- and multi-word fillers in one pass over the words."""
         words = transcription_data.get("words", [])
+        tokens = [normalize_token(w.get("word", "")) for w in words]
 
-        for word_data in words:
-            word = word_data.get("word", "").lower().strip()
-
-            # Check single word fillers
-            if word in self.filler_words:
-                filler_words.append(
-                    FillerWord(
-                        word=word,
-                        start_ms=int(word_data.get("start", 0) * 1000),
-                        end_ms=int(word_data.get("end", 0) * 1000),
-                        confidence=0.9,
-                    )
+        filler_words = []
+        for first, last, phrase in self._filler_matcher.find(tokens):
+            filler_words.append(
+                FillerWord(
+                    word=phrase,
+                    start_ms=int(words[first].get("start", 0) * 1000),
+                    end_ms=int(words[last].get("end", 0) * 1000),
+                    confidence=0.9 if first == last else 0.85,
                 )
-
-        # Check multi-word fillers (e.g., "you know", "I mean")
-        multi_word_fillers = [f for f in self.filler_words if " " in f]
-        if multi_word_fillers and words:
-            text_lower = transcription_data.get("text", "").lower()
-            for filler in multi_word_fillers:
-                if filler in text_lower:
-                    # Find approximate position
-                    filler_words_list = filler.split()
-                    for i, word_data in enumerate(words):
-                        if (
-                            word_data.get("word", "").lower().strip()
-                            == filler_words_list[0]
-                        ):
-                            # Check if subsequent words match
-                            matches = True
-                            for j, fw in enumerate(filler_words_list[1:], 1):
-                                if i + j >= len(words):
-                                    matches = False
-                                    break
-                                if words[i + j].get("word", "").lower().strip() != fw:
-                                    matches = False
-                                    break
-
-                            if matches:
-                                end_idx = i + len(filler_words_list) - 1
-                                filler_words.append(
-                                    FillerWord(
-                                        word=filler,
-                                        start_ms=int(word_data.get("start", 0) * 1000),
-                                        end_ms=int(words[end_idx].get("end", 0) * 1000),
-                                        confidence=0.85,
-                                    )
-                                )
+            )
 
         return filler_words
 
@@ -181,7 +655,11 @@ class WhisperProcessor:
     ) -> List[WhisperSegment]:
         """Merge VAD segments with transcription and filler word data."""
         segments = []
-        whisper_segments = transcription_data.get("segments", [])
+        whisper_segments = IntervalIndex(
+            transcription_data.get("segments", []),
+            key=lambda seg: (int(seg.get("start", 0) * 1000), int(seg.get("end", 0) * 1000)),
+        )
+        fillers = IntervalIndex(filler_words, key=lambda fw: (fw.start_ms, fw.end_ms))
 
         for vad_seg in vad_segments:
             if vad_seg.type == "silence":
@@ -202,17 +680,13 @@ class WhisperProcessor:
                 )
 
                 # Check if this segment contains filler words
-                segment_fillers = [
-                    fw
-                    for fw in filler_words
-                    if fw.start_ms >= vad_seg.start_ms and fw.end_ms <= vad_seg.end_ms
-                ]
+                segment_fillers = fillers.contained(vad_seg.start_ms, vad_seg.end_ms)
 
                 if segment_fillers:
                     # Split segment around filler words
                     current_start = vad_seg.start_ms
 
-                    for filler in sorted(segment_fillers, key=lambda x: x.start_ms):
+                    for filler in segment_fillers:
                         # Add speech before filler
                         if filler.start_ms > current_start:
                             segments.append(
@@ -277,18 +751,13 @@ class WhisperProcessor:
         self,
         start_ms: int,
         end_ms: int,
-        whisper_segments: List[dict],
+        whisper_segments: IntervalIndex,
     ) -> str:
         """Get transcription text for a time range."""
-        texts = []
-        for seg in whisper_segments:
-            seg_start = int(seg.get("start", 0) * 1000)
-            seg_end = int(seg.get("end", 0) * 1000)
-
-            # Check for overlap
-            if seg_start < end_ms and seg_end > start_ms:
-                texts.append(seg.get("text", "").strip())
-
+        texts = [
+            seg.get("text", "").strip()
+            for seg in whisper_segments.overlapping(start_ms, end_ms)
+        ]
         return " ".join(texts)
 
 
@@ -297,8 +766,8 @@ def get_whisper_processor(
     custom_filler_words: Optional[List[str]] = None,
 ) -> WhisperProcessor:
     """Get Whisper processor instance."""
-    if not settings.ai_features_enabled or not settings.whisper_api_enabled:
-        raise ValueError("Whisper API is not enabled")
+    if not settings.transcription_available:
+        raise ValueError("Transcription is not enabled")
 
     filler_words = settings.filler_words_list
     if custom_filler_words:
@@ -1,28 +1,42 @@
 """Celery tasks for audio analysis processing."""
 
-import shutil
-import tempfile
 import time
+from dataclasses import asdict
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any, Dict
 from uuid import UUID
 
 from celery import shared_task
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.config import get_settings
 from app.database import SessionLocal
 from app.models.analysis import AnalysisResult, AnalysisStatus, ProcessingMode
 from app.models.media import MediaFile
+from app.models.project import Project, ProjectStatus
+from app.services.artifact_store import (
+    AUDIO_PCM,
+    VAD_SEGMENTS,
+    get_artifact_store,
+    source_hash,
+)
 from app.services.audio_extractor import get_audio_extractor
+from app.services.checkpoint_service import AnalysisCheckpointer
+from app.services.media_cleanup import delete_expired_media, delete_project_data
+from app.services.scratch_space import get_scratch_manager
 from app.services.segment_processor import get_segment_processor
+from app.services.segment_store import get_segment_store
 from app.services.storage_service import get_storage_service
 from app.services.vad_processor import get_vad_processor
 from app.tasks.celery_app import celery_app
 
 settings = get_settings()
 
+# Deletions still pending after this long are assumed lost and re-queued
+STALE_DELETION_SECONDS = 3600
+
 
 def get_db() -> Session:
     """Get database session for tasks."""
@@ -45,7 +59,6 @@ def process_audio_analysis(self, analysis_id: str, options: Dict[str, Any]):
             - custom_filler_words: additional filler words to detect
     """
     db = get_db()
-    temp_dir = None
     start_time = time.time()
 
     try:
@@ -66,19 +79,32 @@ def process_audio_analysis(self, analysis_id: str, options: Dict[str, Any]):
         # Get storage service
         storage = get_storage_service()
 
-        # Get local file path
-        local_path = storage.get_local_path(media_file.stored_filename)
-        if not local_path or not local_path.exists():
-            raise ValueError("Media file not found on storage")
+        # Resume from checkpointed stages of a previous attempt, if any
+        checkpoint = AnalysisCheckpointer(analysis, db, storage)
+
+        # Extract audio, reusing an earlier extraction of the same content
+        artifacts = get_artifact_store()
+        content_key = source_hash(media_file)
 
-        # Create temp directory for processing
-        temp_dir = Path(tempfile.mkdtemp())
+        def extract(output_path: Path) -> None:
+            # Get a local copy (downloaded into the cache for remote storage)
+            local_path = storage.get_local_copy(media_file.stored_filename)
+            if not local_path:
+                raise ValueError("Media file not found on storage")
 
-        # Extract audio
-        audio_extractor = get_audio_extractor()
-        audio_path = audio_extractor.extract_audio_from_file(
-            file_path=local_path,
-            output_dir=temp_dir,
+            get_audio_extractor().extract_audio_from_file(
+                file_path=local_path,
+                sample_rate=16000,
+                channels=1,
+                output_path=output_path,
+            )
+
+        audio_path = artifacts.get_or_compute_file(
+            content_key,
+            AUDIO_PCM,
+            {"sample_rate": 16000, "channels": 1},
+            extract,
+            suffix=".wav",
         )
 
         # Process based on mode
@@ -87,7 +113,7 @@ def process_audio_analysis(self, analysis_id: str, options: Dict[str, Any]):
         transcription = None
         filler_words_detected = None
 
-        if processing_mode == "whisper" and settings.ai_features_enabled and settings.whisper_api_enabled:
+        if processing_mode == "whisper" and settings.transcription_available:
             # Use Whisper processor
             from app.services.whisper_processor import get_whisper_processor
 
@@ -101,6 +127,7 @@ def process_audio_analysis(self, analysis_id: str, options: Dict[str, Any]):
                 vad_aggressiveness=options.get("vad_aggressiveness", 3),
                 min_silence_duration_ms=options.get("min_silence_duration_ms", 300),
                 min_speech_duration_ms=options.get("min_speech_duration_ms", 250),
+                checkpoint=checkpoint,
             )
 
             # Convert to dict format
@@ -134,15 +161,24 @@ def process_audio_analysis(self, analysis_id: str, options: Dict[str, Any]):
                 min_speech_duration_ms=options.get("min_speech_duration_ms", 250),
             )
 
-            vad_segments = vad.process_audio(audio_path)
+            vad_segments = artifacts.get_or_compute_json(
+                content_key,
+                VAD_SEGMENTS,
+                {
+                    "aggressiveness": options.get("vad_aggressiveness", 3),
+                    "min_silence_duration_ms": options.get("min_silence_duration_ms", 300),
+                    "min_speech_duration_ms": options.get("min_speech_duration_ms", 250),
+                },
+                lambda: [asdict(s) for s in vad.process_audio(audio_path)],
+            )
 
             # Convert to dict format
             segments = [
                 {
-                    "start_ms": s.start_ms,
-                    "end_ms": s.end_ms,
-                    "type": s.type,
-                    "confidence": s.confidence,
+                    "start_ms": s["start_ms"],
+                    "end_ms": s["end_ms"],
+                    "type": s["type"],
+                    "confidence": s["confidence"],
                 }
                 for s in vad_segments
             ]
@@ -154,23 +190,35 @@ def process_audio_analysis(self, analysis_id: str, options: Dict[str, Any]):
         )
 
         total_duration_ms = int((media_file.duration_seconds or 0) * 1000)
-        processed_segments = segment_processor.process_segments(segments, total_duration_ms)
+        processed_segments = segment_processor.process_table(segments, total_duration_ms)
 
         # Convert processed segments to dict
-        final_segments = [s.to_dict() for s in processed_segments]
+        final_segments = processed_segments.to_dicts()
 
         # Calculate processing time
         processing_time_ms = int((time.time() - start_time) * 1000)
 
         # Update analysis record
         analysis.status = AnalysisStatus.COMPLETED
-        analysis.segments = final_segments
+        get_segment_store(db).replace(analysis.id, final_segments)
+        analysis.raw_segments = segments
+        analysis.processing_params = {
+            **segment_processor.params,
+            "total_duration_ms": total_duration_ms,
+            "classification_overrides": [],
+        }
         analysis.transcription = transcription
         analysis.filler_words_detected = filler_words_detected
         analysis.processing_time_ms = processing_time_ms
         analysis.completed_at = datetime.now(timezone.utc)
         db.commit()
 
+        # Intermediate artifacts are no longer needed once results are stored
+        try:
+            checkpoint.clear()
+        except Exception:
+            db.rollback()
+
     except Exception as e:
         # Handle failure
         db.rollback()
@@ -191,10 +239,6 @@ def process_audio_analysis(self, analysis_id: str, options: Dict[str, Any]):
         raise
 
     finally:
-        # Cleanup temp directory
-        if temp_dir and temp_dir.exists():
-            shutil.rmtree(temp_dir, ignore_errors=True)
-
         db.close()
 
 
@@ -203,52 +247,107 @@ def cleanup_expired_files():
     """
     Periodic task to cleanup expired files.
 
-    - Delete uploaded files older than 30 days
-    - Delete orphaned analysis results
-    - Clear temporary processing files
+    - Delete uploaded files older than the retention period, in batches
+    - Delete their analysis results (by database cascade)
+    - Remove stale scratch directories of killed jobs
+    - Re-queue project deletions that have been pending too long
+
+    Runs for at most the configured time budget and re-queues itself when
+    expired files remain, so a large backlog is worked off incrementally.
     """
     db = get_db()
 
     try:
-        # Get cutoff date (30 days ago)
-        cutoff_date = datetime.now(timezone.utc) - timedelta(days=30)
-
-        # Find old media files
-        old_media_files = (
-            db.query(MediaFile)
-            .filter(MediaFile.created_at < cutoff_date)
-            .all()
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=settings.cleanup_retention_days)
+
+        result = delete_expired_media(
+            db,
+            get_storage_service(),
+            cutoff_date,
+            batch_size=settings.cleanup_batch_size,
+            time_budget_seconds=settings.cleanup_time_budget_seconds,
+            artifacts=get_artifact_store(),
         )
+        if not result.complete:
+            cleanup_expired_files.apply_async(countdown=60)
+
+        # Reclaim scratch directories left by killed workers; only our namespace is swept
+        stale_scratch = get_scratch_manager().sweep_stale(settings.scratch_stale_hours * 3600)
+
+        # Re-queue project deletions whose task was never delivered or gave up
+        stale_cutoff = datetime.now(timezone.utc) - timedelta(seconds=STALE_DELETION_SECONDS)
+        stale_projects = db.execute(
+            select(Project.id).where(
+                Project.status == ProjectStatus.DELETING,
+                Project.updated_at < stale_cutoff,
+            )
+        ).scalars().all()
+        db.commit()
+        for project_id in stale_projects:
+            delete_project_files.delay(str(project_id))
+
+        return {
+            "deleted_files": result.deleted_rows,
+            "deleted_blobs": result.deleted_blobs,
+            "deleted_artifacts": result.deleted_artifacts,
+            "batches": result.batches,
+            "complete": result.complete,
+            "stale_scratch_dirs": stale_scratch,
+            "requeued_project_deletions": len(stale_projects),
+        }
 
-        storage = get_storage_service()
-        deleted_count = 0
+    except Exception as e:
+        db.rollback()
+        raise
 
-        for media_file in old_media_files:
-            # Delete from storage
-            storage.delete_file(media_file.file_path)
+    finally:
+        db.close()
 
-            # Delete from database (cascades to analysis results)
-            db.delete(media_file)
-            deleted_count += 1
 
-        db.commit()
+@celery_app.task(bind=True, max_retries=3, default_retry_delay=60)
+def delete_project_files(self, project_id: str):
+    """
+    Delete a project marked as deleting, with its media files and storage objects.
 
-        # Cleanup temp directories
-        temp_base = Path(tempfile.gettempdir())
-        for temp_dir in temp_base.glob("tmp*"):
-            if temp_dir.is_dir():
-                try:
-                    # Check if directory is old (more than 1 day)
-                    dir_age = datetime.now() - datetime.fromtimestamp(temp_dir.stat().st_mtime)
-                    if dir_age > timedelta(days=1):
-                        shutil.rmtree(temp_dir, ignore_errors=True)
-                except Exception:
-                    pass
+    Safe to run more than once: each batch is committed, and a project
+    that is already gone or no longer marked as deleting is left alone.
 
-        return {"deleted_files": deleted_count}
+    Args:
+        project_id: UUID of the project
+    """
+    db = get_db()
+
+    try:
+        project_status = db.execute(
+            select(Project.status).where(Project.id == UUID(project_id))
+        ).scalar_one_or_none()
+        db.commit()
+        if project_status != ProjectStatus.DELETING:
+            return {"project_id": project_id, "deleted": False}
+
+        result = delete_project_data(
+            db,
+            get_storage_service(),
+            UUID(project_id),
+            batch_size=settings.cleanup_batch_size,
+            artifacts=get_artifact_store(),
+        )
+
+        return {
+            "project_id": project_id,
+            "deleted": True,
+            "deleted_files": result.deleted_rows,
+            "deleted_blobs": result.deleted_blobs,
+            "deleted_artifacts": result.deleted_artifacts,
+            "batches": result.batches,
+        }
 
     except Exception as e:
         db.rollback()
+
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e)
+
         raise
 
     finally:
@@ -10,7 +10,7 @@ celery_app = Celery(
     "clipflow",
     broker=settings.celery_broker_url,
     backend=settings.celery_result_backend,
-    include=["app.tasks.analysis_tasks"],
+    include=["app.tasks.analysis_tasks", "app.tasks.media_tasks"],
 )
 
 celery_app.conf.update(
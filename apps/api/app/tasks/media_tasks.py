@@ -0,0 +1,188 @@
+"""Celery tasks for media post-processing."""
+
+import logging
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.media import MediaFile
+from app.services.artifact_store import PREVIEW_POSTER, get_artifact_store, source_hash
+from app.services.editing_proxy import generate_proxy
+from app.services.hls_packager import HlsUnavailableError, package_media
+from app.services.media_previews import (
+    PreviewUnavailableError,
+    generate_previews,
+    has_video,
+    preview_params,
+    use_poster_as_thumbnail,
+)
+from app.services.storage_service import get_storage_service
+from app.tasks.celery_app import celery_app
+from app.utils.ffmpeg_utils import FFmpegError
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def get_db() -> Session:
+    """Get database session for tasks."""
+    return SessionLocal()
+
+
+@celery_app.task(bind=True, max_retries=3, default_retry_delay=60)
+def generate_media_previews(self, media_id: str):
+    """
+    Generate the poster frame and scrubbing sprite sheet of an uploaded video.
+
+    Also makes the poster the project's thumbnail when it has none yet.
+
+    Args:
+        media_id: UUID of the media file
+    """
+    db = get_db()
+
+    try:
+        media_file = db.get(MediaFile, UUID(media_id))
+        if not media_file or not has_video(media_file):
+            return {"media_id": media_id, "generated": False}
+
+        storage = get_storage_service()
+        # Get a local copy (downloaded into the cache for remote storage)
+        local_path = storage.get_local_copy(media_file.stored_filename)
+        if not local_path:
+            raise ValueError("Media file not found on storage")
+        # The render can take minutes; do not hold a connection meanwhile
+        project_id = media_file.project_id
+        content_key = source_hash(media_file)
+        db.close()
+
+        artifacts = get_artifact_store()
+        params = preview_params()
+        try:
+            layout = generate_previews(artifacts, content_key, local_path, params)
+        except (PreviewUnavailableError, FFmpegError) as e:
+            # Retrying will not make an unreadable video readable
+            logger.warning(f"No previews for media {media_id}: {e}")
+            return {"media_id": media_id, "generated": False}
+
+        thumbnail = None
+        poster_path = artifacts.get_file(content_key, PREVIEW_POSTER, params)
+        if poster_path is not None:
+            with get_db() as thumbnail_db:
+                thumbnail = use_poster_as_thumbnail(
+                    thumbnail_db, storage, project_id, poster_path
+                )
+
+        return {
+            "media_id": media_id,
+            "generated": True,
+            "tiles": layout["tile_count"],
+            "project_thumbnail": thumbnail,
+        }
+
+    except Exception as e:
+        db.rollback()
+
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e)
+
+        raise
+
+    finally:
+        db.close()
+
+
+@celery_app.task(bind=True, max_retries=3, default_retry_delay=60)
+def package_media_hls(self, media_id: str):
+    """
+    Package an uploaded video as an HLS bitrate ladder for the editor player.
+
+    Args:
+        media_id: UUID of the media file
+    """
+    db = get_db()
+
+    try:
+        media_file = db.get(MediaFile, UUID(media_id))
+        if not settings.hls_enabled or not media_file or not has_video(media_file):
+            return {"media_id": media_id, "packaged": False}
+
+        storage = get_storage_service()
+        # Get a local copy (downloaded into the cache for remote storage)
+        local_path = storage.get_local_copy(media_file.stored_filename)
+        if not local_path:
+            raise ValueError("Media file not found on storage")
+        # The transcode can take minutes; do not hold a connection meanwhile
+        content_key = source_hash(media_file)
+        db.close()
+
+        try:
+            prefix = package_media(get_artifact_store(), content_key, local_path)
+        except (HlsUnavailableError, FFmpegError) as e:
+            # Retrying will not make an unreadable video readable
+            logger.warning(f"No HLS package for media {media_id}: {e}")
+            return {"media_id": media_id, "packaged": False}
+
+        return {"media_id": media_id, "packaged": True, "prefix": prefix}
+
+    except Exception as e:
+        db.rollback()
+
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e)
+
+        raise
+
+    finally:
+        db.close()
+
+
+@celery_app.task(bind=True, max_retries=3, default_retry_delay=60)
+def generate_editing_proxy(self, media_id: str):
+    """
+    Transcode an uploaded video into a low-resolution, short-GOP editing proxy.
+
+    Args:
+        media_id: UUID of the media file
+    """
+    db = get_db()
+
+    try:
+        media_file = db.get(MediaFile, UUID(media_id))
+        if not settings.proxy_enabled or not media_file or not has_video(media_file):
+            return {"media_id": media_id, "generated": False}
+
+        storage = get_storage_service()
+        # Get a local copy (downloaded into the cache for remote storage)
+        local_path = storage.get_local_copy(media_file.stored_filename)
+        if not local_path:
+            raise ValueError("Media file not found on storage")
+        # The transcode can take minutes; do not hold a connection meanwhile
+        content_key = source_hash(media_file)
+        db.close()
+
+        try:
+            proxy_path = generate_proxy(get_artifact_store(), content_key, local_path)
+        except FFmpegError as e:
+            # Retrying will not make an unreadable video readable
+            logger.warning(f"No editing proxy for media {media_id}: {e}")
+            return {"media_id": media_id, "generated": False}
+
+        return {
+            "media_id": media_id,
+            "generated": True,
+            "size_bytes": proxy_path.stat().st_size,
+        }
+
+    except Exception as e:
+        db.rollback()
+
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e)
+
+        raise
+
+    finally:
+        db.close()
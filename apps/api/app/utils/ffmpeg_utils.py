@@ -120,6 +120,62 @@ def extract_audio(
         raise FFmpegError("FFmpeg audio extraction timed out")
 
 
+def encode_audio_chunk(
+    input_path: Path,
+    output_path: Path,
+    start_seconds: float,
+    duration_seconds: float,
+    bitrate: str = "32k",
+) -> Path:
+    """
+    Encode a time range of an audio file to Opus for compact upload.
+
+    Args:
+        input_path: Path to input audio file
+        output_path: Path for the encoded .ogg file
+        start_seconds: Start of the range to encode
+        duration_seconds: Length of the range to encode
+        bitrate: Target Opus bitrate (speech is intelligible well below 32k)
+
+    Returns:
+        Path to encoded audio file
+    """
+    cmd = [
+        "ffmpeg",
+        "-ss",
+        f"{start_seconds:.3f}",
+        "-t",
+        f"{duration_seconds:.3f}",
+        "-i",
+        str(input_path),
+        "-vn",
+        "-c:a",
+        "libopus",
+        "-b:a",
+        bitrate,
+        "-application",
+        "voip",
+        "-y",
+        str(output_path),
+    ]
+
+    try:
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            timeout=300,
+        )
+
+        if result.returncode != 0:
+            raise FFmpegError(f"FFmpeg audio encoding failed: {result.stderr}")
+
+        return output_path
+
+    except subprocess.TimeoutExpired:
+        raise FFmpegError("FFmpeg audio encoding timed out")
+
+
 def generate_waveform_data(
     audio_path: Path,
     num_samples: int = 1000,
@@ -272,6 +328,244 @@ def cut_segments_from_video(
         raise FFmpegError("FFmpeg cut operation timed out")
 
 
+def render_preview_images(
+    input_path: Path,
+    poster_path: Path,
+    sprite_path: Path,
+    poster_time: float,
+    poster_width: int,
+    interval: float,
+    tile_size: Tuple[int, int],
+    grid: Tuple[int, int],
+) -> None:
+    """
+    Render a poster frame and a sprite sheet of a video in one ffmpeg pass.
+
+    Only keyframes are decoded (``-skip_frame nokey``), so the pass costs a
+    small fraction of a full decode. The poster is the first keyframe at or
+    after ``poster_time`` (the first keyframe if there is none), and the
+    sprite tiles one frame every ``interval`` seconds, each showing the
+    latest keyframe at that time.
+
+    Args:
+        input_path: Path to input video file
+        poster_path: Path for the poster image
+        sprite_path: Path for the sprite sheet image
+        poster_time: Preferred poster position in seconds
+        poster_width: Maximum poster width; smaller videos keep their size
+        interval: Seconds between sprite tiles
+        tile_size: (width, height) of one tile
+        grid: (columns, rows) of the sprite sheet
+    """
+    tile_width, tile_height = tile_size
+    columns, rows = grid
+    filter_complex = ";".join(
+        [
+            "[0:v]split=2[p][s]",
+            # The first keyframe, then the first at poster_time; with -update the
+            # second overwrites the first when the video has one
+            f"[p]select='eq(n,0)+gte(t,{poster_time:.3f})',"
+            f"scale='min({poster_width},iw)':-2[poster]",
+            f"[s]fps=1/{interval:.3f},scale={tile_width}:{tile_height},"
+            f"tile={columns}x{rows}[sprite]",
+        ]
+    )
+
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-skip_frame", "nokey",
+        "-i", str(input_path),
+        "-filter_complex", filter_complex,
+        "-map", "[poster]",
+        "-frames:v", "2",
+        "-update", "1",
+        "-q:v", "3",
+        str(poster_path),
+        "-map", "[sprite]",
+        "-frames:v", "1",
+        "-q:v", "5",
+        str(sprite_path),
+    ]
+
+    try:
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            timeout=300,
+        )
+
+        if result.returncode != 0:
+            raise FFmpegError(f"FFmpeg preview rendering failed: {result.stderr}")
+
+        if not poster_path.exists() or not sprite_path.exists():
+            raise FFmpegError("FFmpeg produced no preview images")
+
+    except subprocess.TimeoutExpired:
+        raise FFmpegError("FFmpeg preview rendering timed out")
+
+
+def package_hls(
+    input_path: Path,
+    output_dir: Path,
+    renditions: list[dict],
+    segment_seconds: int,
+    has_audio: bool,
+) -> Path:
+    """
+    Transcode a video into an HLS bitrate ladder of fMP4 segments in one pass.
+
+    The source is decoded once and scaled for every rendition. Keyframes are
+    forced at every segment boundary with scene-cut detection off, so the
+    renditions' segments line up and players can switch between them.
+
+    Args:
+        input_path: Path to input video file
+        output_dir: Directory for the playlists and segments
+        renditions: Dicts with ``height``, ``video_bitrate`` and ``audio_bitrate``
+        segment_seconds: Target segment duration
+        has_audio: Whether the source has an audio stream to include
+
+    Returns:
+        Path to the master playlist
+    """
+    if not renditions:
+        raise FFmpegError("No renditions to package")
+
+    count = len(renditions)
+    outputs = "".join(f"[v{i}]" for i in range(count))
+    filter_parts = [f"[0:v]split={count}{outputs}"]
+    for i, rendition in enumerate(renditions):
+        filter_parts.append(f"[v{i}]scale=-2:{rendition['height']}[v{i}out]")
+
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-i", str(input_path),
+        "-filter_complex", ";".join(filter_parts),
+    ]
+    stream_map = []
+    for i, rendition in enumerate(renditions):
+        bitrate = rendition["video_bitrate"]
+        cmd += [
+            "-map", f"[v{i}out]",
+            f"-b:v:{i}", bitrate,
+            f"-maxrate:v:{i}", bitrate,
+            f"-bufsize:v:{i}", bitrate,
+        ]
+        if has_audio:
+            cmd += ["-map", "0:a:0", f"-b:a:{i}", rendition["audio_bitrate"]]
+            stream_map.append(f"v:{i},a:{i},name:{rendition['height']}p")
+        else:
+            stream_map.append(f"v:{i},name:{rendition['height']}p")
+
+    cmd += [
+        "-c:v", "libx264",
+        "-preset", "veryfast",
+        "-profile:v", "main",
+        "-pix_fmt", "yuv420p",
+        "-sc_threshold", "0",
+        "-force_key_frames", f"expr:gte(t,n_forced*{segment_seconds})",
+    ]
+    if has_audio:
+        cmd += ["-c:a", "aac", "-ac", "2"]
+    cmd += [
+        "-f", "hls",
+        "-hls_time", str(segment_seconds),
+        "-hls_playlist_type", "vod",
+        "-hls_segment_type", "fmp4",
+        "-hls_flags", "independent_segments",
+        "-hls_fmp4_init_filename", "init.mp4",
+        "-hls_segment_filename", str(output_dir / "%v" / "segment_%05d.m4s"),
+        "-master_pl_name", "master.m3u8",
+        "-var_stream_map", " ".join(stream_map),
+        str(output_dir / "%v" / "index.m3u8"),
+    ]
+
+    try:
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            timeout=3600,
+        )
+
+        if result.returncode != 0:
+            raise FFmpegError(f"FFmpeg HLS packaging failed: {result.stderr}")
+
+        master_path = output_dir / "master.m3u8"
+        if not master_path.exists():
+            raise FFmpegError("FFmpeg produced no master playlist")
+        return master_path
+
+    except subprocess.TimeoutExpired:
+        raise FFmpegError("FFmpeg HLS packaging timed out")
+
+
+def transcode_proxy(
+    input_path: Path,
+    output_path: Path,
+    height: int,
+    gop_frames: int,
+    crf: int,
+) -> Path:
+    """
+    Transcode a video into a low-resolution editing proxy.
+
+    Every ``gop_frames``-th frame is a keyframe (every frame for 1) and
+    B-frames are off, so a seek decodes at most a few frames, and the moov
+    atom is moved to the front so playback starts before the download ends.
+
+    Args:
+        input_path: Path to input video file
+        output_path: Path for the proxy (MP4)
+        height: Maximum proxy height; smaller videos keep their size
+        gop_frames: Keyframe interval in frames
+        crf: x264 constant rate factor
+
+    Returns:
+        Path to output video file
+    """
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-i", str(input_path),
+        "-map", "0:v:0",
+        "-map", "0:a:0?",
+        "-vf", f"scale=-2:'min({height},ih)'",
+        "-c:v", "libx264",
+        "-preset", "veryfast",
+        "-tune", "fastdecode",
+        "-crf", str(crf),
+        "-pix_fmt", "yuv420p",
+        "-g", str(gop_frames),
+        "-keyint_min", str(gop_frames),
+        "-sc_threshold", "0",
+        "-bf", "0",
+        "-c:a", "aac",
+        "-b:a", "96k",
+        "-movflags", "+faststart",
+        str(output_path),
+    ]
+
+    try:
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            timeout=3600,
+        )
+
+        if result.returncode != 0:
+            raise FFmpegError(f"FFmpeg proxy transcode failed: {result.stderr}")
+
+        return output_path
+
+    except subprocess.TimeoutExpired:
+        raise FFmpegError("FFmpeg proxy transcode timed out")
+
+
 def validate_media_file(file_path: Path) -> Tuple[bool, Optional[str]]:
     """
     Validate that a file is a valid media file using FFprobe.
@@ -0,0 +1,93 @@
+"""Token-level phrase matching for filler word detection."""
+
+from collections import deque
+from typing import Iterable, List, Sequence, Tuple
+
+
+def normalize_token(token: str) -> str:
+    """Normalize a transcribed word or phrase token for matching."""
+    return token.lower().strip()
+
+
+class FillerWordMatcher:
+    """
+    Aho-Corasick automaton over word tokens.
+
+    The automaton is compiled once from the filler phrases; matching then
+    reports every single- and multi-word phrase, including overlapping ones,
+    in a single pass over the token stream.
+    """
+
+    def __init__(self, phrases: Iterable[str]):
+        """
+        Compile the automaton.
+
+        Args:
+            phrases: Filler words and phrases (e.g. "um", "you know")
+        """
+        # Node 0 is the root; each node maps a token to a child node
+        self._goto: List[dict] = [{}]
+        self._fail: List[int] = [0]
+        # Phrases ending at each node, as (phrase, token count)
+        self._output: List[List[Tuple[str, int]]] = [[]]
+
+        for phrase in phrases:
+            tokens = [normalize_token(t) for t in phrase.split()]
+            if tokens:
+                self._add(" ".join(tokens), tokens)
+
+        self._build_failure_links()
+
+    def _add(self, phrase: str, tokens: List[str]) -> None:
+        """Insert a phrase into the trie."""
+        node = 0
+        for token in tokens:
+            child = self._goto[node].get(token)
+            if child is None:
+                child = len(self._goto)
+                self._goto[node][token] = child
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = child
+
+        if (phrase, len(tokens)) not in self._output[node]:
+            self._output[node].append((phrase, len(tokens)))
+
+    def _build_failure_links(self) -> None:
+        """Compute failure links breadth-first and merge suffix outputs."""
+        pending = deque(self._goto[0].values())
+        while pending:
+            node = pending.popleft()
+            for token, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+                pending.append(child)
+
+    def find(self, tokens: Sequence[str]) -> List[Tuple[int, int, str]]:
+        """
+        Find all phrase occurrences in a stream of normalized tokens.
+
+        Args:
+            tokens: Normalized word tokens
+
+        Returns:
+            List of (first token index, last token index, phrase), ordered by
+            position
+        """
+        matches = []
+        node = 0
+        for index, token in enumerate(tokens):
+            while node and token not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(token, 0)
+
+            for phrase, length in self._output[node]:
+                matches.append((index - length + 1, index, phrase))
+
+        matches.sort()
+        return matches
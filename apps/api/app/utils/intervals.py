@@ -0,0 +1,67 @@
+"""Sorted interval index for aligning timelines."""
+
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Callable, Generic, Iterable, List, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class IntervalIndex(Generic[T]):
+    """
+    Read-only index over half-open time intervals.
+
+    Items are sorted once by start; a running maximum of end times bounds
+    overlap queries, so each query costs a binary search plus the matches
+    it returns (for the usual mostly-disjoint timelines).
+    """
+
+    def __init__(self, items: Iterable[T], key: Callable[[T], Tuple[int, int]]):
+        """
+        Build the index.
+
+        Args:
+            items: Items to index
+            key: Returns the (start, end) interval of an item
+        """
+        entries = sorted(
+            ((*key(item), position, item) for position, item in enumerate(items)),
+            key=lambda entry: (entry[0], entry[2]),
+        )
+        self._starts = [entry[0] for entry in entries]
+        self._ends = [entry[1] for entry in entries]
+        self._positions = [entry[2] for entry in entries]
+        self._items = [entry[3] for entry in entries]
+        self._max_ends = list(accumulate(self._ends, max))
+        # With start <= end everywhere, nothing starting after a query ends
+        # can be contained in it
+        self._well_formed = all(s <= e for s, e in zip(self._starts, self._ends))
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def overlapping(self, start: int, end: int) -> List[T]:
+        """
+        Items whose interval overlaps (start, end), in insertion order.
+
+        An item overlaps when it starts before ``end`` and ends after ``start``.
+        """
+        first = bisect_right(self._max_ends, start)
+        last = bisect_left(self._starts, end)
+        matches = [
+            (self._positions[i], self._items[i])
+            for i in range(first, last)
+            if self._ends[i] > start
+        ]
+        matches.sort(key=lambda match: match[0])
+        return [item for _, item in matches]
+
+    def contained(self, start: int, end: int) -> List[T]:
+        """
+        Items whose interval lies within [start, end], ordered by start.
+
+        Items with equal starts keep their insertion order.
+        """
+        first = bisect_left(self._starts, start)
+        last = bisect_right(self._starts, end) if self._well_formed else len(self._starts)
+        return [self._items[i] for i in range(first, last) if self._ends[i] <= end]
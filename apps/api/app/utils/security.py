@@ -1,16 +1,32 @@
 """Security utilities for password hashing and token generation."""
 
+import asyncio
 import hashlib
 import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Optional
+from functools import lru_cache
+from typing import Any, Callable, Optional
 
 from jose import jwt
 from passlib.context import CryptContext
 
 from app.config import get_settings
+from app.utils.metrics import get_metrics
 
 settings = get_settings()
+metrics = get_metrics()
+
+password_hash_seconds = metrics.histogram(
+    "password_hash_seconds",
+    "Time from submitting a password hash or verification to its result",
+)
+password_pool_rejections_total = metrics.counter(
+    "password_pool_rejections_total",
+    "Password operations rejected because the hashing pool was saturated",
+)
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=12)
 
@@ -25,6 +41,88 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+class PasswordPoolSaturatedError(Exception):
+    """Raised when the password hashing pool has no room for more work."""
+
+    pass
+
+
+class PasswordHashPool:
+    """
+    Bounded thread pool for bcrypt work.
+
+    bcrypt releases the GIL while hashing, so worker threads run in
+    parallel without blocking the event loop. At most ``max_workers``
+    operations run at once and ``max_queue`` more may wait; beyond that,
+    submissions fail immediately with PasswordPoolSaturatedError so a
+    login burst is shed instead of queuing without limit.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hash"
+        )
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Number of running and queued operations."""
+        return self._pending
+
+    async def run(self, func: Callable, *args) -> Any:
+        """
+        Run a password operation in the pool.
+
+        Raises:
+            PasswordPoolSaturatedError: If the pool and its queue are full
+        """
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                password_pool_rejections_total.inc()
+                raise PasswordPoolSaturatedError("Too many concurrent password operations")
+            self._pending += 1
+
+        started = time.perf_counter()
+
+        def release(_future) -> None:
+            with self._lock:
+                self._pending -= 1
+            password_hash_seconds.observe(time.perf_counter() - started)
+
+        # Released when the work finishes, even if the caller stops waiting
+        future = self._executor.submit(func, *args)
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future)
+
+
+@lru_cache
+def get_password_hash_pool() -> PasswordHashPool:
+    """Get the per-process password hashing pool."""
+    pool = PasswordHashPool(
+        max_workers=settings.password_hash_workers,
+        max_queue=settings.password_hash_max_queue,
+    )
+    metrics.gauge(
+        "password_pool_pending",
+        "Password operations running or queued",
+        lambda: pool.pending,
+    )
+    return pool
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password in the password hashing pool."""
+    return await get_password_hash_pool().run(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the password hashing pool."""
+    return await get_password_hash_pool().run(verify_password, plain_password, hashed_password)
+
+
 def create_access_token(
     subject: str,
     expires_delta: Optional[timedelta] = None,
@@ -55,6 +153,44 @@ def create_access_token(
     )
 
 
+def create_playback_token(
+    subject: str,
+    media_id: str,
+    storage_prefix: str,
+    expires_delta: Optional[timedelta] = None,
+) -> tuple[str, datetime]:
+    """
+    Create a playback token for one media file's HLS package and return it with its expiry.
+
+    The package's storage prefix is a signed claim, so playlist and segment
+    requests are authorized without a database lookup. Such a token cannot
+    be revoked: it stays valid until it expires or its package is deleted.
+    """
+    if expires_delta:
+        expire = datetime.now(timezone.utc) + expires_delta
+    else:
+        expire = datetime.now(timezone.utc) + timedelta(
+            minutes=settings.playback_token_expire_minutes
+        )
+
+    to_encode = {
+        "sub": subject,
+        "exp": expire,
+        "type": "playback",
+        "iat": datetime.now(timezone.utc),
+        "media_id": media_id,
+        "prefix": storage_prefix,
+    }
+
+    token = jwt.encode(
+        to_encode,
+        settings.jwt_secret_key,
+        algorithm=settings.jwt_algorithm,
+    )
+
+    return token, expire
+
+
 def create_refresh_token(
     subject: str,
     expires_delta: Optional[timedelta] = None,
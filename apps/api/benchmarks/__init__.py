@@ -0,0 +1 @@
+"""Microbenchmarks for hot paths in the API and workers."""
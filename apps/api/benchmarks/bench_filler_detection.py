@@ -0,0 +1,95 @@
+"""
+Benchmark filler word detection on a synthetic 2-hour transcript.
+
+Compares the single-pass token automaton with the previous approach of
+scanning the words once per multi-word filler.
+
+Usage (from apps/api):
+    python -m benchmarks.bench_filler_detection [--hours 2] [--repeat 5]
+"""
+
+import argparse
+import random
+import timeit
+
+from app.config import get_settings
+from app.utils.filler_matcher import FillerWordMatcher, normalize_token
+
+VOCABULARY = (
+    "the a and to of in it that is was for on with as this we they but "
+    "have be at not are so like you know i mean um uh well basically "
+    "actually literally video clip edit cut scene audio really just"
+).split()
+
+WORDS_PER_MINUTE = 150
+
+
+def build_transcript(hours: float, seed: int = 42) -> dict:
+    """Build word timings for a transcript of the given length."""
+    rng = random.Random(seed)
+    count = int(hours * 60 * WORDS_PER_MINUTE)
+    step = 60 / WORDS_PER_MINUTE
+    words = [
+        {"word": f" {rng.choice(VOCABULARY)}", "start": i * step, "end": i * step + 0.3}
+        for i in range(count)
+    ]
+    text = "".join(w["word"] for w in words)
+    return {"text": text, "words": words}
+
+
+def detect_scan(filler_words: list, transcription_data: dict) -> list:
+    """Previous implementation: one scan per multi-word filler."""
+    found = []
+    words = transcription_data["words"]
+    for word_data in words:
+        word = word_data["word"].lower().strip()
+        if word in filler_words:
+            found.append((word, word_data["start"]))
+
+    text_lower = transcription_data["text"].lower()
+    for filler in [f for f in filler_words if " " in f]:
+        if filler in text_lower:
+            parts = filler.split()
+            for i, word_data in enumerate(words):
+                if word_data["word"].lower().strip() != parts[0]:
+                    continue
+                if all(
+                    i + j < len(words) and words[i + j]["word"].lower().strip() == part
+                    for j, part in enumerate(parts[1:], 1)
+                ):
+                    found.append((filler, word_data["start"]))
+    return found
+
+
+def detect_automaton(matcher: FillerWordMatcher, transcription_data: dict) -> list:
+    """Current implementation: normalize once, match in one pass."""
+    words = transcription_data["words"]
+    tokens = [normalize_token(w["word"]) for w in words]
+    return [(phrase, words[first]["start"]) for first, _, phrase in matcher.find(tokens)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hours", type=float, default=2.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    filler_words = get_settings().filler_words_list
+    transcript = build_transcript(args.hours)
+    matcher = FillerWordMatcher(filler_words)
+
+    assert sorted(detect_scan(filler_words, transcript)) == sorted(
+        detect_automaton(matcher, transcript)
+    )
+
+    print(f"{len(transcript['words'])} words, {len(filler_words)} fillers")
+    for name, fn in (
+        ("scan", lambda: detect_scan(filler_words, transcript)),
+        ("automaton", lambda: detect_automaton(matcher, transcript)),
+    ):
+        best = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        print(f"{name:>10}: {best * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
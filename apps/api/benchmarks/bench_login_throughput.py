@@ -0,0 +1,81 @@
+"""
+Benchmark concurrent password verification during a login burst.
+
+Compares bcrypt verification inline in the event loop (the previous
+behaviour of the login handler) with the bounded password hashing pool.
+Reports login throughput and the worst event-loop stall seen by a
+heartbeat task, which is how long every other request would have waited.
+
+Usage (from apps/api):
+    python -m benchmarks.bench_login_throughput [--logins 32] [--workers 4] [--queue 64]
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.utils.security import (
+    PasswordHashPool,
+    PasswordPoolSaturatedError,
+    hash_password,
+    verify_password,
+)
+
+PASSWORD = "CorrectHorseBattery1"
+
+
+async def heartbeat(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """Return the largest delay between scheduled and actual wake-ups."""
+    worst = 0.0
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - expected)
+    return worst
+
+
+async def run_burst(login, count: int):
+    """Run count concurrent logins; return (seconds, rejected, worst stall)."""
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(heartbeat(stop))
+    await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(count)), return_exceptions=True)
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    worst_stall = await monitor
+    rejected = sum(isinstance(r, PasswordPoolSaturatedError) for r in results)
+    return elapsed, rejected, worst_stall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--queue", type=int, default=64)
+    args = parser.parse_args()
+
+    password_hash = hash_password(PASSWORD)
+
+    async def inline_login():
+        return verify_password(PASSWORD, password_hash)
+
+    pool = PasswordHashPool(max_workers=args.workers, max_queue=args.queue)
+
+    async def pooled_login():
+        return await pool.run(verify_password, PASSWORD, password_hash)
+
+    print(f"{args.logins} concurrent logins, bcrypt rounds from app settings")
+    for name, login in (("inline", inline_login), (f"pool[{args.workers}]", pooled_login)):
+        elapsed, rejected, stall = asyncio.run(run_burst(login, args.logins))
+        served = args.logins - rejected
+        print(
+            f"{name:>10}: {served / elapsed:7.1f} logins/s  "
+            f"rejected={rejected:<3d} worst loop stall={stall * 1000:8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark VAD/Whisper segment alignment on 10k-segment inputs.
+
+Compares the indexed sweep in WhisperProcessor._merge_segments with the
+previous per-segment full scans of the transcript and filler lists.
+
+Usage (from apps/api):
+    python -m benchmarks.bench_segment_alignment [--segments 10000] [--repeat 3]
+"""
+
+import argparse
+import random
+import timeit
+
+from app.services.vad_processor import Segment
+from app.services.whisper_processor import (
+    FillerWord,
+    OpenAITranscriptionEngine,
+    WhisperProcessor,
+)
+
+
+def build_inputs(count: int, seed: int = 42):
+    """Build alternating VAD segments with one transcript segment per speech range."""
+    rng = random.Random(seed)
+    vad_segments, whisper_segments, filler_words = [], [], []
+    cursor = 0
+    for i in range(count):
+        length = rng.randint(300, 4000)
+        if i % 2 == 0:
+            vad_segments.append(Segment(cursor, cursor + length, "speech", 0.9))
+            whisper_segments.append(
+                {"id": i // 2, "start": cursor / 1000, "end": (cursor + length) / 1000, "text": " words"}
+            )
+            if rng.random() < 0.3:
+                start = cursor + rng.randint(0, length - 250)
+                filler_words.append(FillerWord("um", start, start + 200, 0.9))
+        else:
+            vad_segments.append(Segment(cursor, cursor + length, "silence", 0.9))
+        cursor += length
+    return vad_segments, {"segments": whisper_segments}, filler_words
+
+
+def merge_scan(processor, vad_segments, transcription_data, filler_words):
+    """Previous implementation: scan every transcript segment and filler per VAD segment."""
+    whisper_segments = transcription_data["segments"]
+
+    def text_for(start_ms, end_ms):
+        return " ".join(
+            seg["text"].strip()
+            for seg in whisper_segments
+            if int(seg["start"] * 1000) < end_ms and int(seg["end"] * 1000) > start_ms
+        )
+
+    merged = 0
+    for vad_seg in vad_segments:
+        if vad_seg.type == "silence":
+            merged += 1
+            continue
+        text_for(vad_seg.start_ms, vad_seg.end_ms)
+        fillers = sorted(
+            (
+                fw
+                for fw in filler_words
+                if fw.start_ms >= vad_seg.start_ms and fw.end_ms <= vad_seg.end_ms
+            ),
+            key=lambda fw: fw.start_ms,
+        )
+        current = vad_seg.start_ms
+        for filler in fillers:
+            if filler.start_ms > current:
+                text_for(current, filler.start_ms)
+                merged += 1
+            merged += 1
+            current = filler.end_ms + processor.filler_word_padding_ms
+        if current < vad_seg.end_ms:
+            text_for(current, vad_seg.end_ms)
+            merged += 1
+    return merged
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--segments", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    inputs = build_inputs(args.segments)
+    processor = WhisperProcessor(engine=OpenAITranscriptionEngine(api_key="benchmark"))
+
+    assert merge_scan(processor, *inputs) == len(processor._merge_segments(*inputs))
+
+    print(f"{args.segments} VAD segments, {len(inputs[2])} fillers")
+    for name, fn in (
+        ("scan", lambda: merge_scan(processor, *inputs)),
+        ("indexed", lambda: processor._merge_segments(*inputs)),
+    ):
+        best = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        print(f"{name:>10}: {best * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
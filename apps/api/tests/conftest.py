@@ -7,13 +7,15 @@ from uuid import uuid4
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 
 from app.config import Settings, get_settings
 from app.database import Base, get_db
 from app.main import app
 from app.models.user import User
+from app.services.user_cache import get_user_cache
 from app.utils.security import create_access_token, hash_password
 
 
@@ -36,16 +38,23 @@ def test_settings() -> Settings:
 
 
 @pytest.fixture(scope="function")
-def db_engine():
+def db_path(tmp_path):
+    """Path of the test database, shared by the sync fixtures and the async API."""
+    return tmp_path / "test.db"
+
+
+@pytest.fixture(scope="function")
+def db_engine(db_path):
     """Create test database engine."""
     engine = create_engine(
-        "sqlite:///:memory:",
+        f"sqlite:///{db_path}",
         connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
+        poolclass=NullPool,
     )
     Base.metadata.create_all(bind=engine)
     yield engine
     Base.metadata.drop_all(bind=engine)
+    engine.dispose()
 
 
 @pytest.fixture(scope="function")
@@ -60,18 +69,27 @@ def db_session(db_engine) -> Generator[Session, None, None]:
 
 
 @pytest.fixture(scope="function")
-def client(db_session: Session, test_settings: Settings) -> Generator[TestClient, None, None]:
+def client(
+    db_session: Session, db_path, test_settings: Settings
+) -> Generator[TestClient, None, None]:
     """Create test client with database override."""
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    TestingAsyncSessionLocal = async_sessionmaker(
+        async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
 
-    def override_get_db():
-        try:
-            yield db_session
-        finally:
-            pass
+    async def override_get_db():
+        async with TestingAsyncSessionLocal() as session:
+            yield session
 
     def override_get_settings():
         return test_settings
 
+    # Users cached by an earlier test must not leak into this one
+    user_cache = get_user_cache()
+    if user_cache:
+        user_cache.clear()
+
     app.dependency_overrides[get_db] = override_get_db
     app.dependency_overrides[get_settings] = override_get_settings
 
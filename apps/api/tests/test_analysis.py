@@ -70,6 +70,134 @@ class TestGetAnalysisStatus:
         assert response.status_code == 404
 
 
+class TestGetAnalysisSegments:
+    """Tests for time-window segment queries."""
+
+    def test_segments_not_found(self, client: TestClient, auth_headers):
+        """Test listing segments of a nonexistent analysis."""
+        response = client.get(
+            f"/api/v1/analysis/{uuid4()}/segments",
+            headers=auth_headers,
+        )
+        assert response.status_code == 404
+
+    def test_segments_in_window(
+        self, client: TestClient, auth_headers, test_project, db_session
+    ):
+        """Test only segments overlapping the window are returned."""
+        segments = [
+            {
+                "start_ms": i * 1000,
+                "end_ms": (i + 1) * 1000,
+                "type": "speech",
+                "confidence": 0.9,
+                "classification": "keep",
+            }
+            for i in range(10)
+        ]
+        analysis = TestReprocessAnalysis()._analysis(
+            db_session, test_project, segments=segments
+        )
+
+        response = client.get(
+            f"/api/v1/analysis/{analysis.id}/segments",
+            headers=auth_headers,
+            params={"start_ms": 2500, "end_ms": 4000},
+        )
+        assert response.status_code == 200
+        assert [s["start_ms"] for s in response.json()["segments"]] == [2000, 3000]
+
+
+class TestReprocessAnalysis:
+    """Tests for re-processing analysis segments."""
+
+    def _analysis(self, db_session, test_project, segments=None, **kwargs):
+        from app.models.analysis import AnalysisResult, AnalysisStatus, ProcessingMode
+        from app.models.media import MediaFile
+        from app.services.segment_store import get_segment_store
+
+        media = MediaFile(
+            id=uuid4(),
+            project_id=test_project.id,
+            original_filename="test.mp4",
+            stored_filename="test_stored.mp4",
+            file_path="/tmp/test.mp4",
+            file_size=1000,
+            mime_type="video/mp4",
+        )
+        db_session.add(media)
+        analysis = AnalysisResult(
+            id=uuid4(),
+            media_file_id=media.id,
+            processing_mode=ProcessingMode.VAD,
+            status=AnalysisStatus.COMPLETED,
+            **kwargs,
+        )
+        db_session.add(analysis)
+        db_session.flush()
+        get_segment_store(db_session).replace(analysis.id, segments or [])
+        db_session.commit()
+        return analysis
+
+    def test_reprocess_not_found(self, client: TestClient, auth_headers):
+        """Test re-processing a nonexistent analysis."""
+        response = client.post(
+            f"/api/v1/analysis/{uuid4()}/reprocess",
+            headers=auth_headers,
+            json={"speech_padding_ms": 0},
+        )
+        assert response.status_code == 404
+
+    def test_reprocess_without_raw_segments(
+        self, client: TestClient, auth_headers, test_project, db_session
+    ):
+        """Test analyses stored before raw segments were kept cannot be re-processed."""
+        analysis = self._analysis(db_session, test_project, segments=[])
+
+        response = client.post(
+            f"/api/v1/analysis/{analysis.id}/reprocess",
+            headers=auth_headers,
+            json={"speech_padding_ms": 0},
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"]["code"] == "NO_ANALYSIS"
+
+    def test_reprocess_returns_changed_ranges(
+        self, client: TestClient, auth_headers, test_project, db_session
+    ):
+        """Test new padding is applied and only the changed range is returned."""
+        from app.services.segment_processor import SegmentProcessor
+
+        raw_segments = [
+            {"start_ms": 0, "end_ms": 1000, "type": "speech", "confidence": 0.9},
+            {"start_ms": 1000, "end_ms": 2000, "type": "silence", "confidence": 0.9},
+        ]
+        processor = SegmentProcessor()
+        analysis = self._analysis(
+            db_session,
+            test_project,
+            raw_segments=raw_segments,
+            segments=processor.process_table(raw_segments, 2000).to_dicts(),
+            processing_params={**processor.params, "total_duration_ms": 2000},
+        )
+
+        response = client.post(
+            f"/api/v1/analysis/{analysis.id}/reprocess",
+            headers=auth_headers,
+            json={
+                "speech_padding_ms": 200,
+                "classification_overrides": [{"at_ms": 1500, "classification": "keep"}],
+            },
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["segment_count"] == 2
+        assert data["processing_params"]["speech_padding_ms"] == 200
+        assert [(c["old_start"], c["old_end"]) for c in data["changes"]] == [(0, 2)]
+        assert data["changes"][0]["segments"][1]["start_ms"] == 1200
+        assert data["changes"][0]["segments"][1]["classification"] == "keep"
+
+
 class TestConfigEndpoint:
     """Tests for configuration endpoint."""
 
@@ -0,0 +1,219 @@
+"""Tests for the derived artifact store."""
+
+import threading
+import time
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from app.api.v1 import media as media_module
+from app.models.derived_artifact import DerivedArtifact
+from app.models.media import MediaFile
+from app.services.artifact_store import DerivedArtifactStore, artifact_requests_total
+from app.services.storage_service import LocalStorageBackend, StorageService
+
+CONTENT_HASH = "ab" * 32
+
+
+@pytest.fixture
+def session_factory(db_engine):
+    """Session factory bound to the test database."""
+    return sessionmaker(bind=db_engine)
+
+
+@pytest.fixture
+def storage(tmp_path) -> StorageService:
+    """Storage service backed by a temporary directory."""
+    service = StorageService.__new__(StorageService)
+    service.backend = LocalStorageBackend(str(tmp_path / "storage"))
+    return service
+
+
+def _store(
+    storage, session_factory, tmp_path, max_bytes=1024, grace_seconds=0
+) -> DerivedArtifactStore:
+    return DerivedArtifactStore(
+        storage=storage,
+        max_bytes=max_bytes,
+        lock_dir=str(tmp_path / "locks"),
+        session_factory=session_factory,
+        grace_seconds=grace_seconds,
+    )
+
+
+def _writer(data: bytes, calls: list, delay: float = 0.0):
+    def compute(output_path):
+        calls.append(output_path)
+        time.sleep(delay)
+        output_path.write_bytes(data)
+
+    return compute
+
+
+class TestDerivedArtifactStore:
+    """Tests for memoized artifact computation."""
+
+    def test_computes_once_per_key(self, storage, session_factory, tmp_path):
+        """Test an artifact is computed on the first request and reused afterwards."""
+        store = _store(storage, session_factory, tmp_path)
+        calls = []
+        hits = artifact_requests_total.value(type="audio_pcm", result="hit")
+
+        first = store.get_or_compute_file(
+            CONTENT_HASH, "audio_pcm", {"rate": 16000}, _writer(b"pcm", calls), ".wav"
+        )
+        second = store.get_or_compute_file(
+            CONTENT_HASH, "audio_pcm", {"rate": 16000}, _writer(b"pcm", calls), ".wav"
+        )
+
+        assert first == second
+        assert first.suffix == ".wav"
+        assert first.read_bytes() == b"pcm"
+        assert len(calls) == 1
+        assert artifact_requests_total.value(type="audio_pcm", result="hit") == hits + 1
+
+        with session_factory() as db:
+            artifact = db.execute(select(DerivedArtifact)).scalar_one()
+        assert artifact.content_hash == CONTENT_HASH
+        assert artifact.size_bytes == 3
+
+    def test_parameters_are_part_of_the_key(self, storage, session_factory, tmp_path):
+        """Test different parameters produce separate artifacts."""
+        store = _store(storage, session_factory, tmp_path)
+
+        first = store.get_or_compute_json(CONTENT_HASH, "vad_segments", {"level": 1}, lambda: [1])
+        second = store.get_or_compute_json(CONTENT_HASH, "vad_segments", {"level": 3}, lambda: [3])
+
+        assert (first, second) == ([1], [3])
+        assert store.get_or_compute_json(
+            CONTENT_HASH, "vad_segments", {"level": 1}, lambda: pytest.fail("recomputed")
+        ) == [1]
+
+    def test_concurrent_misses_compute_once(self, storage, session_factory, tmp_path):
+        """Test concurrent requests for one key share a single computation."""
+        store = _store(storage, session_factory, tmp_path)
+        calls = []
+        results = []
+
+        def request():
+            results.append(
+                store.get_or_compute_file(
+                    CONTENT_HASH, "waveform", {}, _writer(b"peaks", calls, delay=0.05)
+                )
+            )
+
+        threads = [threading.Thread(target=request) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert len(set(results)) == 1
+
+    def test_evicts_least_recently_used(self, storage, session_factory, tmp_path):
+        """Test the oldest artifacts are removed once the size cap is exceeded."""
+        store = _store(storage, session_factory, tmp_path, max_bytes=250)
+        calls = []
+        paths = {}
+        for name in ("a", "b"):
+            paths[name] = store.get_or_compute_file(
+                CONTENT_HASH, name, {}, _writer(b"x" * 100, calls)
+            )
+
+        # Use "a" again so "b" becomes the least recently used
+        store.get_or_compute_file(CONTENT_HASH, "a", {}, _writer(b"x" * 100, calls))
+        store.get_or_compute_file(CONTENT_HASH, "c", {}, _writer(b"x" * 100, calls))
+
+        assert paths["a"].exists()
+        assert not paths["b"].exists()
+        with session_factory() as db:
+            types = set(db.execute(select(DerivedArtifact.artifact_type)).scalars())
+        assert types == {"a", "c"}
+
+    def test_recently_used_artifacts_are_kept(self, storage, session_factory, tmp_path):
+        """Test artifacts accessed within the grace window survive eviction."""
+        store = _store(storage, session_factory, tmp_path, max_bytes=150, grace_seconds=3600)
+        calls = []
+        paths = [
+            store.get_or_compute_file(CONTENT_HASH, name, {}, _writer(b"x" * 100, calls))
+            for name in ("a", "b")
+        ]
+
+        assert store.evict() == 0
+        assert all(path.exists() for path in paths)
+
+    def test_missing_file_is_recomputed(self, storage, session_factory, tmp_path):
+        """Test an artifact deleted from storage is computed again."""
+        store = _store(storage, session_factory, tmp_path)
+        calls = []
+
+        path = store.get_or_compute_file(CONTENT_HASH, "waveform", {}, _writer(b"1", calls))
+        path.unlink()
+        path = store.get_or_compute_file(CONTENT_HASH, "waveform", {}, _writer(b"2", calls))
+
+        assert path.read_bytes() == b"2"
+        assert len(calls) == 2
+
+
+class _FakeWaveformGenerator:
+    """Counts waveform generations."""
+
+    num_samples = 4
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate_from_file(self, file_path):
+        self.calls += 1
+        return [0.1, 0.5, 1.0, 0.2], 2.5, 16000
+
+
+class TestWaveformEndpoint:
+    """Tests for waveform memoization in the API."""
+
+    def test_waveform_generated_once(
+        self,
+        client: TestClient,
+        auth_headers,
+        test_project,
+        db_session,
+        storage,
+        session_factory,
+        tmp_path,
+        monkeypatch,
+    ):
+        """Test repeated waveform requests reuse the stored result."""
+        store = _store(storage, session_factory, tmp_path)
+        generator = _FakeWaveformGenerator()
+        monkeypatch.setattr(media_module, "get_artifact_store", lambda: store)
+        monkeypatch.setattr(media_module, "get_storage_service", lambda: storage)
+        monkeypatch.setattr(media_module, "get_waveform_generator", lambda: generator)
+
+        storage.backend.get_file_path("clip.wav").write_bytes(b"RIFF")
+        media_file = MediaFile(
+            id=uuid4(),
+            project_id=test_project.id,
+            original_filename="clip.wav",
+            stored_filename="clip.wav",
+            file_path="clip.wav",
+            file_size=4,
+            mime_type="audio/wav",
+            content_hash=CONTENT_HASH,
+        )
+        db_session.add(media_file)
+        db_session.commit()
+
+        for _ in range(2):
+            response = client.get(f"/api/v1/media/{media_file.id}/waveform", headers=auth_headers)
+            assert response.status_code == 200
+            assert response.json() == {
+                "peaks": [0.1, 0.5, 1.0, 0.2],
+                "duration": 2.5,
+                "sample_rate": 16000,
+            }
+
+        assert generator.calls == 1
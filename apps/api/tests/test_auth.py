@@ -1,8 +1,14 @@
 """Tests for authentication endpoints."""
 
+import asyncio
+import threading
+
 import pytest
 from fastapi.testclient import TestClient
 
+from app.utils import security
+from app.utils.security import PasswordHashPool, PasswordPoolSaturatedError
+
 
 class TestRegister:
     """Tests for user registration."""
@@ -108,6 +114,66 @@ class TestLogin:
         )
         assert response.status_code == 401
 
+    def test_login_rejected_when_password_pool_saturated(
+        self, client: TestClient, test_user, monkeypatch
+    ):
+        """Test login returns 429 when the password hashing pool is full."""
+        pool = PasswordHashPool(max_workers=1, max_queue=0)
+        release = threading.Event()
+        monkeypatch.setattr(security, "get_password_hash_pool", lambda: pool)
+
+        async def occupy():
+            return await pool.run(release.wait)
+
+        loop = asyncio.new_event_loop()
+        busy = loop.create_task(occupy())
+        loop.run_until_complete(asyncio.sleep(0))
+        try:
+            response = client.post(
+                "/api/v1/auth/login",
+                json={"email": test_user.email, "password": "TestPassword123"},
+            )
+        finally:
+            release.set()
+            loop.run_until_complete(busy)
+            loop.close()
+
+        assert response.status_code == 429
+        assert response.json()["detail"]["code"] == "RATE_LIMITED"
+        assert response.headers["Retry-After"] == "1"
+
+
+class TestPasswordHashPool:
+    """Tests for the bounded password hashing pool."""
+
+    def test_runs_password_operations(self):
+        """Test hashing and verification through the pool."""
+        pool = PasswordHashPool(max_workers=2, max_queue=2)
+
+        async def run():
+            hashed = await pool.run(security.hash_password, "Secret123")
+            return await pool.run(security.verify_password, "Secret123", hashed)
+
+        assert asyncio.run(run()) is True
+        assert pool.pending == 0
+
+    def test_rejects_beyond_queue_limit(self):
+        """Test submissions beyond workers plus queue fail immediately."""
+        pool = PasswordHashPool(max_workers=1, max_queue=1)
+        release = threading.Event()
+
+        async def run():
+            first = asyncio.ensure_future(pool.run(release.wait))
+            second = asyncio.ensure_future(pool.run(release.wait))
+            await asyncio.sleep(0)
+            with pytest.raises(PasswordPoolSaturatedError):
+                await pool.run(release.wait)
+            release.set()
+            await asyncio.gather(first, second)
+
+        asyncio.run(run())
+        assert pool.pending == 0
+
 
 class TestMe:
     """Tests for current user endpoints."""
@@ -0,0 +1,68 @@
+"""Tests for analysis checkpointing."""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+
+from app.services.checkpoint_service import AnalysisCheckpointer, run_checkpointed
+from app.services.storage_service import LocalStorageBackend, StorageService
+
+
+@pytest.fixture
+def checkpointer(tmp_path):
+    """Create a checkpointer backed by local storage in a temp directory."""
+    storage = StorageService()
+    storage.backend = LocalStorageBackend(str(tmp_path / "storage"))
+    analysis = SimpleNamespace(id=uuid4(), checkpoints=None)
+    return AnalysisCheckpointer(analysis, MagicMock(), storage)
+
+
+class TestAnalysisCheckpointer:
+    """Tests for storing and resuming stage artifacts."""
+
+    def test_json_round_trip(self, checkpointer):
+        """Test a JSON stage is stored and recorded in the manifest."""
+        checkpointer.save_json(AnalysisCheckpointer.STAGE_VAD, [{"start_ms": 0}])
+
+        assert checkpointer.has(AnalysisCheckpointer.STAGE_VAD)
+        assert checkpointer.load_json(AnalysisCheckpointer.STAGE_VAD) == [{"start_ms": 0}]
+        checkpointer.db.commit.assert_called()
+
+    def test_file_round_trip(self, checkpointer, tmp_path):
+        """Test a file stage is restored to the requested path."""
+        source = tmp_path / "audio.wav"
+        source.write_bytes(b"RIFF-data")
+        checkpointer.save_file(AnalysisCheckpointer.STAGE_AUDIO, source)
+
+        restored = checkpointer.load_file(
+            AnalysisCheckpointer.STAGE_AUDIO, tmp_path / "restored.wav"
+        )
+        assert restored is not None
+        assert restored.read_bytes() == b"RIFF-data"
+
+    def test_resume_skips_completed_stage(self, checkpointer):
+        """Test a completed stage is not recomputed on retry."""
+        compute = MagicMock(return_value={"text": "hello"})
+
+        first = run_checkpointed(checkpointer, AnalysisCheckpointer.STAGE_TRANSCRIPTION, compute)
+        second = run_checkpointed(checkpointer, AnalysisCheckpointer.STAGE_TRANSCRIPTION, compute)
+
+        assert first == second == {"text": "hello"}
+        compute.assert_called_once()
+
+    def test_missing_artifact_is_recomputed(self, checkpointer):
+        """Test a manifest entry whose artifact was deleted is treated as missing."""
+        checkpointer.save_json(AnalysisCheckpointer.STAGE_VAD, [])
+        checkpointer.storage.delete_file(checkpointer.manifest["vad"]["path"])
+
+        assert checkpointer.load_json(AnalysisCheckpointer.STAGE_VAD) is None
+
+    def test_clear(self, checkpointer):
+        """Test clearing removes artifacts and resets the manifest."""
+        key = checkpointer.save_json(AnalysisCheckpointer.STAGE_VAD, [])
+        checkpointer.clear()
+
+        assert checkpointer.analysis.checkpoints is None
+        assert not checkpointer.storage.file_exists(key)
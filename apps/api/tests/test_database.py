@@ -0,0 +1,88 @@
+"""Tests for database engine configuration and pool metrics."""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import Settings
+from app.database import TimedAsyncQueuePool, pool_wait_seconds
+from app.utils.metrics import MetricsRegistry
+
+
+class TestAsyncDatabaseUrl:
+    """Tests for deriving the async driver URL."""
+
+    @pytest.mark.parametrize(
+        "url,expected",
+        [
+            ("postgresql://u:p@db:5432/app", "postgresql+asyncpg://u:p@db:5432/app"),
+            ("postgresql+psycopg2://u:p@db/app", "postgresql+asyncpg://u:p@db/app"),
+            ("sqlite:///./app.db", "sqlite+aiosqlite:///./app.db"),
+            ("postgresql+asyncpg://u:p@db/app", "postgresql+asyncpg://u:p@db/app"),
+        ],
+    )
+    def test_async_database_url(self, url, expected):
+        """Test sync URLs are mapped to their async driver."""
+        assert Settings(database_url=url).async_database_url == expected
+
+
+class TestPoolMetrics:
+    """Tests for connection pool wait-time metrics."""
+
+    def test_checkout_wait_is_recorded(self, tmp_path):
+        """Test each connection checkout records a wait-time observation."""
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+            poolclass=TimedAsyncQueuePool,
+            pool_size=1,
+            max_overflow=0,
+        )
+        before = pool_wait_seconds.count()
+
+        async def run_queries():
+            for _ in range(3):
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+            await engine.dispose()
+
+        asyncio.run(run_queries())
+
+        assert pool_wait_seconds.count() == before + 3
+
+    def test_metrics_endpoint(self, client: TestClient):
+        """Test the metrics endpoint exposes pool metrics."""
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert "# TYPE db_pool_wait_seconds histogram" in response.text
+        assert "db_pool_checked_out" in response.text
+
+
+class TestMetricsRegistry:
+    """Tests for the in-process metrics registry."""
+
+    def test_render_counter_and_histogram(self):
+        """Test counters and histograms render in the text format."""
+        registry = MetricsRegistry()
+        hits = registry.counter("cache_hits_total", "Cache hits")
+        latency = registry.histogram("op_seconds", "Operation latency", buckets=(0.1, 1.0))
+
+        hits.inc(cache="user")
+        hits.inc(2, cache="user")
+        latency.observe(0.05)
+        latency.observe(0.5)
+        latency.observe(5.0)
+
+        output = registry.render()
+        assert 'cache_hits_total{cache="user"} 3.0' in output
+        assert 'op_seconds_bucket{le="0.1"} 1.0' in output
+        assert 'op_seconds_bucket{le="1.0"} 2.0' in output
+        assert 'op_seconds_bucket{le="+Inf"} 3.0' in output
+        assert "op_seconds_count 3.0" in output
+
+    def test_register_returns_existing_metric(self):
+        """Test registering a name twice returns the same metric."""
+        registry = MetricsRegistry()
+        assert registry.counter("x_total", "X") is registry.counter("x_total", "X")
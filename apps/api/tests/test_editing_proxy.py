@@ -0,0 +1,158 @@
+"""Tests for editing proxies."""
+
+import io
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.api.v1 import media as media_module
+from app.models.media import MediaFile
+from app.services import editing_proxy
+from app.services.artifact_store import DerivedArtifactStore
+from app.services.editing_proxy import generate_proxy, proxy_params
+from app.services.storage_service import LocalStorageBackend, StorageService
+from app.tasks.media_tasks import (
+    generate_editing_proxy,
+    generate_media_previews,
+    package_media_hls,
+)
+from app.utils.security import create_access_token
+
+CONTENT_HASH = "0f" * 32
+MP4_CONTENT = b"\x00\x00\x00\x18ftypmp42" + bytes(64)
+
+
+@pytest.fixture
+def storage(tmp_path) -> StorageService:
+    """Storage service backed by a temporary directory."""
+    service = StorageService.__new__(StorageService)
+    service.backend = LocalStorageBackend(str(tmp_path / "storage"))
+    return service
+
+
+@pytest.fixture
+def store(storage, db_engine, tmp_path) -> DerivedArtifactStore:
+    """Artifact store on the test database."""
+    return DerivedArtifactStore(
+        storage=storage,
+        max_bytes=1024 * 1024,
+        lock_dir=str(tmp_path / "locks"),
+        session_factory=sessionmaker(bind=db_engine),
+    )
+
+
+@pytest.fixture
+def fake_transcode(monkeypatch):
+    """Replace the ffmpeg proxy transcode; records each run."""
+    runs = []
+
+    def transcode(source, output_path, **kwargs):
+        runs.append(kwargs)
+        output_path.write_bytes(b"proxy-video")
+        return output_path
+
+    monkeypatch.setattr(editing_proxy, "transcode_proxy", transcode)
+    return runs
+
+
+class TestGenerateProxy:
+    """Tests for storing proxies as derived artifacts."""
+
+    def test_transcodes_once_with_configured_settings(self, store, fake_transcode, tmp_path):
+        """Test a proxy is transcoded once per content and settings."""
+        source = tmp_path / "video.mov"
+        source.write_bytes(b"video")
+        params = {"height": 540, "gop_frames": 1, "crf": 30}
+
+        first = generate_proxy(store, CONTENT_HASH, source, params)
+        second = generate_proxy(store, CONTENT_HASH, source, params)
+
+        assert first == second
+        assert first.suffix == ".mp4"
+        assert fake_transcode == [{"height": 540, "gop_frames": 1, "crf": 30}]
+
+
+class TestProxyStreaming:
+    """Tests for streaming the proxy to the editor."""
+
+    def test_variant_proxy_falls_back_to_original(
+        self,
+        client: TestClient,
+        db_session,
+        test_user,
+        test_project,
+        store,
+        storage,
+        fake_transcode,
+        tmp_path,
+        monkeypatch,
+    ):
+        """Test variant=proxy streams the proxy once it exists and the original before."""
+        monkeypatch.setattr(media_module, "get_artifact_store", lambda: store)
+        monkeypatch.setattr(media_module, "get_storage_service", lambda: storage)
+        storage.save_file(io.BytesIO(b"original-video"), "clip.mov")
+        media_file = MediaFile(
+            id=uuid4(),
+            project_id=test_project.id,
+            original_filename="clip.mov",
+            stored_filename="clip.mov",
+            file_path="clip.mov",
+            file_size=14,
+            mime_type="video/quicktime",
+            content_hash=CONTENT_HASH,
+        )
+        db_session.add(media_file)
+        db_session.commit()
+        url = f"/api/v1/media/{media_file.id}/stream"
+        params = {"token": create_access_token(subject=str(test_user.id)), "variant": "proxy"}
+
+        response = client.get(url, params=params)
+        assert response.content == b"original-video"
+        assert response.headers["x-media-variant"] == "original"
+
+        source = tmp_path / "video.mov"
+        source.write_bytes(b"video")
+        generate_proxy(store, CONTENT_HASH, source, proxy_params())
+
+        response = client.get(url, params=params)
+        assert response.content == b"proxy-video"
+        assert response.headers["content-type"] == "video/mp4"
+        assert response.headers["x-media-variant"] == "proxy"
+
+        ranged = client.get(url, params=params, headers={"Range": "bytes=0-4"})
+        assert ranged.status_code == 206
+        assert ranged.content == b"proxy"
+
+        original = client.get(url, params={"token": params["token"]})
+        assert original.content == b"original-video"
+
+    def test_upload_queues_proxy_only_when_enabled(
+        self, client: TestClient, auth_headers, test_project, tmp_path, monkeypatch
+    ):
+        """Test the proxy job is optional and queued after upload when enabled."""
+        monkeypatch.setattr(
+            media_module.get_storage_service(),
+            "backend",
+            LocalStorageBackend(str(tmp_path / "storage")),
+        )
+        monkeypatch.setattr(media_module, "get_media_duration", lambda path: None)
+        monkeypatch.setattr(media_module.settings, "hls_enabled", False)
+        monkeypatch.setattr(generate_media_previews, "delay", lambda media_id: None)
+        monkeypatch.setattr(package_media_hls, "delay", lambda media_id: None)
+        queued = []
+        monkeypatch.setattr(generate_editing_proxy, "delay", queued.append)
+
+        ids = []
+        for enabled in (False, True):
+            monkeypatch.setattr(media_module.settings, "proxy_enabled", enabled)
+            response = client.post(
+                f"/api/v1/media/projects/{test_project.id}/upload",
+                headers=auth_headers,
+                files={"file": ("clip.mp4", MP4_CONTENT, "video/mp4")},
+            )
+            assert response.status_code == 201
+            ids.append(response.json()["id"])
+
+        assert queued == [ids[1]]
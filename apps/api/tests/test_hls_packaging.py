@@ -0,0 +1,188 @@
+"""Tests for HLS packaging and playback endpoints."""
+
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.api.v1 import media as media_module
+from app.models.media import MediaFile
+from app.services import hls_packager
+from app.services.artifact_store import HLS_PACKAGE, DerivedArtifactStore
+from app.services.hls_packager import hls_params, package_media, plan_renditions, sign_playlist
+from app.services.storage_service import LocalStorageBackend, StorageService
+
+CONTENT_HASH = "ef" * 32
+MASTER = """#EXTM3U
+#EXT-X-VERSION:7
+#EXT-X-STREAM-INF:BANDWIDTH=950000,RESOLUTION=640x360
+360p/index.m3u8
+"""
+VARIANT = """#EXTM3U
+#EXT-X-PLAYLIST-TYPE:VOD
+#EXT-X-MAP:URI="init.mp4"
+#EXTINF:4.000000,
+segment_00000.m4s
+#EXT-X-ENDLIST
+"""
+
+
+@pytest.fixture
+def storage(tmp_path) -> StorageService:
+    """Storage service backed by a temporary directory."""
+    service = StorageService.__new__(StorageService)
+    service.backend = LocalStorageBackend(str(tmp_path / "storage"))
+    return service
+
+
+@pytest.fixture
+def store(storage, db_engine, tmp_path) -> DerivedArtifactStore:
+    """Artifact store on the test database."""
+    return DerivedArtifactStore(
+        storage=storage,
+        max_bytes=1024 * 1024,
+        lock_dir=str(tmp_path / "locks"),
+        session_factory=sessionmaker(bind=db_engine),
+    )
+
+
+@pytest.fixture
+def fake_packager(monkeypatch):
+    """Replace ffprobe and the ffmpeg packaging pass; records each run."""
+    runs = []
+
+    def package(source, output_dir, renditions, segment_seconds, has_audio):
+        runs.append((renditions, segment_seconds, has_audio))
+        (output_dir / "360p").mkdir()
+        (output_dir / "master.m3u8").write_text(MASTER)
+        (output_dir / "360p" / "index.m3u8").write_text(VARIANT)
+        (output_dir / "360p" / "init.mp4").write_bytes(b"init")
+        (output_dir / "360p" / "segment_00000.m4s").write_bytes(b"segment")
+        return output_dir / "master.m3u8"
+
+    info = {
+        "streams": [
+            {"codec_type": "video", "width": 1920, "height": 1080},
+            {"codec_type": "audio"},
+        ]
+    }
+    monkeypatch.setattr(hls_packager, "get_media_info", lambda path: info)
+    monkeypatch.setattr(hls_packager, "package_hls", package)
+    return runs
+
+
+class TestLadder:
+    """Tests for rendition planning and playlist signing."""
+
+    def test_renditions_never_upscale(self):
+        """Test renditions above the source height are dropped but one is always kept."""
+        assert [r["height"] for r in plan_renditions(1080, [720, 360])] == [360, 720]
+        assert [r["height"] for r in plan_renditions(480, [360, 720])] == [360]
+        assert [r["height"] for r in plan_renditions(240, [360, 720])] == [360]
+        assert plan_renditions(720, [720])[0]["video_bitrate"] == "2800k"
+
+    def test_sign_playlist_adds_token_to_every_uri(self):
+        """Test variant, init segment and media segment URIs all carry the token."""
+        signed = sign_playlist(VARIANT, "abc").splitlines()
+
+        assert '#EXT-X-MAP:URI="init.mp4?token=abc"' in signed
+        assert "segment_00000.m4s?token=abc" in signed
+        assert "#EXTINF:4.000000," in signed
+        assert "360p/index.m3u8?token=abc" in sign_playlist(MASTER, "abc").splitlines()
+
+
+class TestDirectoryArtifacts:
+    """Tests for storing an HLS package as one directory artifact."""
+
+    def test_packages_once_and_evicts_whole_directory(
+        self, store, storage, fake_packager, tmp_path
+    ):
+        """Test a package is stored with its manifest, reused, and evicted as a whole."""
+        source = tmp_path / "video.mp4"
+        source.write_bytes(b"video")
+        params = {"heights": [360, 720], "segment_seconds": 4}
+
+        prefix = package_media(store, CONTENT_HASH, source, params)
+        again = package_media(store, CONTENT_HASH, source, params)
+
+        assert prefix == again
+        assert len(fake_packager) == 1
+        renditions, segment_seconds, has_audio = fake_packager[0]
+        assert [r["height"] for r in renditions] == [360, 720]
+        assert (segment_seconds, has_audio) == (4, True)
+        assert storage.get_file(prefix + "360p/segment_00000.m4s") == b"segment"
+        assert store.get_dir(CONTENT_HASH, HLS_PACKAGE, params) == prefix
+
+        store.max_bytes = 0
+        assert store.evict() == 1
+        assert storage.get_file(prefix + "360p/segment_00000.m4s") is None
+        assert storage.get_file(prefix + "manifest.json") is None
+
+
+class TestHlsEndpoints:
+    """Tests for signed playlist and segment delivery."""
+
+    def test_playback_flow(
+        self,
+        client: TestClient,
+        auth_headers,
+        db_session,
+        test_project,
+        store,
+        storage,
+        fake_packager,
+        tmp_path,
+        monkeypatch,
+    ):
+        """Test the playlist URL is signed and its token unlocks only this media's package."""
+        monkeypatch.setattr(media_module, "get_artifact_store", lambda: store)
+        monkeypatch.setattr(media_module, "get_storage_service", lambda: storage)
+        media_file = MediaFile(
+            id=uuid4(),
+            project_id=test_project.id,
+            original_filename="clip.mov",
+            stored_filename="clip.mov",
+            file_path="clip.mov",
+            file_size=5,
+            mime_type="video/quicktime",
+            content_hash=CONTENT_HASH,
+        )
+        db_session.add(media_file)
+        db_session.commit()
+        media_id = media_file.id
+
+        response = client.get(f"/api/v1/media/{media_id}/hls", headers=auth_headers)
+        assert response.status_code == 404
+        assert response.json()["detail"]["code"] == "HLS_NOT_READY"
+
+        source = tmp_path / "video.mov"
+        source.write_bytes(b"video")
+        package_media(store, CONTENT_HASH, source, hls_params())
+
+        response = client.get(f"/api/v1/media/{media_id}/hls", headers=auth_headers)
+        assert response.status_code == 200
+        playlist_url = response.json()["playlist_url"]
+        token = playlist_url.split("token=")[1]
+
+        master = client.get(playlist_url)
+        assert master.status_code == 200
+        assert master.headers["content-type"] == "application/vnd.apple.mpegurl"
+        assert f"360p/index.m3u8?token={token}" in master.text
+
+        variant = client.get(f"/api/v1/media/{media_id}/hls/360p/index.m3u8?token={token}")
+        assert f'URI="init.mp4?token={token}"' in variant.text
+
+        segment = client.get(
+            f"/api/v1/media/{media_id}/hls/360p/segment_00000.m4s", params={"token": token}
+        )
+        assert segment.status_code == 200
+        assert segment.content == b"segment"
+        assert "immutable" in segment.headers["cache-control"]
+
+        other = client.get(f"/api/v1/media/{uuid4()}/hls/master.m3u8", params={"token": token})
+        assert other.status_code == 401
+        escape = client.get(
+            f"/api/v1/media/{media_id}/hls/..%2Fmanifest.json", params={"token": token}
+        )
+        assert escape.status_code == 404
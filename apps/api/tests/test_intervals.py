@@ -0,0 +1,48 @@
+"""Tests for the interval index."""
+
+import random
+
+import pytest
+
+from app.utils.intervals import IntervalIndex
+
+
+def _random_intervals(rng: random.Random, count: int, well_formed: bool = True) -> list:
+    intervals = []
+    for _ in range(count):
+        start = rng.randint(0, 1000)
+        length = rng.randint(0, 80) if well_formed else rng.randint(-40, 80)
+        intervals.append((start, start + length))
+    return intervals
+
+
+class TestIntervalIndex:
+    """Randomized equivalence checks against brute-force scans."""
+
+    @pytest.mark.parametrize("seed", range(20))
+    @pytest.mark.parametrize("well_formed", [True, False])
+    def test_matches_brute_force(self, seed, well_formed):
+        """Test overlap and containment queries match a linear scan."""
+        rng = random.Random(seed)
+        intervals = _random_intervals(rng, rng.randint(0, 60), well_formed)
+        index = IntervalIndex(intervals, key=lambda interval: interval)
+
+        for _ in range(50):
+            start = rng.randint(-50, 1050)
+            end = start + rng.randint(0, 200)
+
+            assert index.overlapping(start, end) == [
+                (s, e) for s, e in intervals if s < end and e > start
+            ]
+            assert index.contained(start, end) == sorted(
+                [(s, e) for s, e in intervals if s >= start and e <= end],
+                key=lambda interval: interval[0],
+            )
+
+    def test_overlapping_keeps_insertion_order(self):
+        """Test overlap results come back in the order items were given."""
+        items = [("b", 50, 90), ("a", 10, 60), ("c", 0, 100)]
+        index = IntervalIndex(items, key=lambda item: (item[1], item[2]))
+
+        assert [item[0] for item in index.overlapping(55, 58)] == ["b", "a", "c"]
+        assert [item[0] for item in index.contained(0, 95)] == ["a", "b"]
@@ -0,0 +1,135 @@
+"""Tests for content-addressed media storage."""
+
+import hashlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.v1 import media as media_module
+from app.services.media_blobs import (
+    ContentHasher,
+    blob_filename,
+    blob_lock_queries,
+    dedup_requests_total,
+    release_blobs,
+)
+from app.services.storage_service import LocalStorageBackend, get_storage_service
+
+CONTENT = b"ID3" + bytes(range(256)) * 16
+
+
+class _RecordingStorage:
+    """Records deleted paths."""
+
+    def __init__(self):
+        self.deleted = []
+
+    def delete_files(self, paths):
+        self.deleted.extend(paths)
+        return len(paths)
+
+
+def _upload(client: TestClient, auth_headers, project_id, filename="song.mp3") -> dict:
+    response = client.post(
+        f"/api/v1/media/projects/{project_id}/upload",
+        headers=auth_headers,
+        files={"file": (filename, CONTENT, "audio/mpeg")},
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def _create_project(client: TestClient, auth_headers, name: str) -> str:
+    response = client.post("/api/v1/projects", headers=auth_headers, json={"name": name})
+    return response.json()["id"]
+
+
+class TestBlobHelpers:
+    """Tests for hashing, keys and reference release."""
+
+    def test_hasher_and_blob_filename(self):
+        """Test chunked hashing matches SHA-256 and keys keep the extension."""
+        hasher = ContentHasher()
+        hasher.update(CONTENT[:10])
+        hasher.update(CONTENT[10:])
+        digest = hashlib.sha256(CONTENT).hexdigest()
+
+        assert hasher.hexdigest() == digest
+        assert hasher.size == len(CONTENT)
+        assert hasher.header == CONTENT[:32]
+        assert blob_filename(digest, "Song.MP3") == f"blobs/{digest[:2]}/{digest[2:4]}/{digest}.mp3"
+
+    def test_release_skips_referenced_and_shared_blobs(self):
+        """Test only unreferenced blobs are deleted, each once."""
+        storage = _RecordingStorage()
+        released = [("a", "/data/a"), ("a", "/data/a"), ("b", "/data/b")]
+
+        deleted = release_blobs(storage, released, referenced={"b"})
+
+        assert deleted == 1
+        assert storage.deleted == ["/data/a"]
+
+    def test_blob_locks_only_on_postgresql(self):
+        """Test each key is locked once, in sorted order, and only on PostgreSQL."""
+        queries = blob_lock_queries("postgresql", ["b", "a", "b"])
+
+        assert [q.compile().params for q in queries] == [
+            {"hashtext_1": "a"},
+            {"hashtext_1": "b"},
+        ]
+        assert blob_lock_queries("sqlite", ["a"]) == []
+
+
+class TestDeduplicatedUploads:
+    """Tests for upload deduplication and reference-counted deletes."""
+
+    def test_identical_uploads_share_one_blob(
+        self, client: TestClient, auth_headers, tmp_path, monkeypatch
+    ):
+        """Test the same content uploaded to two projects is stored once."""
+        storage_dir = tmp_path / "storage"
+        monkeypatch.setattr(get_storage_service(), "backend", LocalStorageBackend(str(storage_dir)))
+        monkeypatch.setattr(media_module, "get_media_duration", lambda path: 12.5)
+        first_project = _create_project(client, auth_headers, "First")
+        second_project = _create_project(client, auth_headers, "Second")
+        hits = dedup_requests_total.value(result="hit")
+
+        first = _upload(client, auth_headers, first_project)
+        second = _upload(client, auth_headers, second_project)
+
+        assert first["stored_filename"] == second["stored_filename"]
+        assert first["content_hash"] == hashlib.sha256(CONTENT).hexdigest()
+        assert second["duration_seconds"] == 12.5
+        assert dedup_requests_total.value(result="hit") == hits + 1
+        assert len(list((storage_dir / "blobs").rglob("*.mp3"))) == 1
+
+    def test_blob_deleted_with_last_reference(
+        self, client: TestClient, auth_headers, db_session, tmp_path, monkeypatch
+    ):
+        """Test deleting a project keeps blobs that another project still uses."""
+        pytest.importorskip("torch")
+        from app.tasks import analysis_tasks
+
+        storage_dir = tmp_path / "storage"
+        monkeypatch.setattr(get_storage_service(), "backend", LocalStorageBackend(str(storage_dir)))
+        monkeypatch.setattr(media_module, "get_media_duration", lambda path: None)
+        # Run the deletion task inline against the test database
+        monkeypatch.setattr(analysis_tasks, "get_db", lambda: db_session)
+        monkeypatch.setattr(
+            analysis_tasks.delete_project_files,
+            "delay",
+            lambda project_id: analysis_tasks.delete_project_files.apply(args=(project_id,)).get(),
+        )
+        first_project = _create_project(client, auth_headers, "First")
+        second_project = _create_project(client, auth_headers, "Second")
+        media = _upload(client, auth_headers, first_project)
+        _upload(client, auth_headers, second_project)
+        blob = storage_dir / media["stored_filename"]
+
+        response = client.delete(f"/api/v1/projects/{first_project}", headers=auth_headers)
+        assert response.status_code == 202
+        assert blob.exists()
+
+        response = client.delete(f"/api/v1/projects/{second_project}", headers=auth_headers)
+        assert response.status_code == 202
+        assert not blob.exists()
@@ -0,0 +1,244 @@
+"""Tests for batched expired media cleanup."""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from botocore.exceptions import ClientError
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from app.models.analysis import AnalysisResult, ProcessingMode
+from app.models.derived_artifact import DerivedArtifact
+from app.models.media import MediaFile
+from app.models.project import Project, ProjectStatus
+from app.services.artifact_store import WAVEFORM, DerivedArtifactStore, source_hash
+from app.services import media_cleanup
+from app.services.media_cleanup import delete_expired_media, delete_project_data
+from app.services.storage_service import LocalStorageBackend, S3StorageBackend, StorageService
+
+NOW = datetime(2026, 10, 19, 12, 0, 0, tzinfo=timezone.utc)
+
+
+class _BatchStorage:
+    """Records each bulk delete request."""
+
+    def __init__(self):
+        self.batches = []
+
+    def delete_files(self, paths):
+        self.batches.append(list(paths))
+        return len(paths)
+
+
+class _FakeS3Client:
+    """Records DeleteObjects requests and fails one key."""
+
+    def __init__(self, fail_request: int = -1):
+        self.requests = []
+        self.fail_request = fail_request
+
+    def delete_objects(self, Bucket, Delete):
+        keys = [obj["Key"] for obj in Delete["Objects"]]
+        self.requests.append(keys)
+        if len(self.requests) - 1 == self.fail_request:
+            raise ClientError({"Error": {"Code": "SlowDown"}}, "DeleteObjects")
+        errors = [{"Key": key, "Code": "AccessDenied"} for key in keys if key == "locked"]
+        return {"Errors": errors}
+
+
+def _media(project_id, stored_filename: str, age_days: int) -> MediaFile:
+    return MediaFile(
+        id=uuid4(),
+        project_id=project_id,
+        original_filename="clip.mp4",
+        stored_filename=stored_filename,
+        file_path=f"/data/{stored_filename}",
+        file_size=1,
+        mime_type="video/mp4",
+        created_at=NOW - timedelta(days=age_days),
+    )
+
+
+class TestDeleteExpiredMedia:
+    """Tests for keyset-batched cleanup."""
+
+    def test_deletes_in_batches_and_keeps_shared_blobs(self, db_session, test_project):
+        """Test expired rows go in batches and blobs still referenced are kept."""
+        for i in range(4):
+            db_session.add(_media(test_project.id, f"old-{i}", age_days=40 + i))
+        db_session.add(_media(test_project.id, "shared", age_days=45))
+        db_session.add(_media(test_project.id, "shared", age_days=1))
+        db_session.commit()
+        storage = _BatchStorage()
+
+        result = delete_expired_media(
+            db_session, storage, NOW - timedelta(days=30), batch_size=2
+        )
+
+        assert result.deleted_rows == 5
+        assert result.batches == 3
+        assert result.complete
+        assert all(len(batch) <= 2 for batch in storage.batches)
+        deleted = sorted(path for batch in storage.batches for path in batch)
+        assert deleted == [f"/data/old-{i}" for i in range(4)]
+
+        remaining = db_session.execute(select(MediaFile.stored_filename)).scalars().all()
+        assert remaining == ["shared"]
+
+    def test_purges_artifacts_of_unreferenced_content(
+        self, db_session, db_engine, test_project, tmp_path
+    ):
+        """Test artifacts go with the last media file of their content, not before."""
+        storage = StorageService.__new__(StorageService)
+        storage.backend = LocalStorageBackend(str(tmp_path / "storage"))
+        artifacts = DerivedArtifactStore(
+            storage=storage,
+            max_bytes=1024 * 1024,
+            lock_dir=str(tmp_path / "locks"),
+            session_factory=sessionmaker(bind=db_engine),
+        )
+        gone = _media(test_project.id, "gone", age_days=40)
+        gone.content_hash = "aa" * 32
+        shared_old = _media(test_project.id, "shared.mp4", age_days=40)
+        shared_new = _media(test_project.id, "shared.mov", age_days=1)
+        shared_old.content_hash = shared_new.content_hash = "bb" * 32
+        legacy = _media(test_project.id, "legacy", age_days=40)
+        db_session.add_all([gone, shared_old, shared_new, legacy])
+        db_session.commit()
+        keys = [source_hash(media) for media in (gone, shared_old, legacy)]
+        for key in keys:
+            artifacts.get_or_compute_json(key, WAVEFORM, {}, lambda: [1, 2, 3])
+        gone_key = artifacts.get_key(keys[0], WAVEFORM, {})
+
+        result = delete_expired_media(
+            db_session,
+            _BatchStorage(),
+            NOW - timedelta(days=30),
+            artifacts=artifacts,
+        )
+
+        assert result.deleted_rows == 3
+        assert result.deleted_artifacts == 2
+        remaining = db_session.execute(select(DerivedArtifact.content_hash)).scalars().all()
+        assert remaining == ["bb" * 32]
+        assert storage.get_file(gone_key) is None
+
+    def test_stops_at_time_budget(self, db_session, test_project):
+        """Test an exhausted time budget leaves the rest for the next run."""
+        db_session.add(_media(test_project.id, "old", age_days=40))
+        db_session.commit()
+
+        result = delete_expired_media(
+            db_session, _BatchStorage(), NOW - timedelta(days=30), time_budget_seconds=0
+        )
+
+        assert not result.complete
+        assert result.deleted_rows == 0
+        assert db_session.execute(select(MediaFile.id)).scalars().all() != []
+
+
+class TestDeleteProjectData:
+    """Tests for background project deletion."""
+
+    def test_deletes_media_checkpoints_thumbnail_and_project(
+        self, db_session, test_user, test_project
+    ):
+        """Test a project's files go in batches, then the project row and thumbnail."""
+        other = Project(user_id=test_user.id, name="Other")
+        db_session.add(other)
+        db_session.flush()
+        test_project.status = ProjectStatus.DELETING
+        test_project.thumbnail_path = "thumbnails/thumb.png"
+        for i in range(3):
+            db_session.add(_media(test_project.id, f"blob-{i}", age_days=1))
+        db_session.add(_media(test_project.id, "processed/render.mp4", age_days=1))
+        shared = _media(test_project.id, "shared", age_days=1)
+        db_session.add(shared)
+        db_session.add(_media(other.id, "shared", age_days=1))
+        db_session.flush()
+        db_session.add(
+            AnalysisResult(
+                media_file_id=shared.id,
+                processing_mode=ProcessingMode.VAD,
+                checkpoints={"audio": {"path": "checkpoints/a/audio.wav"}},
+            )
+        )
+        db_session.commit()
+        storage = _BatchStorage()
+        project_id, other_id = test_project.id, other.id
+
+        result = delete_project_data(db_session, storage, project_id, batch_size=2)
+
+        assert result.deleted_rows == 5
+        assert result.batches == 3
+        deleted = sorted(path for batch in storage.batches for path in batch)
+        assert deleted == sorted(
+            [f"/data/blob-{i}" for i in range(3)]
+            + [
+                "/data/processed/render.mp4",
+                "checkpoints/a/audio.wav",
+                "thumbnails/thumb.png",
+            ]
+        )
+        assert db_session.execute(select(Project.id)).scalars().all() == [other_id]
+        remaining = db_session.execute(select(MediaFile.project_id)).scalars().all()
+        assert remaining == [other_id]
+
+
+    def test_media_added_during_deletion_is_released(
+        self, db_session, test_project, monkeypatch
+    ):
+        """Test a file added after the batches is deleted before the project row."""
+        test_project.status = ProjectStatus.DELETING
+        db_session.add(_media(test_project.id, "first", age_days=1))
+        db_session.commit()
+        storage = _BatchStorage()
+        project_id = test_project.id
+        delete_batch = media_cleanup._delete_media_batch
+
+        def delete_then_upload(*args):
+            delete_batch(*args)
+            if not any("/data/late" in batch for batch in storage.batches):
+                db_session.add(_media(project_id, "late", age_days=0))
+                db_session.commit()
+
+        monkeypatch.setattr(media_cleanup, "_delete_media_batch", delete_then_upload)
+
+        result = delete_project_data(db_session, storage, project_id)
+
+        assert result.deleted_rows == 2
+        deleted = sorted(path for batch in storage.batches for path in batch)
+        assert deleted == ["/data/first", "/data/late"]
+        assert db_session.execute(select(Project.id)).scalars().all() == []
+
+
+class TestS3BulkDelete:
+    """Tests for batched S3 deletes."""
+
+    def test_delete_objects_batches_of_1000(self):
+        """Test keys are sent 1000 per request and failures are not counted."""
+        backend = S3StorageBackend.__new__(S3StorageBackend)
+        backend.bucket_name = "bucket"
+        backend.client = _FakeS3Client()
+        paths = [f"s3://bucket/blobs/{i}" for i in range(2499)] + ["locked"]
+
+        deleted = backend.delete_files(paths)
+
+        assert [len(keys) for keys in backend.client.requests] == [1000, 1000, 500]
+        assert backend.client.requests[0][0] == "blobs/0"
+        assert deleted == 2499
+
+    def test_failed_request_is_logged_and_skipped(self, caplog):
+        """Test a failed request is logged with its size and later batches still run."""
+        backend = S3StorageBackend.__new__(S3StorageBackend)
+        backend.bucket_name = "bucket"
+        backend.client = _FakeS3Client(fail_request=0)
+        paths = [f"blobs/{i}" for i in range(1500)]
+
+        with caplog.at_level(logging.WARNING):
+            deleted = backend.delete_files(paths)
+
+        assert deleted == 500
+        assert len(backend.client.requests) == 2
+        assert "batch of 1000 objects" in caplog.text
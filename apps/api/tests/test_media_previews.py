@@ -0,0 +1,292 @@
+"""Tests for video poster and sprite sheet previews."""
+
+import io
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.api.v1 import media as media_module
+from app.models.media import MediaFile
+from app.models.project import Project
+from app.services import media_previews
+from app.services.artifact_store import PREVIEW_POSTER, DerivedArtifactStore
+from app.services.media_previews import (
+    format_sprite_vtt,
+    generate_previews,
+    preview_params,
+    sprite_layout,
+    use_poster_as_thumbnail,
+)
+from app.services.storage_service import LocalStorageBackend, StorageService
+from app.tasks import media_tasks
+from app.tasks.media_tasks import generate_media_previews, package_media_hls
+from app.utils.security import create_access_token
+
+CONTENT_HASH = "cd" * 32
+PARAMS = {
+    "poster_width": 1280,
+    "tile_width": 160,
+    "columns": 10,
+    "rows": 10,
+    "min_interval": 1.0,
+}
+VIDEO_INFO = {
+    "format": {"duration": "300.0"},
+    "streams": [
+        {"codec_type": "audio"},
+        {"codec_type": "video", "width": 1920, "height": 1080},
+    ],
+}
+
+
+@pytest.fixture
+def storage(tmp_path) -> StorageService:
+    """Storage service backed by a temporary directory."""
+    service = StorageService.__new__(StorageService)
+    service.backend = LocalStorageBackend(str(tmp_path / "storage"))
+    return service
+
+
+@pytest.fixture
+def store(storage, db_engine, tmp_path) -> DerivedArtifactStore:
+    """Artifact store on the test database."""
+    return DerivedArtifactStore(
+        storage=storage,
+        max_bytes=1024 * 1024,
+        lock_dir=str(tmp_path / "locks"),
+        session_factory=sessionmaker(bind=db_engine),
+    )
+
+
+@pytest.fixture
+def fake_ffmpeg(monkeypatch):
+    """Replace ffprobe and the preview pass; records each render."""
+    renders = []
+
+    def render(source, poster_path, sprite_path, **kwargs):
+        renders.append(kwargs)
+        poster_path.write_bytes(b"poster")
+        sprite_path.write_bytes(b"sprite")
+
+    monkeypatch.setattr(media_previews, "get_media_info", lambda path: VIDEO_INFO)
+    monkeypatch.setattr(media_previews, "render_preview_images", render)
+    return renders
+
+
+class TestSpriteLayout:
+    """Tests for sprite sheet planning and its WebVTT index."""
+
+    def test_long_video_fills_the_grid(self):
+        """Test a long video is spread over every tile with even tile sizes."""
+        layout = sprite_layout(1000.0, 1920, 1080, PARAMS)
+
+        assert layout["tile_count"] == 100
+        assert layout["interval"] == 10.0
+        assert (layout["tile_width"], layout["tile_height"]) == (160, 90)
+        assert (layout["columns"], layout["rows"]) == (10, 10)
+
+    def test_short_video_gets_fewer_tiles(self):
+        """Test tiles are never closer than the minimum interval."""
+        layout = sprite_layout(4.5, 1280, 720, PARAMS)
+
+        assert layout["tile_count"] == 5
+        assert layout["interval"] == 1.0
+        assert (layout["columns"], layout["rows"]) == (5, 1)
+
+    def test_vtt_cues_point_at_tiles(self):
+        """Test each cue covers one interval and addresses its tile."""
+        layout = sprite_layout(115.0, 1920, 1080, {**PARAMS, "min_interval": 10.0})
+
+        vtt = format_sprite_vtt(layout, "sprite.jpg?token=t")
+        lines = vtt.splitlines()
+
+        assert lines[0] == "WEBVTT"
+        assert "00:00:10.000 --> 00:00:20.000" in lines
+        assert "sprite.jpg?token=t#xywh=160,0,160,90" in lines
+        # Twelve tiles wrap onto a second row; the last cue ends at the duration
+        assert lines[-2] == "00:01:50.000 --> 00:01:55.000"
+        assert lines[-1] == "sprite.jpg?token=t#xywh=160,90,160,90"
+
+
+class TestGeneratePreviews:
+    """Tests for storing previews as derived artifacts."""
+
+    def test_single_render_for_all_artifacts(self, store, fake_ffmpeg, tmp_path):
+        """Test one ffmpeg pass produces the poster, sprite and layout, then is reused."""
+        source = tmp_path / "video.mp4"
+        source.write_bytes(b"video")
+
+        layout = generate_previews(store, CONTENT_HASH, source, PARAMS)
+        again = generate_previews(store, CONTENT_HASH, source, PARAMS)
+
+        assert layout == again
+        assert layout["tile_count"] == 100
+        assert len(fake_ffmpeg) == 1
+        assert fake_ffmpeg[0]["poster_time"] == 30.0
+        assert fake_ffmpeg[0]["grid"] == (10, 10)
+        assert store.get_file(CONTENT_HASH, PREVIEW_POSTER, PARAMS).read_bytes() == b"poster"
+
+    def test_audio_only_file_is_unavailable(self, store, monkeypatch, tmp_path):
+        """Test files without a video stream raise PreviewUnavailableError."""
+        info = {"format": {"duration": "10"}, "streams": [{"codec_type": "audio"}]}
+        monkeypatch.setattr(media_previews, "get_media_info", lambda path: info)
+
+        with pytest.raises(media_previews.PreviewUnavailableError):
+            generate_previews(store, CONTENT_HASH, tmp_path / "song.mp3", PARAMS)
+
+    def test_poster_becomes_missing_thumbnail(self, db_session, storage, test_project, tmp_path):
+        """Test the poster is copied to a project without a thumbnail only once."""
+        poster = tmp_path / "poster.jpg"
+        poster.write_bytes(b"poster")
+        project_id = test_project.id
+
+        first = use_poster_as_thumbnail(db_session, storage, project_id, poster)
+        second = use_poster_as_thumbnail(db_session, storage, project_id, poster)
+
+        assert first.startswith(f"thumbnails/{project_id}_")
+        assert second is None
+        assert db_session.get(Project, project_id).thumbnail_path == first
+        assert storage.get_file(first) == b"poster"
+
+
+class TestPreviewTask:
+    """Tests for the preview generation task."""
+
+    def test_renders_without_holding_a_session(
+        self, db_session, db_engine, storage, store, fake_ffmpeg, test_project, monkeypatch
+    ):
+        """Test the task closes its session before rendering and sets the thumbnail after."""
+        storage.save_file(io.BytesIO(b"video"), "clip.mp4")
+        media_file = MediaFile(
+            id=uuid4(),
+            project_id=test_project.id,
+            original_filename="clip.mp4",
+            stored_filename="clip.mp4",
+            file_path="clip.mp4",
+            file_size=5,
+            mime_type="video/mp4",
+            content_hash=CONTENT_HASH,
+        )
+        db_session.add(media_file)
+        db_session.commit()
+        sessions = []
+
+        def get_db():
+            sessions.append(sessionmaker(bind=db_engine)())
+            return sessions[-1]
+
+        def render(*args, **kwargs):
+            assert not sessions[0].in_transaction()
+            fake_render(*args, **kwargs)
+
+        fake_render = media_previews.render_preview_images
+        monkeypatch.setattr(media_previews, "render_preview_images", render)
+        monkeypatch.setattr(media_tasks, "get_db", get_db)
+        monkeypatch.setattr(media_tasks, "get_storage_service", lambda: storage)
+        monkeypatch.setattr(media_tasks, "get_artifact_store", lambda: store)
+
+        result = generate_media_previews.apply(args=(str(media_file.id),)).get()
+
+        assert result["generated"]
+        assert len(fake_ffmpeg) == 1
+        assert len(sessions) == 2
+        db_session.expire_all()
+        assert db_session.get(Project, test_project.id).thumbnail_path == result[
+            "project_thumbnail"
+        ]
+
+
+class TestPreviewEndpoints:
+    """Tests for serving previews and queueing their generation."""
+
+    def _video(self, db_session, test_project) -> MediaFile:
+        media_file = MediaFile(
+            id=uuid4(),
+            project_id=test_project.id,
+            original_filename="clip.mp4",
+            stored_filename="clip.mp4",
+            file_path="clip.mp4",
+            file_size=5,
+            mime_type="video/mp4",
+            content_hash=CONTENT_HASH,
+        )
+        db_session.add(media_file)
+        db_session.commit()
+        return media_file
+
+    def test_serves_cached_images_and_index(
+        self,
+        client: TestClient,
+        db_session,
+        test_user,
+        test_project,
+        store,
+        fake_ffmpeg,
+        tmp_path,
+        monkeypatch,
+    ):
+        """Test previews 404 until generated, then carry long-lived cache headers."""
+        monkeypatch.setattr(media_module, "get_artifact_store", lambda: store)
+        media_id = self._video(db_session, test_project).id
+        token = create_access_token(subject=str(test_user.id))
+        base = f"/api/v1/media/{media_id}/preview"
+
+        response = client.get(f"{base}/sprite.jpg", params={"token": token})
+        assert response.status_code == 404
+        assert response.json()["detail"]["code"] == "PREVIEW_NOT_READY"
+
+        source = tmp_path / "video.mp4"
+        source.write_bytes(b"video")
+        generate_previews(store, CONTENT_HASH, source, preview_params())
+
+        response = client.get(f"{base}/sprite.jpg", params={"token": token})
+        assert response.status_code == 200
+        assert response.content == b"sprite"
+        assert "immutable" in response.headers["cache-control"]
+
+        cached = client.get(
+            f"{base}/sprite.jpg",
+            params={"token": token},
+            headers={"If-None-Match": response.headers["etag"]},
+        )
+        assert cached.status_code == 304
+
+        response = client.get(f"{base}/sprite.vtt", params={"token": token})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/vtt")
+        assert f"sprite.jpg?token={token}#xywh=0,0,160,90" in response.text
+
+        assert client.get(f"{base}/poster.jpg").status_code == 401
+
+    def test_video_upload_queues_previews(
+        self, client: TestClient, auth_headers, test_project, tmp_path, monkeypatch
+    ):
+        """Test uploading a video queues previews and HLS packaging; audio does not."""
+        monkeypatch.setattr(
+            media_module.get_storage_service(),
+            "backend",
+            LocalStorageBackend(str(tmp_path / "storage")),
+        )
+        monkeypatch.setattr(media_module, "get_media_duration", lambda path: None)
+        monkeypatch.setattr(media_module.settings, "hls_enabled", True)
+        queued = []
+        monkeypatch.setattr(generate_media_previews, "delay", queued.append)
+        monkeypatch.setattr(package_media_hls, "delay", queued.append)
+
+        uploads = [
+            ("clip.mp4", b"\x00\x00\x00\x18ftypmp42" + bytes(64), "video/mp4"),
+            ("song.mp3", b"ID3" + bytes(64), "audio/mpeg"),
+        ]
+        ids = []
+        for filename, content, mime_type in uploads:
+            response = client.post(
+                f"/api/v1/media/projects/{test_project.id}/upload",
+                headers=auth_headers,
+                files={"file": (filename, content, mime_type)},
+            )
+            assert response.status_code == 201
+            ids.append(response.json()["id"])
+
+        assert queued == [ids[0], ids[0]]
@@ -1,8 +1,13 @@
 """Tests for project endpoints."""
 
+from datetime import datetime, timedelta
+from uuid import uuid4
+
 import pytest
 from fastapi.testclient import TestClient
 
+from app.services.storage_service import LocalStorageBackend, get_storage_service
+
 
 class TestListProjects:
     """Tests for listing projects."""
@@ -36,6 +41,48 @@ class TestListProjects:
         assert data["pagination"]["page"] == 1
         assert data["pagination"]["limit"] == 10
 
+    def test_list_projects_cursor_pagination(
+        self, client: TestClient, auth_headers, db_session, test_user
+    ):
+        """Test walking the project list with next_cursor, including tied timestamps."""
+        from app.models.project import Project
+
+        base = datetime(2026, 1, 1, 12, 0, 0)
+        for i in range(5):
+            db_session.add(
+                Project(
+                    id=uuid4(),
+                    user_id=test_user.id,
+                    name=f"Project {i}",
+                    created_at=base + timedelta(minutes=i // 2),
+                )
+            )
+        db_session.commit()
+
+        seen = []
+        params = {"limit": 2, "total": "none"}
+        for _ in range(5):
+            response = client.get("/api/v1/projects", headers=auth_headers, params=params)
+            assert response.status_code == 200
+            data = response.json()
+            assert data["pagination"]["total"] is None
+            seen.extend(p["id"] for p in data["projects"])
+            if not data["pagination"]["next_cursor"]:
+                break
+            params["cursor"] = data["pagination"]["next_cursor"]
+
+        assert len(seen) == 5
+        assert len(set(seen)) == 5
+
+    def test_list_projects_invalid_cursor(self, client: TestClient, auth_headers):
+        """Test listing projects with a malformed cursor."""
+        response = client.get(
+            "/api/v1/projects",
+            headers=auth_headers,
+            params={"cursor": "not-a-cursor"},
+        )
+        assert response.status_code == 400
+
     def test_list_projects_unauthorized(self, client: TestClient):
         """Test listing projects without auth."""
         response = client.get("/api/v1/projects")
@@ -95,6 +142,64 @@ class TestGetProject:
         assert data["id"] == str(test_project.id)
         assert data["name"] == test_project.name
 
+    def test_get_project_latest_analysis_summary(
+        self, client: TestClient, auth_headers, test_project, db_session
+    ):
+        """Test media files list only their latest analysis, with counts."""
+        from datetime import datetime, timedelta, timezone
+        from uuid import uuid4
+
+        from app.models.analysis import AnalysisResult, AnalysisStatus, ProcessingMode
+        from app.models.media import MediaFile
+        from app.services.segment_store import get_segment_store
+
+        media = MediaFile(
+            id=uuid4(),
+            project_id=test_project.id,
+            original_filename="test.mp4",
+            stored_filename="test_stored.mp4",
+            file_path="/tmp/test.mp4",
+            file_size=1000,
+            mime_type="video/mp4",
+        )
+        db_session.add(media)
+        now = datetime.now(timezone.utc)
+        older, latest = (
+            AnalysisResult(
+                id=uuid4(),
+                media_file_id=media.id,
+                processing_mode=ProcessingMode.VAD,
+                status=AnalysisStatus.COMPLETED,
+                transcription="long transcription text",
+                created_at=now - timedelta(minutes=minutes),
+            )
+            for minutes in (10, 1)
+        )
+        db_session.add_all([older, latest])
+        db_session.flush()
+        get_segment_store(db_session).replace(
+            latest.id,
+            [{"start_ms": 0, "end_ms": 1000, "type": "speech", "confidence": 0.9}],
+        )
+        db_session.commit()
+
+        response = client.get(
+            f"/api/v1/projects/{test_project.id}",
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        media_data = response.json()["media_files"][0]
+        assert media_data["analysis_count"] == 2
+        assert [a["id"] for a in media_data["analysis_results"]] == [str(latest.id)]
+        assert media_data["analysis_results"][0]["segment_count"] == 1
+
+        response = client.get(
+            f"/api/v1/projects/{test_project.id}",
+            headers=auth_headers,
+            params={"analyses": "all"},
+        )
+        assert len(response.json()["media_files"][0]["analysis_results"]) == 2
+
     def test_get_project_not_found(self, client: TestClient, auth_headers):
         """Test getting a nonexistent project."""
         from uuid import uuid4
@@ -134,13 +239,22 @@ class TestUpdateProject:
 class TestDeleteProject:
     """Tests for deleting projects."""
 
-    def test_delete_project_success(self, client: TestClient, auth_headers, test_project):
-        """Test deleting a project."""
+    def test_delete_project_success(
+        self, client: TestClient, auth_headers, test_project, monkeypatch
+    ):
+        """Test deleting a project hides it at once and queues the cleanup task."""
+        pytest.importorskip("torch")
+        from app.tasks.analysis_tasks import delete_project_files
+
+        queued = []
+        monkeypatch.setattr(delete_project_files, "delay", queued.append)
+
         response = client.delete(
             f"/api/v1/projects/{test_project.id}",
             headers=auth_headers,
         )
-        assert response.status_code == 200
+        assert response.status_code == 202
+        assert queued == [str(test_project.id)]
 
         # Verify deletion
         get_response = client.get(
@@ -148,6 +262,47 @@ class TestDeleteProject:
             headers=auth_headers,
         )
         assert get_response.status_code == 404
+        list_response = client.get("/api/v1/projects", headers=auth_headers)
+        assert list_response.json()["projects"] == []
+
+    def test_upload_rechecks_project_before_insert(
+        self, client: TestClient, auth_headers, db_session, test_project, tmp_path, monkeypatch
+    ):
+        """Test an upload to a project marked for deletion mid-upload is rejected and cleaned up."""
+        from app.api.v1 import media as media_module
+        from app.models.project import Project, ProjectStatus
+
+        storage_dir = tmp_path / "storage"
+        monkeypatch.setattr(get_storage_service(), "backend", LocalStorageBackend(str(storage_dir)))
+        project_id = test_project.id
+
+        def delete_meanwhile(path):
+            # The project is marked for deletion while the upload is stored
+            db_session.get(Project, project_id).status = ProjectStatus.DELETING
+            db_session.commit()
+            return None
+
+        monkeypatch.setattr(media_module, "get_media_duration", delete_meanwhile)
+
+        response = client.post(
+            f"/api/v1/media/projects/{project_id}/upload",
+            headers=auth_headers,
+            files={"file": ("song.mp3", b"ID3" + bytes(64), "audio/mpeg")},
+        )
+
+        assert response.status_code == 404
+        assert list(storage_dir.rglob("*.mp3")) == []
+
+    def test_delete_project_cannot_be_set_by_update(
+        self, client: TestClient, auth_headers, test_project
+    ):
+        """Test the deleting status is rejected by PATCH."""
+        response = client.patch(
+            f"/api/v1/projects/{test_project.id}",
+            headers=auth_headers,
+            json={"status": "deleting"},
+        )
+        assert response.status_code == 422
 
     def test_delete_project_not_found(self, client: TestClient, auth_headers):
         """Test deleting a nonexistent project."""
@@ -158,3 +313,28 @@ class TestDeleteProject:
             headers=auth_headers,
         )
         assert response.status_code == 404
+
+
+class TestProjectThumbnail:
+    """Tests for project thumbnail upload and download."""
+
+    def test_thumbnail_round_trip(
+        self, client: TestClient, auth_headers, test_project, tmp_path, monkeypatch
+    ):
+        """Test an uploaded thumbnail is streamed back with its content type."""
+        monkeypatch.setattr(get_storage_service(), "backend", LocalStorageBackend(str(tmp_path)))
+        image = b"\x89PNG\r\n\x1a\n" + b"\x00" * 512
+
+        response = client.post(
+            f"/api/v1/projects/{test_project.id}/thumbnail",
+            headers=auth_headers,
+            files={"file": ("cover.png", image, "image/png")},
+        )
+        assert response.status_code == 200
+        assert response.json()["thumbnail_url"].endswith("/thumbnail")
+
+        response = client.get(f"/api/v1/projects/{test_project.id}/thumbnail", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/png"
+        assert response.headers["content-length"] == str(len(image))
+        assert response.content == image
@@ -0,0 +1,73 @@
+"""Query-plan checks for listing and foreign key indexes."""
+
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+
+from app.models.analysis import AnalysisResult
+from app.models.media import MediaFile
+from app.models.project import Project
+
+
+def _explain(db: Session, stmt) -> str:
+    """Return the query plan for a statement as text."""
+    bind = db.get_bind()
+    compiled = stmt.compile(dialect=bind.dialect)
+    params = {
+        key: str(value) if isinstance(value, uuid.UUID) else value
+        for key, value in compiled.params.items()
+    }
+
+    if bind.dialect.name == "sqlite":
+        sql = f"EXPLAIN QUERY PLAN {compiled}"
+        args = tuple(params[key] for key in compiled.positiontup)
+    else:
+        # Tiny test tables would otherwise always be scanned sequentially
+        db.connection().exec_driver_sql("SET LOCAL enable_seqscan = off")
+        sql = f"EXPLAIN {compiled}"
+        args = params
+
+    rows = db.connection().exec_driver_sql(sql, args).all()
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+class TestQueryPlans:
+    """Guard that hot queries keep using their indexes."""
+
+    def test_project_listing_uses_user_created_index(self, db_session: Session):
+        """Test keyset listing seeks the composite index without sorting."""
+        stmt = (
+            select(Project)
+            .where(
+                Project.user_id == uuid.uuid4(),
+                tuple_(Project.created_at, Project.id)
+                < tuple_(datetime.now(timezone.utc), uuid.uuid4()),
+            )
+            .order_by(Project.created_at.desc(), Project.id.desc())
+            .limit(21)
+        )
+
+        plan = _explain(db_session, stmt)
+
+        assert "ix_projects_user_id_created_at" in plan
+        assert "TEMP B-TREE" not in plan
+        assert "Sort" not in plan
+
+    def test_media_by_project_uses_index(self, db_session: Session):
+        """Test media files are looked up by project through an index."""
+        stmt = select(MediaFile).where(MediaFile.project_id == uuid.uuid4())
+
+        assert "ix_media_files_project_id" in _explain(db_session, stmt)
+
+    def test_latest_analysis_uses_index(self, db_session: Session):
+        """Test analyses are looked up by media file through an index."""
+        stmt = (
+            select(AnalysisResult)
+            .where(AnalysisResult.media_file_id == uuid.uuid4())
+            .order_by(AnalysisResult.created_at.desc())
+            .limit(1)
+        )
+
+        assert "ix_analysis_results_media_file_id_created_at" in _explain(db_session, stmt)
@@ -0,0 +1,86 @@
+"""Tests for managed scratch space."""
+
+import os
+import time
+
+import pytest
+
+from app.services.scratch_space import (
+    NAMESPACE,
+    ScratchManager,
+    ScratchQuotaExceededError,
+)
+
+
+@pytest.fixture
+def manager(tmp_path) -> ScratchManager:
+    """Scratch manager with separate memory and disk roots in a temp directory."""
+    return ScratchManager(root=tmp_path / "memory", disk_root=tmp_path / "disk", quota_bytes=100)
+
+
+class TestScratchManager:
+    """Tests for per-job scratch directories."""
+
+    def test_job_directory_removed_on_exit(self, manager):
+        """Test a job gets a private directory that is removed afterwards."""
+        with manager.job("extract audio") as first, manager.job("extract audio") as second:
+            first.file("audio.wav").write_bytes(b"pcm")
+            assert first.path != second.path
+            assert first.path.parent == manager.root
+            assert first.path.name.startswith(f"extract_audio-{os.getpid()}-")
+            assert manager.active_jobs == 2
+
+        assert not first.path.exists()
+        assert not second.path.exists()
+        assert manager.active_jobs == 0
+
+    def test_job_directory_removed_on_error(self, manager):
+        """Test the directory is removed when the job fails."""
+        with pytest.raises(RuntimeError):
+            with manager.job("render") as scratch:
+                scratch.file("out.mp4").write_bytes(b"partial")
+                raise RuntimeError("ffmpeg failed")
+
+        assert list(manager.root.iterdir()) == []
+
+    def test_quota(self, manager):
+        """Test exceeding the job quota raises."""
+        with manager.job("chunks") as scratch:
+            scratch.file("a.ogg").write_bytes(b"x" * 60)
+            scratch.check_quota()
+            scratch.file("b.ogg").write_bytes(b"x" * 60)
+            with pytest.raises(ScratchQuotaExceededError):
+                scratch.check_quota()
+
+    def test_large_jobs_fall_back_to_disk(self, manager):
+        """Test jobs that would not fit in the memory root go to the disk root."""
+        with manager.job("render", expected_bytes=10**18) as scratch:
+            assert scratch.path.parent == manager.disk_root
+        with manager.job("render", expected_bytes=1) as scratch:
+            assert scratch.path.parent == manager.root
+
+    def test_sweep_only_removes_stale_dirs_of_exited_processes(self, manager, tmp_path):
+        """Test the sweep reclaims dead jobs' directories and nothing else."""
+        old = time.time() - 7200
+        dead = manager.root / "render-999999999-0123abcd"
+        live = manager.root / f"render-{os.getpid()}-0123abcd"
+        recent = manager.disk_root / "render-999999999-4567cdef"
+        outside = tmp_path / "tmp-unrelated"
+        for path in (dead, live, recent, outside):
+            path.mkdir()
+        for path in (dead, live, outside):
+            os.utime(path, (old, old))
+
+        assert manager.sweep_stale(max_age_seconds=3600) == 1
+
+        assert not dead.exists()
+        assert live.exists()
+        assert recent.exists()
+        assert outside.exists()
+        assert manager.root.name == NAMESPACE
+
+    def test_unmanaged_directory_is_swept_after_exit(self, manager):
+        """Test mkdtemp directories are named so the sweep can reclaim them."""
+        path = manager.mkdtemp("extract-audio-")
+        assert path.parent == manager.root
+        assert path.name.startswith(f"extract-audio-{os.getpid()}-")
@@ -0,0 +1,243 @@
+"""Tests for segment post-processing."""
+
+import random
+
+import pytest
+
+from app.services.segment_processor import (
+    SegmentProcessor,
+    SegmentTable,
+    apply_classification_overrides,
+    diff_segments,
+)
+
+
+def _reference_process(segments, total_duration_ms, processor):
+    """Row-by-row pipeline the columnar implementation must reproduce."""
+    rows = [
+        {
+            "start_ms": s.get("start_ms", 0),
+            "end_ms": s.get("end_ms", 0),
+            "type": s.get("type", "speech"),
+            "confidence": s.get("confidence", 0.0),
+            "text": s.get("text"),
+            "filler_word": s.get("filler_word"),
+        }
+        for s in segments
+    ]
+
+    rows = [
+        r
+        for r in rows
+        if not (
+            r["type"] == "silence"
+            and r["end_ms"] - r["start_ms"] < processor.min_silence_duration_ms
+        )
+        and not (
+            r["type"] == "speech" and r["end_ms"] - r["start_ms"] < processor.min_speech_duration_ms
+        )
+    ]
+
+    if len(rows) >= 2:
+        ordered = sorted(rows, key=lambda r: r["start_ms"])
+        merged = [ordered[0]]
+        for current in ordered[1:]:
+            previous = merged[-1]
+            if (
+                current["type"] == previous["type"]
+                and current["start_ms"] - previous["end_ms"] <= processor.merge_threshold_ms
+            ):
+                merged[-1] = {
+                    "start_ms": previous["start_ms"],
+                    "end_ms": current["end_ms"],
+                    "type": previous["type"],
+                    "confidence": (previous["confidence"] + current["confidence"]) / 2,
+                    "text": (
+                        f"{previous['text'] or ''} {current['text'] or ''}".strip()
+                        if previous["text"] or current["text"]
+                        else None
+                    ),
+                    "filler_word": previous["filler_word"] or current["filler_word"],
+                }
+            else:
+                merged.append(current)
+        rows = merged
+
+    padded = []
+    for r in rows:
+        r = dict(r)
+        if r["type"] == "speech":
+            r["start_ms"] = max(0, r["start_ms"] - processor.speech_padding_ms)
+            r["end_ms"] = r["end_ms"] + processor.speech_padding_ms
+            if total_duration_ms:
+                r["end_ms"] = min(r["end_ms"], total_duration_ms)
+            if padded and r["start_ms"] < padded[-1]["end_ms"]:
+                r["start_ms"] = padded[-1]["end_ms"]
+            padded.append(r)
+        else:
+            if padded and r["start_ms"] < padded[-1]["end_ms"]:
+                r["start_ms"] = padded[-1]["end_ms"]
+            if r["end_ms"] > r["start_ms"]:
+                padded.append(r)
+
+    classification = {"speech": "keep", "silence": "remove", "filler": "suggest_remove"}
+    for r in padded:
+        r["classification"] = classification.get(r["type"], "keep")
+    return padded
+
+
+def _random_segments(rng: random.Random, dense: bool) -> list:
+    """Build an unsorted, partly overlapping timeline of speech, silence and fillers."""
+    segments = []
+    cursor = 0
+    for _ in range(rng.randint(0, 200)):
+        kind = rng.choice(["speech", "silence", "filler"] if dense else ["speech", "silence"])
+        length = rng.randint(0, 1200)
+        start = max(0, cursor + rng.randint(-150, 200))
+        segment = {
+            "start_ms": start,
+            "end_ms": start + length,
+            "type": kind,
+            "confidence": round(rng.random(), 3),
+        }
+        if kind == "filler":
+            segment.update(text="um", filler_word=rng.choice(["um", "uh", ""]))
+        elif kind == "speech" and rng.random() < 0.7:
+            segment["text"] = rng.choice(["hello", " there ", "", "so"])
+        segments.append(segment)
+        cursor = start + length
+    if rng.random() < 0.3:
+        rng.shuffle(segments)
+    return segments
+
+
+def _assert_rows_equal(actual, expected):
+    assert len(actual) == len(expected)
+    for a, e in zip(actual, expected):
+        assert a == {**e, "confidence": pytest.approx(e["confidence"])}
+
+
+class TestSegmentProcessor:
+    """Tests for the columnar post-processing pipeline."""
+
+    @pytest.mark.parametrize("seed", range(60))
+    def test_matches_reference_pipeline(self, seed):
+        """Test filters, merging, padding and classification match row-wise processing."""
+        rng = random.Random(seed)
+        segments = _random_segments(rng, dense=seed % 2 == 0)
+        processor = SegmentProcessor(
+            min_silence_duration_ms=rng.choice([0, 300]),
+            min_speech_duration_ms=rng.choice([0, 250]),
+            merge_threshold_ms=rng.choice([0, 100, 400]),
+            speech_padding_ms=rng.choice([0, 50, 200]),
+        )
+        total_duration_ms = rng.choice([None, 0, 5000, 10**9])
+
+        table = processor.process_table(segments, total_duration_ms)
+
+        _assert_rows_equal(
+            table.to_dicts(), _reference_process(segments, total_duration_ms, processor)
+        )
+
+    def test_process_segments_returns_dataclasses(self):
+        """Test the object API wraps the table output."""
+        segments = [
+            {"start_ms": 0, "end_ms": 1000, "type": "speech", "confidence": 0.9, "text": "hi"},
+            {"start_ms": 1000, "end_ms": 2000, "type": "silence", "confidence": 0.8},
+            {"start_ms": 2000, "end_ms": 2300, "type": "filler", "confidence": 0.9,
+             "text": "um", "filler_word": "um"},
+        ]
+
+        processed = SegmentProcessor().process_segments(segments, 2300)
+
+        assert [(s.type, s.classification) for s in processed] == [
+            ("speech", "keep"),
+            ("silence", "remove"),
+            ("filler", "suggest_remove"),
+        ]
+        assert processed[0].end_ms == 1050
+        assert processed[1].start_ms == 1050
+        assert processed[0].to_dict()["text"] == "hi"
+
+    def test_empty_input(self):
+        """Test no segments produce an empty table."""
+        table = SegmentProcessor().process_table([])
+
+        assert len(table) == 0
+        assert table.to_dicts() == []
+
+    def test_unknown_types_are_kept(self):
+        """Test types outside the known set pass through and are kept."""
+        table = SegmentTable.from_dicts([{"start_ms": 0, "end_ms": 10, "type": "music"}])
+
+        assert table.to_dicts()[0]["type"] == "music"
+        assert table.classifications() == ["keep"]
+
+
+def _seg(start_ms, end_ms, kind="speech", classification="keep"):
+    return {
+        "start_ms": start_ms,
+        "end_ms": end_ms,
+        "type": kind,
+        "confidence": 0.9,
+        "text": None,
+        "filler_word": None,
+        "classification": classification,
+    }
+
+
+def _apply_hunks(old, hunks):
+    result = list(old)
+    for hunk in reversed(hunks):
+        result[hunk["old_start"] : hunk["old_end"]] = hunk["segments"]
+    return result
+
+
+class TestSegmentDiff:
+    """Tests for re-processing diffs and classification overrides."""
+
+    def test_unchanged_lists_have_no_hunks(self):
+        """Test identical lists produce no changes."""
+        segments = [_seg(0, 1000), _seg(1000, 2000, "silence", "remove")]
+
+        assert diff_segments(segments, [dict(s) for s in segments]) == []
+
+    def test_changed_ranges_are_localized(self):
+        """Test only the rows around a change are reported."""
+        old = [
+            _seg(0, 1000),
+            _seg(1000, 1200, "silence", "remove"),
+            _seg(1200, 3000),
+            _seg(3000, 4000, "silence", "remove"),
+        ]
+        new = [_seg(0, 1000), _seg(1000, 3000), _seg(3000, 4000, "silence", "remove")]
+
+        hunks = diff_segments(old, new)
+
+        assert [(h["old_start"], h["old_end"], h["new_start"], h["new_end"]) for h in hunks] == [
+            (1, 3, 1, 2)
+        ]
+        assert _apply_hunks(old, hunks) == new
+
+    @pytest.mark.parametrize("seed", range(30))
+    def test_hunks_reproduce_new_list(self, seed):
+        """Test applying the hunks to the old list always yields the new list."""
+        rng = random.Random(seed)
+        segments = _random_segments(rng, dense=True)
+        old = SegmentProcessor().process_table(segments, None).to_dicts()
+        new = SegmentProcessor(
+            merge_threshold_ms=rng.choice([0, 300]), speech_padding_ms=rng.choice([0, 120])
+        ).process_table(segments, None).to_dicts()
+
+        assert _apply_hunks(old, diff_segments(old, new)) == new
+
+    def test_overrides_follow_time_not_index(self):
+        """Test an override applies to whichever segment covers its time."""
+        segments = [_seg(0, 1000), _seg(1000, 2500, "filler", "suggest_remove"), _seg(2500, 4000)]
+
+        apply_classification_overrides(
+            segments,
+            [{"at_ms": 1800, "classification": "keep"}, {"at_ms": 9000, "classification": "remove"}],
+        )
+
+        assert [s["classification"] for s in segments] == ["keep", "keep", "keep"]
@@ -0,0 +1,422 @@
+"""Tests for storage range reads and the local read-through cache."""
+
+import asyncio
+import io
+import os
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from boto3.s3.transfer import TransferConfig
+
+from fastapi.testclient import TestClient
+
+from app.api.v1 import media as media_module
+from app.services import storage_service as storage_module
+from app.services.file_cache import LocalFileCache
+from app.services.storage_service import (
+    LocalStorageBackend,
+    S3StorageBackend,
+    StorageBackend,
+    StorageService,
+    get_storage_service,
+    transfer_bytes_total,
+)
+
+
+class _RemoteBackend(StorageBackend):
+    """In-memory remote backend that counts downloads."""
+
+    def __init__(self, objects: dict):
+        self.objects = objects
+        self.downloads = 0
+
+    def key_for(self, path: str) -> str:
+        return path.replace("s3://bucket/", "")
+
+    def save_file(self, file, filename):
+        self.objects[filename] = file.read()
+        return f"s3://bucket/{filename}"
+
+    def get_file(self, path):
+        return self.objects.get(self.key_for(path))
+
+    def delete_file(self, path):
+        return self.objects.pop(self.key_for(path), None) is not None
+
+    def file_exists(self, path):
+        return self.key_for(path) in self.objects
+
+    def get_size(self, path):
+        data = self.objects.get(self.key_for(path))
+        return None if data is None else len(data)
+
+    def iter_range(self, path, start, length, chunk_size=65536):
+        yield self.objects[self.key_for(path)][start : start + length]
+
+    def download_file(self, path, destination):
+        key = self.key_for(path)
+        if key not in self.objects:
+            raise FileNotFoundError(path)
+        self.downloads += 1
+        time.sleep(0.01)
+        Path(destination).write_bytes(self.objects[key])
+
+    def get_presigned_upload_url(self, filename, content_type, expires_in=3600):
+        return None
+
+    def get_presigned_download_url(self, path, expires_in=3600):
+        return None
+
+
+def _service(backend: StorageBackend) -> StorageService:
+    service = StorageService.__new__(StorageService)
+    service.backend = backend
+    return service
+
+
+@pytest.fixture
+def file_cache(tmp_path, monkeypatch) -> LocalFileCache:
+    """Storage cache in a temporary directory, used by the storage service."""
+    cache = LocalFileCache(str(tmp_path / "cache"), max_bytes=1024)
+    monkeypatch.setattr(storage_module, "get_file_cache", lambda: cache)
+    return cache
+
+
+class TestLocalFileCache:
+    """Tests for the on-disk LRU cache."""
+
+    def test_fetches_once_and_keeps_extension(self, tmp_path):
+        """Test a key is fetched on the first lookup only."""
+        cache = LocalFileCache(str(tmp_path), max_bytes=1024)
+        calls = []
+
+        def fetch(destination):
+            calls.append(destination)
+            destination.write_bytes(b"data")
+
+        first = cache.get_or_fetch("media/video.mp4", fetch)
+        second = cache.get_or_fetch("media/video.mp4", fetch)
+
+        assert first == second
+        assert first.suffix == ".mp4"
+        assert first.read_bytes() == b"data"
+        assert len(calls) == 1
+
+    def test_concurrent_fetches_download_once(self, tmp_path):
+        """Test concurrent misses on one key share a single fetch."""
+        cache = LocalFileCache(str(tmp_path), max_bytes=1024)
+        calls = []
+
+        def fetch(destination):
+            calls.append(destination)
+            time.sleep(0.05)
+            destination.write_bytes(b"data")
+
+        threads = [
+            threading.Thread(target=cache.get_or_fetch, args=("key.wav", fetch)) for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Test the oldest entries are removed once the size cap is exceeded."""
+        cache = LocalFileCache(str(tmp_path), max_bytes=250)
+        for i, key in enumerate(["a.bin", "b.bin"]):
+            path = cache.put(key, io.BytesIO(b"x" * 100))
+            os.utime(path, (1000 + i, 1000 + i))
+
+        # Touch "a" so "b" becomes the least recently used
+        cache.get("a.bin")
+        cache.put("c.bin", io.BytesIO(b"x" * 100))
+
+        assert cache.get("a.bin") is not None
+        assert cache.get("b.bin") is None
+        assert cache.get("c.bin") is not None
+
+    def test_recently_used_entries_and_lock_files(self, tmp_path):
+        """Test entries in use are kept past the cap and evicted entries drop their lock file."""
+        cache = LocalFileCache(str(tmp_path), max_bytes=150, grace_seconds=60)
+        old = cache.get_or_fetch("old.bin", lambda path: path.write_bytes(b"x" * 100))
+        os.utime(old, (1000, 1000))
+        cache.get_or_fetch("recent.bin", lambda path: path.write_bytes(b"x" * 100))
+        cache.put("new.bin", io.BytesIO(b"x" * 100))
+
+        assert cache.get("old.bin") is None
+        assert cache.get("recent.bin") is not None
+        assert cache.get("new.bin") is not None
+        locks = sorted(path.name for path in (tmp_path / ".locks").iterdir())
+        assert locks == [f"{cache.path_for('recent.bin').name}.lock"]
+
+    def test_failed_fetch_leaves_no_entry(self, tmp_path):
+        """Test a fetch error does not leave a partial file behind."""
+        cache = LocalFileCache(str(tmp_path), max_bytes=1024)
+
+        def fetch(destination):
+            destination.write_bytes(b"partial")
+            raise FileNotFoundError("missing")
+
+        with pytest.raises(FileNotFoundError):
+            cache.get_or_fetch("missing.mp4", fetch)
+
+        assert cache.get("missing.mp4") is None
+        assert not list(tmp_path.glob("*.part"))
+
+
+class TestStorageRangeReads:
+    """Tests for backend-agnostic range reads and local copies."""
+
+    def test_local_range_read(self, tmp_path):
+        """Test range reads from local storage."""
+        service = _service(LocalStorageBackend(str(tmp_path)))
+        service.save_file(io.BytesIO(bytes(range(256))), "clip.mp4")
+
+        assert service.get_size("clip.mp4") == 256
+        data = b"".join(service.iter_range("clip.mp4", 10, 20, chunk_size=7))
+        assert data == bytes(range(10, 30))
+
+    def test_local_copy_of_remote_object_is_cached(self, file_cache):
+        """Test remote objects are downloaded once and then served from the cache."""
+        backend = _RemoteBackend({"clip.mp4": b"0123456789"})
+        service = _service(backend)
+
+        first = service.get_local_copy("clip.mp4")
+        second = service.get_local_copy("s3://bucket/clip.mp4")
+
+        assert first == second
+        assert first.read_bytes() == b"0123456789"
+        assert backend.downloads == 1
+        assert b"".join(service.iter_range("clip.mp4", 2, 3)) == b"234"
+
+    def test_local_copy_of_missing_object(self, file_cache):
+        """Test a missing remote object has no local copy."""
+        service = _service(_RemoteBackend({}))
+        assert service.get_local_copy("missing.mp4") is None
+
+    def test_upload_and_delete_update_cache(self, file_cache):
+        """Test new uploads are cached locally and deletes drop the copy."""
+        backend = _RemoteBackend({})
+        service = _service(backend)
+
+        path = service.save_file(io.BytesIO(b"new upload"), "new.mp4")
+        assert service.get_local_copy("new.mp4").read_bytes() == b"new upload"
+        assert backend.downloads == 0
+
+        service.delete_file(path)
+        assert file_cache.get("new.mp4") is None
+
+
+class TestStorageTransfers:
+    """Tests for whole-file transfers and S3 transfer tuning."""
+
+    def test_local_save_local_file_moves_render(self, tmp_path):
+        """Test local storage takes over a rendered file."""
+        service = _service(LocalStorageBackend(str(tmp_path / "uploads")))
+        render = tmp_path / "render.mp4"
+        render.write_bytes(b"render")
+
+        path = service.save_local_file(render, "processed/render.mp4")
+
+        assert Path(path) == tmp_path / "uploads" / "processed" / "render.mp4"
+        assert Path(path).read_bytes() == b"render"
+        assert not render.exists()
+
+    def test_remote_save_local_file_keeps_cached_copy(self, tmp_path, file_cache):
+        """Test a render uploaded to remote storage is cached without a download."""
+        backend = _RemoteBackend({})
+        service = _service(backend)
+        render = tmp_path / "render.mp4"
+        render.write_bytes(b"render")
+        uploaded = transfer_bytes_total.value(backend="s3", direction="upload")
+
+        path = service.save_local_file(render, "processed/render.mp4")
+
+        assert path == "s3://bucket/processed/render.mp4"
+        assert backend.objects["processed/render.mp4"] == b"render"
+        assert service.get_local_copy(path).read_bytes() == b"render"
+        assert backend.downloads == 0
+        assert transfer_bytes_total.value(backend="s3", direction="upload") == uploaded + 6
+
+    def test_s3_client_uses_transfer_settings(self):
+        """Test the S3 client pool size and transfer config are applied."""
+        transfer_config = TransferConfig(multipart_chunksize=32 * 1024 * 1024, max_concurrency=8)
+        backend = S3StorageBackend(
+            bucket_name="bucket",
+            access_key="key",
+            secret_key="secret",
+            region="us-east-1",
+            transfer_config=transfer_config,
+            max_pool_connections=48,
+        )
+
+        assert backend.client.meta.config.max_pool_connections == 48
+        assert backend.transfer_config.max_concurrency == 8
+
+
+async def _read_all(chunks) -> bytes:
+    return b"".join([chunk async for chunk in chunks])
+
+
+async def _write_all(service: StorageService, filename: str, chunks) -> str:
+    async with service.open_write(filename) as writer:
+        for chunk in chunks:
+            await writer.write(chunk)
+    return writer.path
+
+
+class _FakeS3Client:
+    """Records multipart upload calls."""
+
+    def __init__(self):
+        self.calls = []
+        self.parts = {}
+
+    def create_multipart_upload(self, Bucket, Key):
+        self.calls.append("create")
+        return {"UploadId": "upload-1"}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.parts[PartNumber] = Body
+        return {"ETag": f"etag-{PartNumber}"}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.calls.append(("complete", [p["PartNumber"] for p in MultipartUpload["Parts"]]))
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.calls.append("abort")
+
+    def put_object(self, Bucket, Key, Body):
+        self.calls.append(("put", Body))
+
+
+def _s3_backend(client) -> S3StorageBackend:
+    backend = S3StorageBackend.__new__(S3StorageBackend)
+    backend.bucket_name = "bucket"
+    backend.client = client
+    backend.transfer_config = TransferConfig(multipart_chunksize=5 * 1024 * 1024)
+    return backend
+
+
+class TestStreamingStorage:
+    """Tests for the async streaming read and write interface."""
+
+    def test_local_write_then_read(self, tmp_path):
+        """Test local streaming writes and full, ranged and open-ended reads."""
+        service = _service(LocalStorageBackend(str(tmp_path)))
+        data = bytes(range(256)) * 4
+
+        path = asyncio.run(_write_all(service, "media/clip.mp4", [data[:100], data[100:]]))
+
+        assert Path(path).read_bytes() == data
+        assert asyncio.run(_read_all(service.open_read("media/clip.mp4", chunk_size=100))) == data
+        assert asyncio.run(_read_all(service.open_read("media/clip.mp4", 10, 20))) == data[10:30]
+        assert asyncio.run(_read_all(service.open_read("media/clip.mp4", 1000))) == data[1000:]
+
+    def test_local_write_discarded_on_error(self, tmp_path):
+        """Test a failed streaming write leaves neither the file nor a partial."""
+        service = _service(LocalStorageBackend(str(tmp_path)))
+
+        async def write():
+            async with service.open_write("clip.mp4") as writer:
+                await writer.write(b"partial")
+                raise ValueError("client went away")
+
+        with pytest.raises(ValueError):
+            asyncio.run(write())
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_remote_write_is_cached_and_read_back(self, file_cache):
+        """Test streamed remote uploads reach the backend and the local cache."""
+        backend = _RemoteBackend({})
+        service = _service(backend)
+
+        path = asyncio.run(_write_all(service, "clip.mp4", [b"0123", b"456789"]))
+
+        assert path == "s3://bucket/clip.mp4"
+        assert backend.objects["clip.mp4"] == b"0123456789"
+        assert file_cache.get("clip.mp4").read_bytes() == b"0123456789"
+        assert asyncio.run(_read_all(service.open_read(path, 2, 3))) == b"234"
+
+    def test_remote_read_without_cached_copy(self):
+        """Test the default open_read streams through the backend's range reads."""
+        backend = _RemoteBackend({"clip.mp4": b"0123456789"})
+        assert asyncio.run(_read_all(backend.open_read("clip.mp4", 4))) == b"456789"
+
+    def test_s3_writer_uploads_parts(self):
+        """Test S3 streaming writes are split into multipart upload parts."""
+        client = _FakeS3Client()
+        backend = _s3_backend(client)
+        chunk = b"x" * (1024 * 1024)
+
+        async def write():
+            async with backend.open_write("big.mp4") as writer:
+                for _ in range(11):
+                    await writer.write(chunk)
+            return writer.path
+
+        path = asyncio.run(write())
+
+        assert path == "s3://bucket/big.mp4"
+        assert client.calls == ["create", ("complete", [1, 2, 3])]
+        assert [len(part) for part in client.parts.values()] == [
+            5 * 1024 * 1024,
+            5 * 1024 * 1024,
+            1024 * 1024,
+        ]
+
+    def test_s3_writer_small_object_and_abort(self):
+        """Test small S3 writes use one PutObject and failed writes abort the upload."""
+        client = _FakeS3Client()
+        backend = _s3_backend(client)
+
+        async def write_small():
+            async with backend.open_write("small.mp4") as writer:
+                await writer.write(b"tiny")
+
+        async def write_failing():
+            async with backend.open_write("big.mp4") as writer:
+                await writer.write(b"x" * (6 * 1024 * 1024))
+                raise ValueError("client went away")
+
+        asyncio.run(write_small())
+        with pytest.raises(ValueError):
+            asyncio.run(write_failing())
+
+        assert client.calls == [("put", b"tiny"), "create", "abort"]
+
+
+class TestMediaStreamingEndpoints:
+    """Tests for streaming media upload and playback."""
+
+    def test_upload_then_stream_range(
+        self, client: TestClient, auth_headers, test_project, tmp_path, monkeypatch
+    ):
+        """Test an upload is streamed to storage and served back by range."""
+        monkeypatch.setattr(get_storage_service(), "backend", LocalStorageBackend(str(tmp_path)))
+        monkeypatch.setattr(media_module, "get_media_duration", lambda path: None)
+        content = b"ID3" + bytes(range(256)) * 8
+
+        response = client.post(
+            f"/api/v1/media/projects/{test_project.id}/upload",
+            headers=auth_headers,
+            files={"file": ("song.mp3", content, "audio/mpeg")},
+        )
+        assert response.status_code == 201
+        media = response.json()
+        assert media["file_size"] == len(content)
+        assert media["mime_type"] == "audio/mpeg"
+
+        token = auth_headers["Authorization"].split()[1]
+        response = client.get(
+            f"/api/v1/media/{media['id']}/stream",
+            params={"token": token},
+            headers={"Range": "bytes=3-12"},
+        )
+        assert response.status_code == 206
+        assert response.content == content[3:13]
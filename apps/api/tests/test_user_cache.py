@@ -0,0 +1,129 @@
+"""Tests for the authenticated-user cache."""
+
+import asyncio
+import time
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from app.models.user import User
+from app.services.user_cache import UserCache, cache_requests_total, get_user_cache
+
+
+def _user(**overrides) -> User:
+    fields = {
+        "id": uuid4(),
+        "email": "cached@example.com",
+        "password_hash": "hash",
+        "full_name": "Cached User",
+        "is_active": True,
+        "is_verified": True,
+        "settings": {"theme": "dark"},
+    }
+    fields.update(overrides)
+    return User(**fields)
+
+
+class _FakeRedis:
+    """In-memory stand-in for the async Redis client."""
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+
+class TestUserCache:
+    """Tests for the two-layer user cache."""
+
+    def test_round_trip_excludes_password_hash(self):
+        """Test cached users keep their fields but not the password hash."""
+        cache = UserCache()
+        user = _user()
+        asyncio.run(cache.set(user))
+
+        cached = asyncio.run(cache.get(user.id))
+        assert cached.id == user.id
+        assert cached.email == user.email
+        assert cached.settings == {"theme": "dark"}
+        assert "password_hash" not in cached.__dict__
+
+    def test_entries_expire(self):
+        """Test entries are not returned after their TTL."""
+        cache = UserCache(ttl_seconds=0.01)
+        user = _user()
+        asyncio.run(cache.set(user))
+        time.sleep(0.02)
+        assert asyncio.run(cache.get(user.id)) is None
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test the cache keeps at most max_entries users."""
+        cache = UserCache(max_entries=2)
+        first, second, third = _user(), _user(), _user()
+        asyncio.run(cache.set(first))
+        asyncio.run(cache.set(second))
+        asyncio.run(cache.get(first.id))
+        asyncio.run(cache.set(third))
+
+        assert asyncio.run(cache.get(first.id)) is not None
+        assert asyncio.run(cache.get(second.id)) is None
+        assert asyncio.run(cache.get(third.id)) is not None
+
+    def test_redis_layer_and_invalidation(self):
+        """Test entries are shared through Redis and invalidation reaches every process."""
+        redis = _FakeRedis()
+        user = _user()
+        this_process = UserCache(redis_client=redis)
+        asyncio.run(this_process.set(user))
+
+        other_process = UserCache(redis_client=redis)
+        cached = asyncio.run(other_process.get(user.id))
+        assert cached.id == user.id
+        assert cached.settings == {"theme": "dark"}
+
+        asyncio.run(other_process.invalidate(user.id))
+        assert redis.values == {}
+        assert asyncio.run(this_process.get(user.id)) is None
+        assert asyncio.run(other_process.get(user.id)) is None
+
+
+class TestCurrentUserCaching:
+    """Tests for user caching in request authentication."""
+
+    def test_repeat_requests_hit_cache(self, client: TestClient, auth_headers):
+        """Test the second authenticated request is served from the cache."""
+        hits = cache_requests_total.value(layer="memory", result="hit")
+        client.get("/api/v1/auth/me", headers=auth_headers)
+        client.get("/api/v1/auth/me", headers=auth_headers)
+        assert cache_requests_total.value(layer="memory", result="hit") == hits + 1
+
+    def test_profile_update_invalidates_cache(self, client: TestClient, auth_headers):
+        """Test a profile change is visible on the next request."""
+        client.get("/api/v1/auth/me", headers=auth_headers)
+        response = client.patch(
+            "/api/v1/auth/me", headers=auth_headers, json={"full_name": "Renamed User"}
+        )
+        assert response.status_code == 200
+
+        response = client.get("/api/v1/auth/me", headers=auth_headers)
+        assert response.json()["full_name"] == "Renamed User"
+
+    def test_invalidated_deactivated_user_is_rejected(
+        self, client: TestClient, auth_headers, db_session, test_user
+    ):
+        """Test a deactivated user is rejected once their cache entry is dropped."""
+        client.get("/api/v1/auth/me", headers=auth_headers)
+
+        test_user.is_active = False
+        db_session.commit()
+        asyncio.run(get_user_cache().invalidate(test_user.id))
+
+        response = client.get("/api/v1/auth/me", headers=auth_headers)
+        assert response.status_code == 403
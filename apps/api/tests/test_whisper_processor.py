@@ -0,0 +1,482 @@
+"""Tests for the Whisper processor and transcription engines."""
+
+import json
+import math
+import random
+import re
+import struct
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("torch")
+
+from app.services import whisper_processor  # noqa: E402
+from app.services.vad_processor import Segment  # noqa: E402
+from app.services.whisper_processor import (  # noqa: E402
+    FillerWord,
+    LocalTranscriptionEngine,
+    OpenAITranscriptionEngine,
+    WhisperProcessor,
+    WhisperSegment,
+    WindowBatcher,
+    detect_silences,
+    plan_chunks,
+)
+
+
+class _TranscriptionHandler(BaseHTTPRequestHandler):
+    """Mimics POST /v1/audio/transcriptions with verbose_json output."""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            fail = server.requests <= server.fail_first
+
+        if fail:
+            self.send_response(500)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(b'{"error": {"message": "try again"}}')
+            return
+
+        index = int(re.search(rb"chunk_(\d+)\.ogg", body).group(1))
+        payload = {
+            "text": f"um chunk {index}",
+            "language": "english",
+            "duration": 5.0,
+            "words": [
+                {"word": "um", "start": 0.5, "end": 0.8},
+                {"word": "chunk", "start": 1.0, "end": 1.4},
+                {"word": str(index), "start": 1.5, "end": 1.9},
+            ],
+            "segments": [
+                {"id": 0, "start": 0.5, "end": 1.9, "text": f" um chunk {index}"},
+            ],
+        }
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def transcription_server():
+    """Run the stand-in transcription API on an ephemeral port."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _TranscriptionHandler)
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.fail_first = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _write_wav(path: Path, pattern: list) -> Path:
+    """Write a 16 kHz mono WAV of one-second tone (1) and silence (0) blocks."""
+    tone = [int(8000 * math.sin(2 * math.pi * 440 * i / 16000)) for i in range(16000)]
+    frames = []
+    for block in pattern:
+        frames.extend(tone if block else [0] * 16000)
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(struct.pack(f"<{len(frames)}h", *frames))
+    return path
+
+
+@pytest.fixture
+def audio_path(tmp_path) -> Path:
+    """Write 25 seconds of tone with one-second gaps at 8 s and 17 s."""
+    return _write_wav(tmp_path / "audio.wav", [1] * 8 + [0] + [1] * 8 + [0] + [1] * 7)
+
+
+@pytest.fixture(autouse=True)
+def fake_encoder(monkeypatch):
+    """Skip FFmpeg and write a placeholder chunk file."""
+
+    def encode(input_path, output_path, start_seconds, duration_seconds, bitrate):
+        output_path.write_bytes(b"OggS")
+        return output_path
+
+    monkeypatch.setattr(whisper_processor, "encode_audio_chunk", encode)
+
+
+def _engine(server) -> OpenAITranscriptionEngine:
+    return OpenAITranscriptionEngine(
+        api_key="test-key",
+        base_url=f"http://127.0.0.1:{server.server_address[1]}/v1",
+        chunk_target_seconds=10,
+        max_concurrency=2,
+        max_retries=2,
+        retry_backoff_seconds=0,
+    )
+
+
+VAD_SEGMENTS = [
+    Segment(start_ms=0, end_ms=8000, type="speech", confidence=0.95),
+    Segment(start_ms=8000, end_ms=9000, type="silence", confidence=0.9),
+    Segment(start_ms=9000, end_ms=17000, type="speech", confidence=0.95),
+    Segment(start_ms=17000, end_ms=18000, type="silence", confidence=0.9),
+    Segment(start_ms=18000, end_ms=25000, type="speech", confidence=0.95),
+]
+
+
+class TestChunkPlanning:
+    """Tests for splitting audio at silence boundaries."""
+
+    def test_chunks_cut_at_silence_midpoints(self):
+        """Test chunks end in the middle of the latest silence within the target."""
+        chunks = plan_chunks(25000, VAD_SEGMENTS, 10000)
+        assert chunks == [(0, 8500), (8500, 17500), (17500, 25000)]
+
+    def test_hard_cut_without_silence(self):
+        """Test chunks fall back to the target length when there is no silence."""
+        chunks = plan_chunks(25000, [], 10000)
+        assert chunks == [(0, 10000), (10000, 20000), (20000, 25000)]
+
+
+class TestSilenceDetection:
+    """Tests for the energy-based silence scan used before VAD is available."""
+
+    def test_detects_gap_between_tones(self, tmp_path):
+        """Test a quiet gap between two tones is reported as silence."""
+        path = _write_wav(tmp_path / "tones.wav", [1, 1, 1, 0, 1, 1])
+
+        silences = detect_silences(path)
+
+        assert len(silences) == 1
+        assert silences[0].start_ms == pytest.approx(3000, abs=30)
+        assert silences[0].end_ms == pytest.approx(4000, abs=30)
+
+
+class TestOpenAITranscriptionEngine:
+    """Tests for concurrent chunk transcription against the stand-in API."""
+
+    def test_word_timestamps_are_reoffset(self, transcription_server, audio_path):
+        """Test words and segments are shifted onto the full timeline."""
+        result = _engine(transcription_server).transcribe(audio_path)
+
+        assert transcription_server.requests == 3
+        assert result["text"] == "um chunk 0 um chunk 1 um chunk 2"
+        assert [w["start"] for w in result["words"] if w["word"] == "um"] == [
+            pytest.approx(0.5, abs=0.05),
+            pytest.approx(9.0, abs=0.05),
+            pytest.approx(18.0, abs=0.05),
+        ]
+        assert [s["id"] for s in result["segments"]] == [0, 1, 2]
+        assert result["segments"][2]["end"] == pytest.approx(19.4, abs=0.05)
+        assert result["duration"] == pytest.approx(25.0)
+
+    def test_transient_errors_are_retried(self, transcription_server, audio_path):
+        """Test chunks are retried after server errors."""
+        transcription_server.fail_first = 2
+        result = _engine(transcription_server).transcribe(audio_path)
+
+        assert transcription_server.requests == 5
+        assert len(result["words"]) == 9
+
+
+class _FakeBackend:
+    """Stands in for the faster-whisper model, recording each batch."""
+
+    def __init__(self):
+        self.batches = []
+
+    def transcribe_batch(self, windows, sample_rate):
+        self.batches.append(len(windows))
+        time.sleep(0.05)
+        return [
+            {
+                "text": "um hello",
+                "language": "en",
+                "segments": [{"id": 0, "start": 0.2, "end": 0.9, "text": " um hello"}],
+                "words": [
+                    {"word": "um", "start": 0.2, "end": 0.4},
+                    {"word": "hello", "start": 0.5, "end": 0.9},
+                ],
+            }
+            for _ in windows
+        ]
+
+
+class TestLocalTranscriptionEngine:
+    """Tests for the local engine and cross-job window batching."""
+
+    def test_windows_from_concurrent_jobs_share_batches(self, tmp_path):
+        """Test windows submitted by two jobs are decoded in shared batches."""
+        # 70 seconds with gaps at 25 s and 55 s: three windows of at most 30 s
+        audio_path = _write_wav(
+            tmp_path / "long.wav", [1] * 25 + [0] + [1] * 29 + [0] + [1] * 14
+        )
+        backend = _FakeBackend()
+        batcher = WindowBatcher(backend, batch_size=8, max_wait_ms=200)
+        engine = LocalTranscriptionEngine(batcher=batcher)
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            results = list(pool.map(engine.transcribe, [audio_path, audio_path]))
+
+        assert sum(backend.batches) == 6
+        assert max(backend.batches) > 3
+        for result in results:
+            assert [w["start"] for w in result["words"] if w["word"] == "um"] == [
+                pytest.approx(0.2, abs=0.05),
+                pytest.approx(25.7, abs=0.05),
+                pytest.approx(55.7, abs=0.05),
+            ]
+
+    def test_batch_errors_propagate(self, audio_path):
+        """Test a failing batch fails the jobs waiting on it."""
+
+        class FailingBackend:
+            def transcribe_batch(self, windows, sample_rate):
+                raise RuntimeError("model crashed")
+
+        engine = LocalTranscriptionEngine(batcher=WindowBatcher(FailingBackend()))
+        with pytest.raises(RuntimeError, match="model crashed"):
+            engine.transcribe(audio_path)
+
+
+class TestProcessAudio:
+    """Tests for the full Whisper + VAD pipeline."""
+
+    def test_vad_overlaps_transcription(self, transcription_server, audio_path, monkeypatch):
+        """Test VAD and transcription run concurrently rather than back to back."""
+
+        class SlowVAD:
+            def process_audio(self, path):
+                time.sleep(0.5)
+                return VAD_SEGMENTS
+
+        def slow_transcribe(path):
+            time.sleep(0.5)
+            return {"text": "", "segments": [], "words": []}
+
+        monkeypatch.setattr(whisper_processor, "get_vad_processor", lambda **kwargs: SlowVAD())
+        processor = WhisperProcessor(engine=_engine(transcription_server))
+        monkeypatch.setattr(processor, "_transcribe", slow_transcribe)
+
+        started = time.monotonic()
+        segments, _, _ = processor.process_audio(audio_path)
+
+        assert time.monotonic() - started < 0.9
+        assert [s.type for s in segments] == [s.type for s in VAD_SEGMENTS]
+
+    def test_checkpointer_used_from_task_thread_only(self, audio_path, monkeypatch):
+        """Test the VAD thread never touches the checkpointer and its shared session."""
+        threads = []
+
+        class RecordingCheckpointer:
+            def __init__(self):
+                self.saved = {}
+
+            def load_json(self, stage):
+                threads.append(threading.get_ident())
+                return self.saved.get(stage)
+
+            def save_json(self, stage, data):
+                threads.append(threading.get_ident())
+                self.saved[stage] = data
+
+            def get_or_compute_json(self, stage, compute):
+                data = self.load_json(stage)
+                if data is None:
+                    data = compute()
+                    self.save_json(stage, data)
+                return data
+
+        class VAD:
+            def process_audio(self, path):
+                return VAD_SEGMENTS
+
+        monkeypatch.setattr(whisper_processor, "get_vad_processor", lambda **kwargs: VAD())
+        processor = WhisperProcessor(engine=OpenAITranscriptionEngine(api_key="test-key"))
+        monkeypatch.setattr(
+            processor, "_transcribe", lambda path: {"text": "", "segments": [], "words": []}
+        )
+        checkpoint = RecordingCheckpointer()
+
+        processor.process_audio(audio_path, checkpoint=checkpoint)
+
+        assert set(threads) == {threading.get_ident()}
+        assert len(checkpoint.saved["vad"]) == len(VAD_SEGMENTS)
+
+
+def _words(text: str) -> list:
+    """Build one-second word timings for a whitespace-separated transcript."""
+    return [
+        {"word": f" {word}", "start": float(i), "end": i + 0.5}
+        for i, word in enumerate(text.split())
+    ]
+
+
+class TestFillerDetection:
+    """Tests for single-pass filler word detection."""
+
+    def test_single_and_multi_word_fillers(self):
+        """Test single and multi-word fillers are found in order of position."""
+        processor = WhisperProcessor(
+            filler_words=["um", "like", "you know", "I mean"],
+            engine=OpenAITranscriptionEngine(api_key="test-key"),
+        )
+        words = _words("Um so you know it was I MEAN like you")
+
+        fillers = processor._detect_filler_words({"words": words})
+
+        assert [(f.word, f.start_ms, f.end_ms, f.confidence) for f in fillers] == [
+            ("um", 0, 500, 0.9),
+            ("you know", 2000, 3500, 0.85),
+            ("i mean", 6000, 7500, 0.85),
+            ("like", 8000, 8500, 0.9),
+        ]
+
+    def test_overlapping_phrases(self):
+        """Test phrases sharing words are all reported."""
+        processor = WhisperProcessor(
+            filler_words=["you know", "know what", "you know what i mean"],
+            engine=OpenAITranscriptionEngine(api_key="test-key"),
+        )
+        words = _words("you know what i mean")
+
+        fillers = processor._detect_filler_words({"words": words})
+
+        assert [f.word for f in fillers] == [
+            "you know",
+            "you know what i mean",
+            "know what",
+        ]
+
+
+def _reference_text(start_ms, end_ms, whisper_segments):
+    """Text lookup by full scan, as the alignment was first written."""
+    return " ".join(
+        seg.get("text", "").strip()
+        for seg in whisper_segments
+        if int(seg.get("start", 0) * 1000) < end_ms and int(seg.get("end", 0) * 1000) > start_ms
+    )
+
+
+def _reference_merge(vad_segments, transcription_data, filler_words, padding_ms):
+    """Quadratic alignment used as the oracle for the indexed sweep."""
+    segments = []
+    whisper_segments = transcription_data.get("segments", [])
+    for vad_seg in vad_segments:
+        if vad_seg.type == "silence":
+            segments.append(
+                WhisperSegment(vad_seg.start_ms, vad_seg.end_ms, "silence", vad_seg.confidence)
+            )
+            continue
+
+        segment_fillers = [
+            fw
+            for fw in filler_words
+            if fw.start_ms >= vad_seg.start_ms and fw.end_ms <= vad_seg.end_ms
+        ]
+        if not segment_fillers:
+            segments.append(
+                WhisperSegment(
+                    vad_seg.start_ms,
+                    vad_seg.end_ms,
+                    "speech",
+                    vad_seg.confidence,
+                    text=_reference_text(vad_seg.start_ms, vad_seg.end_ms, whisper_segments),
+                )
+            )
+            continue
+
+        current_start = vad_seg.start_ms
+        for filler in sorted(segment_fillers, key=lambda x: x.start_ms):
+            if filler.start_ms > current_start:
+                segments.append(
+                    WhisperSegment(
+                        current_start,
+                        filler.start_ms - padding_ms,
+                        "speech",
+                        vad_seg.confidence,
+                        text=_reference_text(current_start, filler.start_ms, whisper_segments),
+                    )
+                )
+            segments.append(
+                WhisperSegment(
+                    max(0, filler.start_ms - padding_ms),
+                    filler.end_ms + padding_ms,
+                    "filler",
+                    filler.confidence,
+                    text=filler.word,
+                    filler_word=filler.word,
+                )
+            )
+            current_start = filler.end_ms + padding_ms
+
+        if current_start < vad_seg.end_ms:
+            segments.append(
+                WhisperSegment(
+                    current_start,
+                    vad_seg.end_ms,
+                    "speech",
+                    vad_seg.confidence,
+                    text=_reference_text(current_start, vad_seg.end_ms, whisper_segments),
+                )
+            )
+    return segments
+
+
+def _random_alignment_inputs(rng: random.Random):
+    """Build a VAD timeline with loosely overlapping transcript segments and fillers."""
+    vad_segments = []
+    cursor = 0
+    for i in range(rng.randint(1, 40)):
+        length = rng.randint(100, 5000)
+        kind = "speech" if i % 2 == 0 or rng.random() < 0.3 else "silence"
+        vad_segments.append(Segment(cursor, cursor + length, kind, round(rng.random(), 2)))
+        cursor += length
+
+    whisper_segments = []
+    for i in range(rng.randint(0, 40)):
+        start = rng.uniform(0, cursor / 1000)
+        whisper_segments.append(
+            {"id": i, "start": start, "end": start + rng.uniform(0, 6), "text": f" seg {i} "}
+        )
+    if rng.random() < 0.5:
+        whisper_segments.sort(key=lambda seg: seg["start"])
+
+    filler_words = []
+    for _ in range(rng.randint(0, 30)):
+        start = rng.randint(0, cursor)
+        filler_words.append(
+            FillerWord(rng.choice(["um", "uh", "you know"]), start, start + rng.randint(50, 700), 0.9)
+        )
+    return vad_segments, {"segments": whisper_segments}, filler_words
+
+
+class TestSegmentAlignment:
+    """Tests for merging VAD segments with transcript segments and fillers."""
+
+    @pytest.mark.parametrize("seed", range(50))
+    def test_matches_reference_alignment(self, seed):
+        """Test the indexed sweep produces exactly the full-scan output."""
+        rng = random.Random(seed)
+        vad_segments, transcription_data, filler_words = _random_alignment_inputs(rng)
+        processor = WhisperProcessor(
+            filler_word_padding_ms=100,
+            engine=OpenAITranscriptionEngine(api_key="test-key"),
+        )
+
+        merged = processor._merge_segments(vad_segments, transcription_data, filler_words)
+
+        assert merged == _reference_merge(vad_segments, transcription_data, filler_words, 100)